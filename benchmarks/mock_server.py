@@ -0,0 +1,139 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from synthetic_corpus import generate_corpus
+
+# Fields returned by the allQuestions query
+LIST_FIELDS = ["questionId", "questionFrontendId", "title", "titleSlug", "difficulty", "isPaidOnly"]
+
+# Matches aliased batch selections like `q0: question(titleSlug: $slug0)`
+ALIASED_QUESTION = re.compile(r"(\w+)\s*:\s*question\(titleSlug:\s*\$(\w+)\)")
+
+class MockLeetcodeServer:
+    """Local stand-in for leetcode.com/graphql serving a synthetic corpus
+
+    Answers the allQuestions, questionData (single and aliased batches) and userStatus queries used
+    by LeetcodeScraper. Each request waits `latency` seconds (plus up to `jitter`), and fails with
+    a 429 or 503 with probability `error_rate`. Only top-level fields named in the query are returned.
+    `content_size` sets the approximate length of each generated problem statement in characters.
+    """
+    def __init__(self, problems=None, count=500, latency=0.0, jitter=0.0, error_rate=0.0, is_premium=False,
+                 host="127.0.0.1", port=0, seed=0, content_size=2000):
+        self.problems = problems if problems is not None else generate_corpus(count, seed, content_size)
+        self.by_slug = {problem["titleSlug"]: problem for problem in self.problems}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.is_premium = is_premium
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        self.bytes_sent = 0
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def answer(self, payload):
+        """Return the GraphQL response body for a request payload"""
+        query = payload.get("query", "")
+        variables = payload.get("variables") or {}
+
+        if "allQuestions" in query:
+            return {"data": {"allQuestions": [{field: p[field] for field in LIST_FIELDS} for p in self.problems]}}
+        if "userStatus" in query:
+            return {"data": {"userStatus": {"isPremium": self.is_premium, "username": "benchmark"}}}
+        if "question(" in query:
+            requested = set(re.findall(r"\w+", query.split("{", 1)[-1]))
+            aliases = ALIASED_QUESTION.findall(query) or [("question", "titleSlug")]
+            data = {}
+            for alias, variable in aliases:
+                problem = self.by_slug.get(variables.get(variable))
+                data[alias] = {k: v for k, v in problem.items() if k in requested} if problem else None
+            return {"data": data}
+        return {"errors": [{"message": "Unsupported query"}]}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server.lock:
+                    server.request_count += 1
+                    delay = server.latency + server.rng.uniform(0, server.jitter)
+                    failed = server.rng.random() < server.error_rate
+                    if failed:
+                        server.error_count += 1
+                if delay:
+                    time.sleep(delay)
+
+                if failed:
+                    status, body = 429, b'{"error": "Too many requests"}'
+                    self.send_response(status)
+                    self.send_header("Retry-After", "0")
+                else:
+                    body = json.dumps(server.answer(payload)).encode("utf-8")
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server.lock:
+                    server.bytes_sent += len(body)
+
+        return Handler
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve a synthetic corpus through a mock LeetCode GraphQL API')
+    parser.add_argument('--count', type=int, default=3500, help='Number of synthetic problems')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds of latency per request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency of up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--content-size', type=int, default=2000,
+                        help='Approximate problem statement length in characters (response payload size)')
+    args = parser.parse_args()
+
+    server = MockLeetcodeServer(count=args.count, latency=args.latency, jitter=args.jitter,
+                                error_rate=args.error_rate, port=args.port, content_size=args.content_size)
+    print(f"Serving {len(server.problems)} synthetic problems at {server.base_url}/graphql")
+    print(f"Scrape it with: python leetcode_scraper.py --base-url {server.base_url} --no-cache --rps 0")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+if __name__ == "__main__":
+    main()
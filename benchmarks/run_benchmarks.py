@@ -0,0 +1,233 @@
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from mock_server import MockLeetcodeServer
+from synthetic_corpus import generate_corpus
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _fetch_worker(base_url, count, concurrency, batch_size, results):
+    from leetcode_scraper import LeetcodeScraper
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper = LeetcodeScraper(concurrency=concurrency, rps=0, batch_size=batch_size, base_url=base_url,
+                                  backoff_base=0.05)
+
+        # Time every HTTP request, including retries
+        latencies = []
+        post = scraper.session.post
+        def timed_post(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return post(*args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - started)
+        scraper.session.post = timed_post
+
+        started = time.perf_counter()
+        problems = scraper.get_problems_by_id_range(1, count)
+        elapsed = time.perf_counter() - started
+
+    results.put({
+        "problems": len(problems),
+        "seconds": elapsed,
+        "problems_per_sec": len(problems) / elapsed if elapsed else None,
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+
+def _transform_worker(raw_file, work_dir, streaming, results):
+    import transform_data
+
+    output_file = os.path.join(work_dir, "bench_transformed.json")
+    csv_file = os.path.join(work_dir, "bench_transformed.csv")
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        if streaming:
+            count = transform_data.transform_leetcode_data_streaming(raw_file, output_file, csv_file)
+            transform_seconds = time.perf_counter() - started
+            csv_seconds = 0.0
+        else:
+            count = len(transform_data.transform_leetcode_data(raw_file, output_file))
+            transform_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            transform_data.create_csv_from_json(output_file, csv_file)
+            csv_seconds = time.perf_counter() - started
+
+    total = transform_seconds + csv_seconds
+    results.put({
+        "problems": count,
+        "transform_seconds": transform_seconds,
+        "csv_seconds": csv_seconds,
+        "problems_per_sec": count / total if total else None,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+
+def _baseline_parse(problem):
+    """The embedded-field parsing and sort key as they were before the record parser, for comparison"""
+    def loads(value, default):
+        try:
+            return json.loads(value) if value else default
+        except Exception as e:
+            print(f"Error: {e}\nString: {value}")
+            return default
+    stats = loads(problem.get("stats"), {})
+    try:
+        acceptance_rate = float(stats.get("acRate", "0%").strip("%"))
+    except ValueError:
+        acceptance_rate = 0.0
+    companies = [company.get("name") for company in loads(problem.get("companyTagStats"), []) if "name" in company]
+    similar = []
+    for question in loads(problem.get("similarQuestions"), []):
+        formatted = f"{question.get('title', '')} [{question.get('difficulty', '')}]"
+        if question.get("titleSlug"):
+            formatted += f": https://leetcode.com/problems/{question['titleSlug']}/"
+        similar.append(formatted)
+    problem_id = problem.get("questionFrontendId")
+    match = re.search(r'\d+', problem_id) if problem_id else None
+    sort_key = int(match.group()) if match else float('inf')
+    return acceptance_rate, stats.get("totalSubmissionRaw"), companies, similar, sort_key
+
+def bench_parse(corpus, snapshots):
+    """Time embedded-field parsing and sort keys over `snapshots` copies of a corpus, per engine"""
+    import transform_data
+
+    records = corpus * snapshots
+    engines = [("baseline", None)]
+    engines.append(("json", json.loads))
+    if transform_data.orjson is not None:
+        engines.append(("orjson", transform_data.orjson.loads))
+
+    results = []
+    for engine, loads in engines:
+        transform_data.id_sort_key.cache_clear()
+        started = time.perf_counter()
+        if loads is None:
+            for problem in records:
+                _baseline_parse(problem)
+        else:
+            transform_data.json_loads = loads
+            for problem in records:
+                transform_data.extract_stats(problem.get("stats"))
+                transform_data.extract_company_tags(problem.get("companyTagStats"))
+                transform_data.extract_similar_questions(problem.get("similarQuestions"))
+                transform_data.id_sort_key(problem.get("questionFrontendId"))
+        elapsed = time.perf_counter() - started
+        results.append({"engine": engine, "records": len(records), "seconds": elapsed,
+                        "records_per_sec": len(records) / elapsed if elapsed else None})
+    transform_data.json_loads = transform_data.orjson.loads if transform_data.orjson is not None else json.loads
+    return results
+
+def run_in_process(target, *args):
+    """Run a benchmark function in a fresh process, so peak RSS is measured per benchmark"""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=target, args=args + (results,))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def bench_fetch(count, latency, error_rate, concurrency, batch_size, content_size=2000):
+    with MockLeetcodeServer(count=count, latency=latency, error_rate=error_rate, content_size=content_size) as server:
+        result = run_in_process(_fetch_worker, server.base_url, count, concurrency, batch_size)
+        result["server_requests"] = server.request_count
+        result["server_errors"] = server.error_count
+        result["bytes_received"] = server.bytes_sent
+    return result
+
+def bench_transform(raw_file, work_dir, streaming):
+    return run_in_process(_transform_worker, raw_file, work_dir, streaming)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Offline benchmarks: fetch from a local mock GraphQL server '
+                                                 'and transform a synthetic corpus')
+    parser.add_argument('--count', type=int, default=500, help='Number of synthetic problems')
+    parser.add_argument('--latency', type=float, default=0.02, help='Mock server latency per request in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of mock requests answered with 429')
+    parser.add_argument('--content-size', type=int, default=2000,
+                        help='Approximate problem statement length in characters, for fetch and transform benchmarks')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help='Concurrency levels to fetch with')
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[1, 10], help='Batch sizes to fetch with')
+    parser.add_argument('--transform-count', type=int, default=5000, help='Number of problems for transform benchmarks')
+    parser.add_argument('--skip-fetch', action='store_true', help='Only run transform benchmarks')
+    parser.add_argument('--skip-transform', action='store_true', help='Only run fetch benchmarks')
+    parser.add_argument('--parse-snapshots', type=int, default=20,
+                        help='Copies of the transform corpus to parse in the parser benchmark (0 to skip)')
+    parser.add_argument('--output', type=str, help='Write all results to this JSON file')
+    args = parser.parse_args()
+
+    report = {"fetch": [], "transform": [], "parse": []}
+
+    if not args.skip_fetch:
+        print(f"Fetch benchmarks: {args.count} problems, {args.latency * 1000:.0f} ms latency, "
+              f"{args.error_rate:.0%} errors")
+        print(f"{'concurrency':>11} {'batch':>5} {'problems/s':>10} {'requests':>8} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8}")
+        for concurrency in args.concurrency:
+            for batch_size in args.batch_size:
+                result = bench_fetch(args.count, args.latency, args.error_rate, concurrency, batch_size,
+                                     args.content_size)
+                result.update(concurrency=concurrency, batch_size=batch_size)
+                report["fetch"].append(result)
+                print(f"{concurrency:>11} {batch_size:>5} {result['problems_per_sec']:>10.1f} {result['requests']:>8} "
+                      f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['peak_rss_mb']:>8.1f}")
+
+    if not args.skip_transform:
+        with tempfile.TemporaryDirectory(prefix="leetcode_bench_") as work_dir:
+            raw_file = os.path.join(work_dir, "bench_raw.json")
+            with open(raw_file, "w", encoding="utf-8") as f:
+                json.dump(generate_corpus(args.transform_count, content_size=args.content_size), f,
+                          ensure_ascii=False, indent=2)
+            size_mb = os.path.getsize(raw_file) / (1024 * 1024)
+
+            print(f"\nTransform benchmarks: {args.transform_count} problems, {size_mb:.1f} MB raw file")
+            print(f"{'mode':>10} {'problems/s':>10} {'transform s':>11} {'csv s':>7} {'RSS MB':>8}")
+            for streaming in (False, True):
+                result = bench_transform(raw_file, work_dir, streaming)
+                result.update(mode="streaming" if streaming else "in-memory", raw_mb=size_mb)
+                report["transform"].append(result)
+                print(f"{result['mode']:>10} {result['problems_per_sec']:>10.1f} {result['transform_seconds']:>11.2f} "
+                      f"{result['csv_seconds']:>7.2f} {result['peak_rss_mb']:>8.1f}")
+        
+        if args.parse_snapshots:
+            print(f"\nParser benchmarks: embedded JSON fields and sort keys of {args.transform_count} problems "
+                  f"x {args.parse_snapshots} snapshots")
+            print(f"{'engine':>10} {'records/s':>10} {'seconds':>8}")
+            report["parse"] = bench_parse(generate_corpus(args.transform_count, content_size=args.content_size),
+                                          args.parse_snapshots)
+            for result in report["parse"]:
+                print(f"{result['engine']:>10} {result['records_per_sec']:>10.0f} {result['seconds']:>8.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import json
+import random
+
+TOPIC_TAGS = [
+    ("Array", "array"), ("String", "string"), ("Hash Table", "hash-table"), ("Dynamic Programming", "dynamic-programming"),
+    ("Math", "math"), ("Sorting", "sorting"), ("Greedy", "greedy"), ("Depth-First Search", "depth-first-search"),
+    ("Binary Search", "binary-search"), ("Breadth-First Search", "breadth-first-search"), ("Tree", "tree"),
+    ("Matrix", "matrix"), ("Two Pointers", "two-pointers"), ("Bit Manipulation", "bit-manipulation"),
+    ("Stack", "stack"), ("Heap (Priority Queue)", "heap-priority-queue"), ("Graph", "graph"),
+    ("Prefix Sum", "prefix-sum"), ("Sliding Window", "sliding-window"), ("Union Find", "union-find"),
+    ("Bitmask", "bitmask"), ("Trie", "trie"), ("Segment Tree", "segment-tree"), ("Topological Sort", "topological-sort"),
+]
+
+COMPANIES = [
+    "Google", "Amazon", "Meta", "Microsoft", "Apple", "Bloomberg", "Uber", "Adobe", "Oracle", "TikTok",
+    "LinkedIn", "Goldman Sachs", "Airbnb", "Salesforce", "Nvidia", "Atlassian", "Snowflake", "Databricks",
+]
+
+CODE_LANGUAGES = [
+    ("C++", "cpp"), ("Java", "java"), ("Python", "python"), ("Python3", "python3"), ("C", "c"), ("C#", "csharp"),
+    ("JavaScript", "javascript"), ("TypeScript", "typescript"), ("PHP", "php"), ("Swift", "swift"), ("Kotlin", "kotlin"),
+    ("Dart", "dart"), ("Go", "golang"), ("Ruby", "ruby"), ("Scala", "scala"), ("Rust", "rust"), ("Racket", "racket"),
+    ("Erlang", "erlang"), ("Elixir", "elixir"),
+]
+
+WORDS = (
+    "array integer return given string node tree graph minimum maximum number sum path index length "
+    "subarray sequence query operation element distinct pair value target edge vertex matrix cell grid "
+    "bitmask interval window prefix suffix order count valid"
+).split()
+
+def _format_count(value):
+    """Format a count the way LeetCode's stats strings do, e.g. 1.2M or 345.6K"""
+    if value >= 1000000:
+        return f"{value / 1000000:.1f}M"
+    if value >= 1000:
+        return f"{value / 1000:.1f}K"
+    return str(value)
+
+def _slug(problem_id):
+    return f"synthetic-problem-{problem_id}"
+
+def _content(rng, size):
+    """HTML problem statement with example and constraints blocks, roughly `size` characters long"""
+    sentences = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+        sentences.append(f"<p>{sentence}</p>")
+        length += len(sentence) + 7
+    return (
+        "\n".join(sentences)
+        + "\n<p><strong class=\"example\">Example 1:</strong></p>\n<pre><strong>Input:</strong> nums = [1,2,3]\n"
+        + "<strong>Output:</strong> 6</pre>\n<p><strong>Constraints:</strong></p>\n<ul>\n"
+        + "\t<li><code>1 &lt;= nums.length &lt;= 10<sup>5</sup></code></li>\n</ul>\n"
+    )
+
+def generate_problem(problem_id, count, rng, content_size=2000, snippet_languages=len(CODE_LANGUAGES)):
+    """Generate one raw problem in the format returned by the questionData query"""
+    submissions = int(rng.lognormvariate(11, 1.5)) + 10
+    accepted = int(submissions * rng.uniform(0.2, 0.8))
+    difficulty = rng.choices(["Easy", "Medium", "Hard"], weights=[25, 52, 23])[0]
+    tags = rng.sample(TOPIC_TAGS, rng.randint(1, 5))
+    # Same shape extract_company_tags reads: a list of {"name", "slug", "frequency"}
+    companies = [
+        {"name": name, "slug": name.lower().replace(" ", "-"), "frequency": rng.randint(1, 60)}
+        for name in rng.sample(COMPANIES, rng.randint(0, 6))
+    ]
+    similar_ids = rng.sample(range(1, count + 1), min(count, rng.randint(0, 4)))
+    similar_questions = [
+        {"title": f"Synthetic Problem {other}", "titleSlug": _slug(other),
+         "difficulty": rng.choice(["Easy", "Medium", "Hard"]), "translatedTitle": None}
+        for other in similar_ids if other != problem_id
+    ]
+    stats = {
+        "totalAccepted": _format_count(accepted),
+        "totalSubmission": _format_count(submissions),
+        "totalAcceptedRaw": accepted,
+        "totalSubmissionRaw": submissions,
+        "acRate": f"{100 * accepted / submissions:.1f}%",
+    }
+    return {
+        "questionId": str(problem_id),
+        "questionFrontendId": str(problem_id),
+        "title": f"Synthetic Problem {problem_id}",
+        "titleSlug": _slug(problem_id),
+        "isPaidOnly": rng.random() < 0.15,
+        "content": _content(rng, content_size),
+        "difficulty": difficulty,
+        "stats": json.dumps(stats),
+        "companyTagStats": json.dumps(companies),
+        "topicTags": [{"name": name, "slug": slug} for name, slug in tags],
+        "similarQuestions": json.dumps(similar_questions),
+        "codeSnippets": [
+            {"lang": lang, "langSlug": lang_slug,
+             "code": f"class Solution {{\n    // {lang} starter code for problem {problem_id}\n}}\n"}
+            for lang, lang_slug in CODE_LANGUAGES[:snippet_languages]
+        ],
+        "sampleTestCase": "[1,2,3]",
+        "likes": int(rng.lognormvariate(6, 1.5)),
+        "dislikes": int(rng.lognormvariate(4, 1.5)),
+        "discussionCount": int(rng.lognormvariate(4, 1)),
+    }
+
+def generate_corpus(count, seed=0, content_size=2000, snippet_languages=len(CODE_LANGUAGES)):
+    """Generate `count` synthetic raw problems with IDs 1..count, deterministically for a seed"""
+    rng = random.Random(seed)
+    return [
+        generate_problem(problem_id, count, rng, content_size, snippet_languages)
+        for problem_id in range(1, count + 1)
+    ]
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic raw LeetCode problem corpus')
+    parser.add_argument('--count', type=int, default=3500, help='Number of problems')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--content-size', type=int, default=2000, help='Approximate HTML content length per problem')
+    parser.add_argument('--output', type=str, default='synthetic_problems.json', help='Output file (.json or .jsonl)')
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.count, args.seed, args.content_size)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        if args.output.endswith('.jsonl'):
+            for problem in corpus:
+                f.write(json.dumps(problem, ensure_ascii=False) + "\n")
+        else:
+            json.dump(corpus, f, ensure_ascii=False, indent=2)
+    print(f"Wrote {len(corpus)} synthetic problems to {args.output}")
+
+if __name__ == "__main__":
+    main()
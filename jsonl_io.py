@@ -0,0 +1,167 @@
+import json
+import os
+import time
+
+class JsonlWriter:
+    """Append records to a JSON Lines file as they arrive, so a crash loses at most the last record
+
+    Every record is flushed to the OS immediately. The file is fsynced every `fsync_every` records
+    or `fsync_interval` seconds, whichever comes first (fsync_every=0 disables fsync until close).
+    """
+    def __init__(self, path, append=False, fsync_every=50, fsync_interval=10.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        if append:
+            repair_jsonl_tail(path)
+        self.file = open(path, "a" if append else "w", encoding="utf-8")
+        self.count = 0
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False))
+        self.file.write("\n")
+        self.file.flush()
+        self.count += 1
+        self.unsynced += 1
+        if self.fsync_every and (self.unsynced >= self.fsync_every
+                                 or time.monotonic() - self.last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.flush()
+        self.sync()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class JsonArrayWriter:
+    """Write records to an indented JSON array one at a time, without holding them in memory"""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, record):
+        self.file.write("[\n" if self.count == 0 else ",\n")
+        # Same layout as json.dump(records, indent=2)
+        text = json.dumps(record, ensure_ascii=False, indent=2)
+        self.file.write("\n".join("  " + line for line in text.split("\n")))
+        self.count += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.write("\n]" if self.count else "[]")
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def repair_jsonl_tail(path):
+    """Truncate a partially written last line left behind by a crash"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        # Walk back to the last newline; anything after it is an incomplete record
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            f.seek(position - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != size:
+            print(f"Discarding {size - position} bytes of incomplete data at the end of {path}")
+            f.truncate(position)
+
+def iter_jsonl(path):
+    """Yield records from a JSON Lines file, skipping blank or incomplete lines"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                print(f"Skipping invalid line {line_number} in {path}: {e}")
+
+def compact_jsonl_to_json(jsonl_path, json_path):
+    """Write a JSON Lines file out as an indented JSON array, one record at a time"""
+    with JsonArrayWriter(json_path) as writer:
+        for record in iter_jsonl(jsonl_path):
+            writer.write(record)
+    print(f"Compacted {writer.count} records from {jsonl_path} into {json_path}")
+    return writer.count
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """Yield the elements of a JSON array file one at a time, reading it in chunks
+
+    Only the current chunk and the element being decoded are held in memory, so this works on
+    raw dumps much larger than RAM. Elements are expected to be JSON objects.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size)
+        position = len(buffer) - len(buffer.lstrip())
+        if buffer[position:position + 1] != "[":
+            raise ValueError(f"{path} does not contain a JSON array")
+        position += 1
+
+        while True:
+            # Skip whitespace and separators, reading more data as needed
+            while position >= len(buffer) or buffer[position] in " \t\r\n,":
+                if position >= len(buffer):
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        raise ValueError(f"Unexpected end of file in {path}")
+                    buffer, position = chunk, 0
+                else:
+                    position += 1
+            if buffer[position] == "]":
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element continues past the end of the buffer
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            yield record
+            position = end
+            if position > chunk_size:
+                buffer, position = buffer[position:], 0
+
+def iter_records(path):
+    """Yield records from a JSON Lines file, a JSON array file or a snapshot store manifest"""
+    if path.endswith((".jsonl.zst", ".jsonl.gz")):
+        from snapshot_store import iter_snapshot
+        return iter_snapshot(path)
+    if path.endswith(".jsonl"):
+        return iter_jsonl(path)
+    return iter_json_array(path)
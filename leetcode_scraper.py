@@ -1,11 +1,187 @@
 import requests
+import email.utils
+import functools
+import itertools
 import json
+import os
+import random
+import re
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from jsonl_io import JsonlWriter, iter_jsonl, iter_records, compact_jsonl_to_json
+from problem_catalog import ProblemCatalog
+from response_cache import DEFAULT_TTLS, ResponseCache, parse_ttl_args
+from scrape_metrics import ScrapeMetrics
+from session_store import SessionStore
+from snapshot_store import SnapshotStore
+from transform_data import ContentConverter, TransformPipeline
+from work_queue import DEFAULT_LEASE_SECONDS, WorkQueue, default_worker_id
+
+# GraphQL selection for each field of a problem detail, in the order they are requested
+DETAIL_FIELD_SELECTIONS = {
+    "questionId": "questionId",
+    "questionFrontendId": "questionFrontendId",
+    "title": "title",
+    "titleSlug": "titleSlug",
+    "isPaidOnly": "isPaidOnly",
+    "content": "content",
+    "difficulty": "difficulty",
+    "stats": "stats",
+    "companyTagStats": "companyTagStats",
+    "topicTags": """topicTags {
+              name
+              slug
+            }""",
+    "similarQuestions": "similarQuestions",
+    "codeSnippets": """codeSnippets {
+              lang
+              langSlug
+              code
+            }""",
+    "sampleTestCase": "sampleTestCase",
+    "likes": "likes",
+    "dislikes": "dislikes",
+    "discussionCount": "discussionCount",
+}
+
+# Fields that are only populated for LeetCode Premium sessions
+PREMIUM_ONLY_FIELDS = {"companyTagStats"}
+
+# Fields every profile needs to identify problems and to support incremental scrapes
+BASE_DETAIL_FIELDS = ["questionId", "questionFrontendId", "title", "titleSlug", "isPaidOnly", "difficulty"]
+
+# Named query profiles selectable with --profile; "snippets:python3,cpp" keeps only those languages
+QUERY_PROFILES = {
+    "meta": BASE_DETAIL_FIELDS + ["topicTags", "similarQuestions"],
+    "stats": BASE_DETAIL_FIELDS + ["topicTags", "stats", "companyTagStats", "likes", "dislikes", "discussionCount"],
+    "snippets": BASE_DETAIL_FIELDS + ["codeSnippets"],
+    "full": list(DETAIL_FIELD_SELECTIONS),
+}
+
+def build_detail_fields(profile="full", is_premium=True):
+    """Build the GraphQL selection set for a query profile
+    
+    Returns the selection string and the set of snippet languages to keep (None keeps all).
+    Premium-only fields are left out for non-premium sessions, since they come back empty.
+    """
+    name, _, languages = profile.partition(":")
+    if name not in QUERY_PROFILES:
+        raise ValueError(f"Unknown query profile {profile!r}, expected one of: {', '.join(QUERY_PROFILES)}")
+    
+    fields = [field for field in QUERY_PROFILES[name] if is_premium or field not in PREMIUM_ONLY_FIELDS]
+    selection = "".join(f"\n            {DETAIL_FIELD_SELECTIONS[field]}" for field in fields) + "\n          "
+    snippet_languages = {language.strip() for language in languages.split(",") if language.strip()} or None
+    return selection, snippet_languages
+
+def build_detail_query(fields):
+    """Build the single-problem questionData query for a selection set"""
+    return """
+        query questionData($titleSlug: String!) {
+          question(titleSlug: $titleSlug) {%s}
+        }
+        """ % fields
+
+# Incremental scrapes re-fetch problems whose details are older than this many seconds
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+# Batched detail responses larger than this make later batches smaller
+MAX_BATCH_RESPONSE_BYTES = 2 * 1024 * 1024
+
+# Status codes that mean the server is throttling us or temporarily unavailable
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket that limits requests per second across all workers"""
+    def __init__(self, rate, capacity=None):
+        # A rate of 0 or less disables rate limiting entirely
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request token is available"""
+        if self.rate <= 0:
+            return
+        
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+    
+    def set_rate(self, rate):
+        with self.lock:
+            self.rate = rate
+
+class AimdController:
+    """Additive-increase/multiplicative-decrease control of a TokenBucket's rate
+    
+    A throttled or failed request multiplies the rate by `decrease_factor`; every success adds
+    `max_rate / increase_steps` back, up to the configured maximum. Unlimited buckets are left alone.
+    Like TCP's once-per-window decrease, failures of requests sent before the last decrease do not
+    decrease the rate again, so a burst of throttled in-flight requests counts as one congestion event.
+    Updates are made under the bucket's lock, as they come from several worker threads at once.
+    """
+    def __init__(self, bucket, min_rate=0.05, decrease_factor=0.5, increase_steps=20, log=print):
+        self.bucket = bucket
+        self.log = log
+        self.max_rate = bucket.rate
+        self.min_rate = min(min_rate, self.max_rate)
+        self.decrease_factor = decrease_factor
+        self.increase = self.max_rate / increase_steps
+        self.last_decrease = float("-inf")
+    
+    def on_success(self):
+        if self.max_rate <= 0:
+            return
+        with self.bucket.lock:
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.increase)
+    
+    def on_failure(self, sent_at=None):
+        """Decrease the rate for a request that failed; sent_at is its time.perf_counter() send time"""
+        if self.max_rate <= 0:
+            return
+        with self.bucket.lock:
+            if sent_at is not None and sent_at < self.last_decrease:
+                return
+            old_rate = self.bucket.rate
+            self.bucket.rate = max(self.min_rate, old_rate * self.decrease_factor)
+            self.last_decrease = time.perf_counter()
+            new_rate = self.bucket.rate
+        if new_rate < old_rate:
+            self.log(f"Server is throttling, reducing request rate to {new_rate:.2f} rps")
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
 
 class LeetcodeScraper:
-    def __init__(self, username=None, password=None, session_id=None):
-        self.base_url = "https://leetcode.com"
+    def __init__(self, username=None, password=None, session_id=None, concurrency=1, rps=1.0, batch_size=1,
+                 cache=None, max_retries=4, backoff_base=1.0, backoff_max=60.0, profile="full",
+                 base_url="https://leetcode.com", metrics=None, quiet=False, catalog_file=None,
+                 catalog_ttl=DEFAULT_TTLS["allQuestions"], session_store=None):
+        self.base_url = base_url.rstrip("/")
         self.graphql_url = f"{self.base_url}/graphql"
         self.login_url = f"{self.base_url}/accounts/login/"
         self.headers = {
@@ -14,19 +190,120 @@ class LeetcodeScraper:
         }
         self.session = requests.Session()
         
+        # Concurrent fetching: at most `concurrency` requests in flight, `rps` requests per second overall
+        self.concurrency = max(1, concurrency)
+        # Per-request details are only printed when not quiet; aggregate numbers always go to metrics
+        self.quiet = quiet
+        self.metrics = metrics or ScrapeMetrics()
+        self.rate_limiter = TokenBucket(rps)
+        self.rate_controller = AimdController(self.rate_limiter, log=self.log)
+        # Throttled or failed requests are retried with exponential backoff and jitter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Problems that still failed after retries, waiting for another attempt at the end of the run
+        self.retry_queue = []
+        self.failed_problems = []
+        # Number of problems requested per aliased GraphQL query (1 disables batching)
+        self.batch_size = max(1, batch_size)
+        # Optional persistent ResponseCache for the problem list and problem details
+        self.cache = cache
+        # Indexed problem list, persisted to catalog_file (if given) and rebuilt after catalog_ttl seconds
+        self.catalog = None
+        self.catalog_file = catalog_file
+        self.catalog_ttl = catalog_ttl
+        if self.concurrency > 10:
+            # The default connection pool only keeps 10 connections per host
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        
+        # Optional SessionStore that lets later runs skip the login flow and the premium check
+        self.session_store = session_store
+        self.session_identity = SessionStore.identity(username, session_id)
+        self.session_restored = False
+        self.auth_lock = threading.Lock()
+        self.csrf_token = None
+        self.username = None
+        self.authenticate(username, password, session_id)
+        
+        # The detail selection set depends on the profile and on whether premium fields are available
+        self.set_profile(profile)
+    
+    def authenticate(self, username=None, password=None, session_id=None, use_store=True, reauthenticating=False):
+        """Authenticate with a session ID or credentials, reusing a stored session when one is valid
+        
+        With reauthenticating=True (replacing a rejected stored session), a rejected premium check
+        raises RuntimeError instead of triggering another re-authentication.
+        """
+        self.credentials = (username, password, session_id)
+        if use_store and self.session_store and self.session_identity and self.restore_session():
+            return
+        
         # Apply existing session cookie if provided
         if session_id:
             self.headers["Cookie"] = f"LEETCODE_SESSION={session_id}"
             self.session.cookies.set("LEETCODE_SESSION", session_id, domain="leetcode.com", path="/")
             print("Using provided session ID for authentication")
-            self.is_premium = self.check_premium_status()
+            self.is_premium = self.check_premium_status(reauthenticating)
         # Log in if credentials are provided
         elif username and password:
-            self.login(username, password)
-            self.is_premium = self.check_premium_status()
+            if not self.login(username, password):
+                self.is_premium = False
+                return
+            self.is_premium = self.check_premium_status(reauthenticating)
         else:
             print("No authentication credentials provided. Running in anonymous mode.")
             self.is_premium = False
+            return
+        
+        if self.session_store and self.username:
+            self.session_store.save(self.session_identity, self.base_url, self.session.cookies,
+                                    headers_cookie=self.headers.get("Cookie"), csrf_token=self.csrf_token,
+                                    username=self.username, is_premium=self.is_premium)
+    
+    def restore_session(self):
+        """Load cookies, CSRF token and premium status from the session store without any requests"""
+        data = self.session_store.load(self.session_identity, self.base_url)
+        if data is None:
+            return False
+        SessionStore.restore_cookies(data, self.session.cookies)
+        if data.get("headers_cookie"):
+            self.headers["Cookie"] = data["headers_cookie"]
+        self.csrf_token = data.get("csrf_token")
+        self.username = data.get("username")
+        self.is_premium = data.get("is_premium", False)
+        self.session_restored = True
+        remaining = (data["expires_at"] - time.time()) / 3600
+        print(f"Reusing stored session for {self.username} "
+              f"({'with' if self.is_premium else 'without'} Premium, expires in {remaining:.0f}h)")
+        return True
+    
+    def _handle_rejected_session(self):
+        """Drop a stored session the server no longer accepts and authenticate again
+        
+        Returns True if the request should be retried with the new session.
+        """
+        with self.auth_lock:
+            # Concurrent requests may all be rejected; only the first one authenticates again
+            if not self.session_restored:
+                return False
+            print("Stored session was rejected, authenticating again")
+            self.session_restored = False
+            self.session_store.invalidate()
+            self.session.cookies.clear()
+            self.headers.pop("Cookie", None)
+            was_premium = self.is_premium
+            self.authenticate(*self.credentials, use_store=False, reauthenticating=True)
+            if self.is_premium != was_premium:
+                self.set_profile(self.profile)
+            return True
+    
+    def set_profile(self, profile):
+        """Select the query profile used for problem details (e.g. "meta", "stats", "full", "snippets:cpp")"""
+        self.profile = profile
+        self.detail_fields, self.snippet_languages = build_detail_fields(profile, self.is_premium)
+        self.detail_query = build_detail_query(self.detail_fields)
     
     def login(self, username, password):
         """Log in to LeetCode with the provided credentials"""
@@ -51,6 +328,7 @@ class LeetcodeScraper:
         
         if not csrf_token:
             print("Could not find CSRF token, login will likely fail")
+        self.csrf_token = csrf_token
         
         # Prepare login data
         login_data = {
@@ -87,8 +365,64 @@ class LeetcodeScraper:
             print("Login failed!")
             return False
             
-    def check_premium_status(self):
-        """Check if the current user has LeetCode Premium"""
+    def log(self, message):
+        """Print per-request progress details unless running in quiet mode"""
+        if not self.quiet:
+            print(message)
+    
+    def _post_graphql(self, payload, reauthenticate=True):
+        """POST a GraphQL payload once the rate limiter allows it, retrying throttled and failed requests
+        
+        Returns the last response, or raises the last requests exception once retries are exhausted.
+        With reauthenticate=False, a 401/403 is returned as is instead of replacing a stored session.
+        """
+        query_name = ResponseCache.query_name(payload.get("query", ""))
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.metrics.record_retry()
+            self.rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.post(self.graphql_url, headers=self.headers, json=payload)
+            except requests.RequestException as e:
+                self.metrics.record_request(query_name, None, time.perf_counter() - started)
+                self.rate_controller.on_failure(started)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                self.log(f"Request error: {e}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            
+            self.metrics.record_request(query_name, response.status_code, time.perf_counter() - started,
+                                        len(response.content))
+            if (response.status_code in (401, 403) and reauthenticate and self._handle_rejected_session()
+                    and attempt < self.max_retries):
+                continue
+            if response.status_code not in RETRY_STATUS_CODES:
+                self.rate_controller.on_success()
+                return response
+            
+            self.rate_controller.on_failure(started)
+            if attempt == self.max_retries:
+                return response
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = self._backoff_delay(attempt)
+            self.log(f"Received status {response.status_code}, retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 1} of {self.max_retries})")
+            time.sleep(delay)
+    
+    def _backoff_delay(self, attempt):
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+    
+    def check_premium_status(self, reauthenticating=False):
+        """Check if the current user has LeetCode Premium
+        
+        While replacing a rejected stored session, a rejected check raises RuntimeError, since the
+        credentials themselves are no longer accepted.
+        """
         query = """
         query {
           userStatus {
@@ -103,12 +437,21 @@ class LeetcodeScraper:
         }
         
         try:
-            response = self.session.post(self.graphql_url, headers=self.headers, json=payload)
-            if response.status_code == 200:
+            response = self._post_graphql(payload, reauthenticate=not reauthenticating)
+        except Exception as e:
+            print(f"Error checking premium status: {e}")
+            response = None
+        if reauthenticating and response is not None and response.status_code in (401, 403):
+            raise RuntimeError(f"Authentication was rejected (status {response.status_code}); "
+                               f"check the session ID or credentials")
+        
+        try:
+            if response is not None and response.status_code == 200:
                 data = response.json()
                 if "data" in data and "userStatus" in data["data"]:
                     is_premium = data["data"]["userStatus"].get("isPremium", False)
                     username = data["data"]["userStatus"].get("username", "Anonymous")
+                    self.username = username
                     if is_premium:
                         print(f"Logged in as {username} with Premium subscription")
                     else:
@@ -120,8 +463,8 @@ class LeetcodeScraper:
         print("Could not verify premium status, assuming non-premium")
         return False
     
-    def get_all_problems(self):
-        """Get basic information for all problems"""
+    def get_all_problems(self, refresh=False):
+        """Get basic information for all problems (refresh=True bypasses the cached list)"""
         # Use allQuestions query, which is currently available in the API
         query = """
         query {
@@ -140,191 +483,625 @@ class LeetcodeScraper:
             "query": query
         }
         
-        print(f"Fetching problem list...")
-        response = self.session.post(self.graphql_url, headers=self.headers, json=payload)
+        if self.cache and not refresh:
+            cached = self.cache.get(query)
+            if cached is not None:
+                print(f"Retrieved {len(cached)} problems from cache")
+                return cached
         
-        print(f"Problem list response status code: {response.status_code}")
+        self.log(f"Fetching problem list...")
+        response = self._post_graphql(payload)
+        
+        self.log(f"Problem list response status code: {response.status_code}")
         
         if response.status_code == 200:
             try:
                 data = response.json()
-                print(f"Response data structure: {list(data.keys())}")
+                self.log(f"Response data structure: {list(data.keys())}")
                 
                 # Check if the response contains the data
                 if "data" in data and data["data"] is not None and "allQuestions" in data["data"]:
                     questions = data["data"]["allQuestions"]
                     print(f"Retrieved {len(questions)} problems")
+                    if self.cache and questions:
+                        self.cache.set(query, None, questions)
                     return questions
                 else:
                     print(f"Problem list data not found in response")
-                    print(f"Response content: {json.dumps(data, indent=2)[:500]}...")
+                    self.log(f"Response content: {json.dumps(data, indent=2)[:500]}...")
                     return []
             except Exception as e:
                 print(f"Error parsing response data: {e}")
-                print(f"Raw response content: {response.text[:500]}...")
+                self.log(f"Raw response content: {response.text[:500]}...")
                 return []
         else:
             print(f"Failed to fetch problem list: {response.status_code}")
-            print(f"Response content: {response.text[:500]}...")
+            self.log(f"Response content: {response.text[:500]}...")
             return []
     
-    def get_problem_detail(self, title_slug):
-        """Get detailed information for a single problem"""
-        query = """
-        query questionData($titleSlug: String!) {
-          question(titleSlug: $titleSlug) {
-            questionId
-            questionFrontendId
-            title
-            titleSlug
-            content
-            difficulty
-            stats
-            companyTagStats
-            topicTags {
-              name
-              slug
-            }
-            similarQuestions
-            codeSnippets {
-              lang
-              langSlug
-              code
-            }
-            sampleTestCase
-            likes
-            dislikes
-            discussionCount
-          }
-        }
+    def get_catalog(self, refresh=False):
+        """Return the indexed problem catalog, loading it from disk or building it from the problem list
+        
+        refresh=True rebuilds it from a freshly fetched list, bypassing both the catalog file and the
+        cached allQuestions response.
+        """
+        if not refresh and self.catalog is not None and self.catalog.age() <= self.catalog_ttl:
+            return self.catalog
+        if not refresh and self.catalog_file:
+            catalog = ProblemCatalog.load(self.catalog_file, max_age=self.catalog_ttl, source=self.base_url)
+            if catalog is not None:
+                print(f"Loaded catalog of {len(catalog)} problems from {self.catalog_file}")
+                self.catalog = catalog
+                return catalog
+        
+        all_problems = self.get_all_problems(refresh=refresh)
+        if not all_problems:
+            return None
+        self.catalog = ProblemCatalog(all_problems)
+        if self.catalog_file:
+            try:
+                self.catalog.save(self.catalog_file, source=self.base_url)
+            except OSError as e:
+                print(f"Could not save problem catalog to {self.catalog_file}: {e}")
+        return self.catalog
+    
+    def _cached_detail(self, title_slug):
+        """Return cached details for a problem, or None if caching is off or the entry is missing"""
+        if not self.cache:
+            return None
+        return self._apply_profile(self.cache.get(self.detail_query, {"titleSlug": title_slug}))
+    
+    def _cache_detail(self, title_slug, detail):
+        """Store problem details under the single-problem query so batched and single fetches share entries
+        
+        Details are cached with every snippet language; the profile's language filter is applied on
+        the way out, so profiles that only differ in their languages can share entries.
         """
+        if self.cache and detail:
+            self.cache.set(self.detail_query, {"titleSlug": title_slug}, detail)
+    
+    def _finish_detail(self, detail):
+        """Record when the details were fetched"""
+        if detail:
+            # Used for staleness checks in incremental scrapes
+            detail["fetchedAt"] = datetime.now().isoformat(timespec="seconds")
+        return detail
+    
+    def _apply_profile(self, detail):
+        """Return a copy of cached or fetched details filtered to the profile's snippet languages
         
+        The copy is stamped with the profile, so incremental scrapes can tell which field set a
+        carried-over record has.
+        """
+        if not detail:
+            return detail
+        detail = dict(detail, queryProfile=self.profile)
+        if self.snippet_languages and detail.get("codeSnippets"):
+            detail["codeSnippets"] = [
+                snippet for snippet in detail["codeSnippets"] if snippet.get("langSlug") in self.snippet_languages
+            ]
+        return detail
+    
+    def get_problem_detail(self, title_slug, refresh=False):
+        """Get detailed information for a single problem, bypassing the cache if refresh is set"""
+        detail = None if refresh else self._cached_detail(title_slug)
+        if detail is not None:
+            self.log(f"Using cached problem details: {title_slug}")
+            return detail
+        return self._fetch_problem_detail(title_slug)
+    
+    def _fetch_problem_detail(self, title_slug):
+        """Request detailed information for a single problem from the API"""
         variables = {
             "titleSlug": title_slug
         }
         
         payload = {
-            "query": query,
+            "query": self.detail_query,
             "variables": variables
         }
         
-        print(f"Fetching problem details: {title_slug}")
-        response = self.session.post(self.graphql_url, headers=self.headers, json=payload)
+        self.log(f"Fetching problem details: {title_slug}")
+        try:
+            response = self._post_graphql(payload)
+        except requests.RequestException as e:
+            self.log(f"Failed to fetch problem detail: {e}")
+            return None
         
-        print(f"Problem detail response status code: {response.status_code}")
+        self.log(f"Problem detail response status code: {response.status_code}")
         
         if response.status_code == 200:
             try:
                 data = response.json()
                 if "data" in data and data["data"] is not None and "question" in data["data"]:
-                    return data["data"]["question"]
+                    detail = self._finish_detail(data["data"]["question"])
+                    self._cache_detail(title_slug, detail)
+                    return self._apply_profile(detail)
                 else:
-                    print(f"Problem details not found in response")
-                    print(f"Response content: {json.dumps(data, indent=2)[:500]}...")
+                    self.log(f"Problem details not found in response")
+                    self.log(f"Response content: {json.dumps(data, indent=2)[:500]}...")
                     return None
             except Exception as e:
-                print(f"Error parsing problem detail response: {e}")
-                print(f"Raw response content: {response.text[:500]}...")
+                self.log(f"Error parsing problem detail response: {e}")
+                self.log(f"Raw response content: {response.text[:500]}...")
                 return None
         else:
-            print(f"Failed to fetch problem detail: {response.status_code}")
-            print(f"Response content: {response.text[:500]}...")
+            self.log(f"Failed to fetch problem detail: {response.status_code}")
+            self.log(f"Response content: {response.text[:500]}...")
             return None
     
+    def _fetch_detail_batch(self, title_slugs):
+        """Fetch one aliased questionData query, returning a dict of slug -> detail (None if missing)"""
+        variable_defs = ", ".join(f"$slug{i}: String!" for i in range(len(title_slugs)))
+        selections = "".join(
+            f"\n          q{i}: question(titleSlug: $slug{i}) {{{self.detail_fields}}}"
+            for i in range(len(title_slugs))
+        )
+        payload = {
+            "query": f"query questionData({variable_defs}) {{{selections}\n        }}",
+            "variables": {f"slug{i}": slug for i, slug in enumerate(title_slugs)}
+        }
+        
+        self.log(f"Fetching problem details batch of {len(title_slugs)}: {title_slugs[0]} ... {title_slugs[-1]}")
+        results = dict.fromkeys(title_slugs)
+        try:
+            response = self._post_graphql(payload)
+        except requests.RequestException as e:
+            self.log(f"Failed to fetch problem detail batch: {e}")
+            return results
+        
+        self.log(f"Problem detail batch response status code: {response.status_code}")
+        
+        if response.status_code != 200:
+            self.log(f"Failed to fetch problem detail batch: {response.status_code}")
+            self.log(f"Response content: {response.text[:500]}...")
+            return results
+        
+        if len(response.content) > MAX_BATCH_RESPONSE_BYTES and self.batch_size > 1:
+            self.batch_size = max(1, self.batch_size // 2)
+            self.log(f"Batch response was {len(response.content)} bytes, reducing batch size to {self.batch_size}")
+        
+        try:
+            data = response.json()
+        except Exception as e:
+            self.log(f"Error parsing problem detail batch response: {e}")
+            self.log(f"Raw response content: {response.text[:500]}...")
+            return results
+        
+        if data.get("errors"):
+            self.log(f"Batch response reported {len(data['errors'])} errors")
+        questions = data.get("data") or {}
+        for i, slug in enumerate(title_slugs):
+            detail = self._finish_detail(questions.get(f"q{i}"))
+            self._cache_detail(slug, detail)
+            results[slug] = self._apply_profile(detail)
+        return results
+    
+    def get_problem_details(self, title_slugs, batch_size=None, refresh=False):
+        """Get detailed information for several problems, batching them into aliased queries
+        
+        Returns a dict mapping each slug to its details, or None if it could not be fetched.
+        Batches with missing entries are retried as smaller batches, down to single queries.
+        Cached details are used unless refresh is set.
+        """
+        batch_size = batch_size or self.batch_size
+        results = {}
+        for title_slug in ([] if refresh else title_slugs):
+            detail = self._cached_detail(title_slug)
+            if detail is not None:
+                results[title_slug] = detail
+        if results:
+            self.log(f"Using cached details for {len(results)} of {len(title_slugs)} problems")
+        
+        missing = [title_slug for title_slug in title_slugs if title_slug not in results]
+        for i in range(0, len(missing), batch_size):
+            results.update(self._fetch_details_with_fallback(missing[i:i + batch_size]))
+        return results
+    
+    def _fetch_details_with_fallback(self, title_slugs):
+        """Fetch a batch of details, splitting it in half on failed or partial responses"""
+        if len(title_slugs) == 1:
+            return {title_slugs[0]: self._fetch_problem_detail(title_slugs[0])}
+        
+        results = self._fetch_detail_batch(title_slugs)
+        missing = [slug for slug in title_slugs if results[slug] is None]
+        if missing:
+            self.log(f"{len(missing)} of {len(title_slugs)} problems missing from batch, retrying in smaller batches")
+            half = (len(missing) + 1) // 2
+            results.update(self._fetch_details_with_fallback(missing[:half]))
+            if missing[half:]:
+                results.update(self._fetch_details_with_fallback(missing[half:]))
+        return results
+    
+    def _ordered_map(self, func, items):
+        """Apply func to items on a bounded thread pool, yielding results in input order"""
+        if self.concurrency <= 1:
+            for item in items:
+                yield func(item)
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                # Keep a small window of queued work so completed results don't pile up
+                if len(pending) >= self.concurrency * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _fetch_problem(self, problem, refresh=False):
+        """Fetch details for one entry of the problem list, returning None on failure"""
+        title = problem.get("title", "Unknown Problem")
+        title_slug = problem.get("titleSlug", "")
+        frontend_id = problem.get("questionFrontendId", "Unknown ID")
+        self.log(f"Fetching details for problem {frontend_id}: {title}")
+        
+        if not title_slug:
+            self.log(f"Problem {title} has no titleSlug, skipping")
+            return None
+        
+        detail = self.get_problem_detail(title_slug, refresh=refresh)
+        if detail:
+            self.log(f"Successfully fetched details for: {title}")
+        else:
+            self.log(f"Failed to fetch details for: {title}")
+        return detail
+    
+    def _fetch_problem_batch(self, problems, refresh=False):
+        """Fetch details for a batch of problem list entries, returning them in the same order"""
+        title_slugs = [problem.get("titleSlug") for problem in problems if problem.get("titleSlug")]
+        if len(problems) != len(title_slugs):
+            self.log(f"Skipping {len(problems) - len(title_slugs)} problems without titleSlug")
+        
+        results = self.get_problem_details(title_slugs, batch_size=len(title_slugs) or 1, refresh=refresh)
+        details = [results.get(problem.get("titleSlug")) for problem in problems]
+        for problem, detail in zip(problems, details):
+            if problem.get("titleSlug") and not detail:
+                self.log(f"Failed to fetch details for: {problem.get('titleSlug')}")
+        self.log(f"Successfully fetched details for {len(details) - details.count(None)} of {len(problems)} problems in batch")
+        return details
+    
+    def _iter_fetch_results(self, problems, refresh=False):
+        """Yield (problem, detail) for every given problem in input order, with detail None on failure"""
+        if self.batch_size <= 1:
+            fetch = functools.partial(self._fetch_problem, refresh=refresh)
+            yield from zip(problems, self._ordered_map(fetch, problems))
+            return
+        
+        def fetch(batch):
+            return batch, self._fetch_problem_batch(batch, refresh=refresh)
+        for batch, details in self._ordered_map(fetch, self._iter_batches(problems)):
+            yield from zip(batch, details)
+    
+    def _iter_batches(self, problems):
+        """Cut the next batch only when it is needed, so a batch size reduced after an oversized
+        response applies to the rest of the run (beyond the batches already queued for the pool)"""
+        start = 0
+        while start < len(problems):
+            batch = problems[start:start + self.batch_size]
+            start += len(batch)
+            yield batch
+    
+    def iter_problem_details(self, problems, refresh=False):
+        """Yield detailed information for the given problems, in the same order as the input
+        
+        Problems that fail are added to the retry queue; see iter_retry_queue.
+        """
+        for problem, detail in self._iter_fetch_results(problems, refresh=refresh):
+            if detail:
+                self.metrics.increment("problems_fetched")
+                yield detail
+            elif problem.get("titleSlug"):
+                self.metrics.increment("fetch_failures")
+                self.retry_queue.append(problem)
+    
+    def iter_retry_queue(self, rounds=2, delay=30.0):
+        """Retry queued failures at the end of a run, yielding details as they are recovered
+        
+        Each round waits `delay` seconds first so the server can recover. Problems that fail every
+        round are left in failed_problems.
+        """
+        for round_number in range(1, rounds + 1):
+            if not self.retry_queue:
+                break
+            problems, self.retry_queue = self.retry_queue, []
+            print(f"Retrying {len(problems)} failed problems in {delay:.0f}s (round {round_number} of {rounds})")
+            time.sleep(delay)
+            yield from self.iter_problem_details(problems, refresh=True)
+        
+        self.failed_problems.extend(self.retry_queue)
+        self.metrics.increment("problems_failed", len(self.retry_queue))
+        self.retry_queue = []
+        if self.failed_problems:
+            print(f"Could not fetch {len(self.failed_problems)} problems: "
+                  f"{', '.join(problem.get('titleSlug') for problem in self.failed_problems)}")
+    
+    def work(self, queue, worker_id=None, lease_size=None, lease_seconds=DEFAULT_LEASE_SECONDS, poll_interval=15.0):
+        """Fetch problems leased from a shared WorkQueue until nothing is left to lease
+        
+        Each detail is stored in the queue as soon as it arrives; problems that fail are handed back
+        for another attempt (by any worker). While other workers still hold leases, this worker
+        keeps polling so it can pick up leases that expire. Returns the number of problems fetched.
+        """
+        worker_id = worker_id or default_worker_id()
+        # Enough work to keep every connection busy, without holding leases much longer than needed
+        lease_size = lease_size or max(10, 2 * self.concurrency * self.batch_size)
+        fetched = 0
+        print(f"Worker {worker_id} leasing {lease_size} problems at a time from {queue.path}")
+        while True:
+            leased = queue.lease(worker_id, lease_size, lease_seconds)
+            if not leased:
+                counts = queue.counts()
+                if not counts["leased"]:
+                    break
+                self.log(f"Waiting for {counts['leased']} problems leased by other workers")
+                time.sleep(poll_interval)
+                continue
+            
+            positions = {problem["titleSlug"]: position for position, problem in leased}
+            renewed_at = time.monotonic()
+            for detail in self.iter_problem_details([problem for _, problem in leased]):
+                queue.complete(worker_id, positions.pop(detail["titleSlug"]), detail)
+                fetched += 1
+                # Keep slow batches (e.g. under heavy throttling) from being handed to another worker
+                if time.monotonic() - renewed_at > lease_seconds / 2:
+                    queue.renew(worker_id, positions.values(), lease_seconds)
+                    renewed_at = time.monotonic()
+            for problem in self.retry_queue:
+                queue.fail(worker_id, positions[problem["titleSlug"]])
+            self.retry_queue = []
+            
+            counts = queue.counts()
+            print(f"Worker {worker_id}: {fetched} fetched; queue has {counts['done']} done, "
+                  f"{counts['pending'] + counts['leased']} remaining, {counts['failed']} failed")
+        return fetched
+    
+    def poll_new_problems(self, known_ids):
+        """Fetch the problem list and return entries whose questionId is not in known_ids, oldest first"""
+        all_problems = self.get_all_problems(refresh=True)
+        if not all_problems:
+            return []
+        new_problems = [problem for problem in all_problems if problem.get("questionId") not in known_ids]
+        new_problems.sort(key=lambda problem: int(problem.get("questionId") or 0))
+        if self.catalog is not None and new_problems:
+            # Keep library selections on this scraper in sync with the list just fetched
+            self.catalog = ProblemCatalog(all_problems)
+        return new_problems
+    
+    def fetch_problem_details(self, problems):
+        """Get detailed information for a list of problems from the problem list"""
+        print(f"Fetching details for {len(problems)} problems "
+              f"(concurrency={self.concurrency}, rps={self.rate_limiter.rate}, batch_size={self.batch_size})")
+        detailed_problems = list(self.iter_problem_details(problems))
+        detailed_problems.extend(self.iter_retry_queue())
+        print(f"Total detailed problems retrieved: {len(detailed_problems)}")
+        return detailed_problems
+    
     def save_to_json(self, data, filename):
         """Save data to a JSON file"""
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
         print(f"Data saved to {filename}")
     
-    def get_latest_problems(self, count=50):
-        """Get information for the latest problems"""
-        all_problems = self.get_all_problems()
+    def update_problems(self, previous_problems, problems, **update_options):
+        """Fetch details only for new, changed or stale problems and merge them with a previous snapshot"""
+        merged = list(self.iter_updated_problems(previous_problems, problems, **update_options))
+        merged.extend(self.iter_retry_queue())
+        return merged
+    
+    def iter_updated_problems(self, previous_problems, problems, max_age=DEFAULT_MAX_AGE, default_fetched_at=None):
+        """Yield a complete snapshot of the given problems, fetching only new, changed or stale details
         
-        if not all_problems:
-            print("No problem list retrieved, cannot get latest problems")
+        A problem is re-fetched when it is missing from the previous snapshot, when its questionId or
+        isPaidOnly flag differs from the problem list, when it was fetched with a different query profile
+        (and so has a different field set), or when its details are older than max_age seconds.
+        Details without a fetchedAt stamp are treated as fetched at default_fetched_at (a datetime), and
+        details without a queryProfile stamp as fetched with the "full" profile, the only one there was.
+        """
+        previous_by_slug = {problem.get("titleSlug"): problem for problem in previous_problems if problem}
+        now = datetime.now()
+        
+        to_fetch = []
+        counts = {"new": 0, "changed": 0, "profile": 0, "stale": 0}
+        for problem in problems:
+            previous = previous_by_slug.get(problem.get("titleSlug"))
+            if previous is None:
+                counts["new"] += 1
+            elif (previous.get("questionId") != problem.get("questionId")
+                  or previous.get("isPaidOnly", problem.get("isPaidOnly")) != problem.get("isPaidOnly")):
+                counts["changed"] += 1
+            elif previous.get("queryProfile", "full") != self.profile:
+                counts["profile"] += 1
+            else:
+                fetched_at = default_fetched_at
+                if previous.get("fetchedAt"):
+                    try:
+                        fetched_at = datetime.fromisoformat(previous["fetchedAt"])
+                    except ValueError:
+                        pass
+                if fetched_at is not None and (now - fetched_at).total_seconds() <= max_age:
+                    continue
+                counts["stale"] += 1
+            to_fetch.append(problem)
+        
+        print(f"Incremental update: {counts['new']} new, {counts['changed']} changed, "
+              f"{counts['profile']} from another profile, {counts['stale']} stale, "
+              f"{len(problems) - len(to_fetch)} unchanged problems")
+        
+        # Bypass the response cache, which may still hold the stale or changed details
+        fetch_results = self._iter_fetch_results(to_fetch, refresh=True)
+        to_fetch_ids = set(map(id, to_fetch))
+        
+        # Keep the problem list order; fall back to the previous details if a re-fetch failed
+        total = fetched = 0
+        for problem in problems:
+            detail = None
+            previous = previous_by_slug.get(problem.get("titleSlug"))
+            if previous is not None and previous.get("queryProfile", "full") != self.profile:
+                # Never carry a record with another profile's field set into this snapshot
+                previous = None
+            if id(problem) in to_fetch_ids:
+                _, detail = next(fetch_results)
+                fetched += detail is not None
+                self.metrics.increment("problems_fetched" if detail else "fetch_failures")
+                if detail is None and previous is None:
+                    # Nothing to carry over, so try again at the end of the run
+                    self.retry_queue.append(problem)
+            detail = detail or previous
+            if detail:
+                total += 1
+                yield detail
+        
+        print(f"Total detailed problems in snapshot: {total} ({fetched} fetched)")
+    
+    def _fetch_selection(self, problems, previous_problems=None, **update_options):
+        """Fetch all selected problems, or only what changed when a previous snapshot is given"""
+        if previous_problems is None:
+            return self.fetch_problem_details(problems)
+        return self.update_problems(previous_problems, problems, **update_options)
+    
+    def iter_selection(self, problems, previous_problems=None, **update_options):
+        """Streaming version of _fetch_selection that yields details as soon as they are available"""
+        if previous_problems is None:
+            print(f"Fetching details for {len(problems)} problems "
+                  f"(concurrency={self.concurrency}, rps={self.rate_limiter.rate}, batch_size={self.batch_size})")
+            return self.iter_problem_details(problems)
+        return self.iter_updated_problems(previous_problems, problems, **update_options)
+    
+    def get_latest_problems(self, count=50, previous_problems=None, difficulty=None, paid_only=None, **update_options):
+        """Get information for the latest problems"""
+        latest_problems = self.select_latest_problems(count, difficulty, paid_only)
+        if not latest_problems:
             return []
         
-        # Sort problems by ID to get the latest ones
-        try:
-            # Use questionId field for sorting
-            sorted_problems = sorted(all_problems, key=lambda x: int(x.get("questionId", "0")), reverse=True)
-            latest_problems = sorted_problems[:count]
-            print(f"Retrieved latest {len(latest_problems)} problems")
-        except Exception as e:
-            print(f"Error sorting problems: {e}")
-            print(f"Problem example: {json.dumps(all_problems[0], indent=2)}")
+        # Get detailed information
+        return self._fetch_selection(latest_problems, previous_problems, **update_options)
+    
+    def get_problems_by_id_range(self, start_id=2200, end_id=2800, previous_problems=None, difficulty=None,
+                                 paid_only=None, **update_options):
+        """Get problems with frontend IDs in a specific range"""
+        filtered_problems = self.select_problems_by_id_range(start_id, end_id, difficulty, paid_only)
+        if not filtered_problems:
             return []
         
         # Get detailed information
-        detailed_problems = []
-        for problem in latest_problems:
-            title = problem.get("title", "Unknown Problem")
-            title_slug = problem.get("titleSlug", "")
-            print(f"Fetching details for problem: {title}")
-            
-            if not title_slug:
-                print(f"Problem {title} has no titleSlug, skipping")
-                continue
-                
-            detail = self.get_problem_detail(title_slug)
-            if detail:
-                detailed_problems.append(detail)
-                print(f"Successfully fetched details for: {title}")
-            else:
-                print(f"Failed to fetch details for: {title}")
-            time.sleep(1)  # Avoid too frequent requests
+        return self._fetch_selection(filtered_problems, previous_problems, **update_options)
+    
+    def select_latest_problems(self, count=50, difficulty=None, paid_only=None):
+        """Get problem list entries for the latest problems, without fetching details
         
-        print(f"Total detailed problems retrieved: {len(detailed_problems)}")
-        return detailed_problems
+        difficulty may be a name or list of names; paid_only=True/False keeps only premium/free problems.
+        """
+        catalog = self.get_catalog()
+        
+        if not catalog:
+            print("No problem list retrieved, cannot get latest problems")
+            return []
+        
+        latest_problems = catalog.latest(count, difficulty, paid_only)
+        print(f"Retrieved latest {len(latest_problems)} problems")
+        return latest_problems
     
-    def get_problems_by_id_range(self, start_id=2200, end_id=2800):
-        """Get problems with frontend IDs in a specific range"""
-        all_problems = self.get_all_problems()
+    def select_problems_by_id_range(self, start_id=2200, end_id=2800, difficulty=None, paid_only=None):
+        """Get problem list entries with frontend IDs in a specific range, without fetching details
         
-        if not all_problems:
+        Problems are returned in frontend ID order. difficulty and paid_only filter as in select_latest_problems.
+        """
+        catalog = self.get_catalog()
+        
+        if not catalog:
             print("No problem list retrieved, cannot get problems by ID range")
             return []
         
-        # Filter problems by frontend ID in the specified range
+        filtered_problems = catalog.id_range(start_id, end_id, difficulty, paid_only)
+        print(f"Found {len(filtered_problems)} problems with IDs between {start_id} and {end_id}")
+        return filtered_problems
+
+def load_previous_snapshot(marker_file="latest_scrape_file.txt"):
+    """Load the snapshot named in the latest scrape marker file as incremental update options"""
+    try:
+        with open(marker_file, "r") as f:
+            filename = f.read().strip()
+        if filename.endswith(".jsonl"):
+            previous_problems = list(iter_jsonl(filename))
+        elif filename.endswith((".jsonl.zst", ".jsonl.gz")):
+            previous_problems = list(iter_records(filename))
+        else:
+            with open(filename, "r", encoding="utf-8") as f:
+                previous_problems = json.load(f)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"No usable previous snapshot ({e}), fetching all problems")
+        return {}
+    
+    print(f"Loaded {len(previous_problems)} problems from previous snapshot {filename}")
+    # Older snapshots have no fetchedAt stamps, so fall back to the file's modification time
+    return {
+        "previous_problems": previous_problems,
+        "default_fetched_at": datetime.fromtimestamp(os.path.getmtime(filename))
+    }
+
+def watch(scraper, dataset_file, interval=300.0, transform=True, metrics=None, prometheus_file=None):
+    """Poll the problem list every `interval` seconds and fetch details only for new problems
+    
+    New problems are appended to the JSON Lines dataset_file and, with transform=True, to
+    `<dataset>_transformed.jsonl` and `.csv` alongside it. Question IDs already in the dataset are
+    known at startup; with an empty dataset, the problems listed at startup are taken as known so
+    only problems published from then on are fetched; polling only starts once that list was fetched,
+    as an empty known set would make the whole catalog look new. Problems that fail are retried on the
+    next poll.
+    """
+    known_ids = {record.get("questionId") for record in iter_jsonl(dataset_file)} if os.path.exists(dataset_file) else set()
+    if not known_ids:
+        while not known_ids:
+            try:
+                known_ids = {problem.get("questionId") for problem in scraper.get_all_problems(refresh=True) or []}
+            except requests.RequestException as e:
+                print(f"Fetching the problem list failed: {e}")
+            if not known_ids:
+                print(f"Could not fetch the problem list to start watching; retrying in {interval:.0f}s")
+                time.sleep(interval)
+        print(f"Watching for problems published after the {len(known_ids)} currently listed")
+    else:
+        print(f"Watching for new problems; {len(known_ids)} already in {dataset_file}")
+    
+    base = dataset_file[:-len(".jsonl")] if dataset_file.endswith(".jsonl") else dataset_file
+    while True:
+        started = time.monotonic()
         try:
-            filtered_problems = []
-            for problem in all_problems:
+            new_problems = scraper.poll_new_problems(known_ids)
+            if new_problems:
+                print(f"{datetime.now():%Y-%m-%d %H:%M:%S} found {len(new_problems)} new problems: "
+                      f"{', '.join(problem.get('titleSlug') for problem in new_problems)}")
+                pipeline = None
+                if transform:
+                    pipeline = TransformPipeline(f"{base}_transformed.jsonl", f"{base}_transformed.csv", append=True)
                 try:
-                    frontend_id = int(problem.get("questionFrontendId", "0"))
-                    if start_id <= frontend_id <= end_id:
-                        filtered_problems.append(problem)
-                except ValueError:
-                    # Skip if frontend ID is not a number
-                    continue
-                    
-            print(f"Found {len(filtered_problems)} problems with IDs between {start_id} and {end_id}")
-        except Exception as e:
-            print(f"Error filtering problems by ID range: {e}")
-            return []
-        
-        # Get detailed information
-        detailed_problems = []
-        for problem in filtered_problems:
-            title = problem.get("title", "Unknown Problem")
-            title_slug = problem.get("titleSlug", "")
-            frontend_id = problem.get("questionFrontendId", "Unknown ID")
-            print(f"Fetching details for problem {frontend_id}: {title}")
-            
-            if not title_slug:
-                print(f"Problem {title} has no titleSlug, skipping")
-                continue
-                
-            detail = self.get_problem_detail(title_slug)
-            if detail:
-                detailed_problems.append(detail)
-                print(f"Successfully fetched details for: {title}")
+                    with JsonlWriter(dataset_file, append=True) as writer:
+                        for detail in scraper.iter_problem_details(new_problems, refresh=True):
+                            writer.write(detail)
+                            if pipeline:
+                                pipeline.write(detail)
+                            known_ids.add(detail.get("questionId"))
+                finally:
+                    if pipeline:
+                        pipeline.close()
+                if scraper.retry_queue:
+                    print(f"Will retry {len(scraper.retry_queue)} problems on the next poll")
+                    scraper.retry_queue = []
             else:
-                print(f"Failed to fetch details for: {title}")
-            time.sleep(1)  # Avoid too frequent requests
-        
-        print(f"Total detailed problems retrieved: {len(detailed_problems)}")
-        return detailed_problems
+                scraper.log(f"{datetime.now():%Y-%m-%d %H:%M:%S} no new problems")
+        except requests.RequestException as e:
+            print(f"Poll failed: {e}")
+        if metrics and prometheus_file:
+            metrics.write_prometheus(prometheus_file)
+        # Jitter keeps several watchers from polling in lockstep
+        time.sleep(max(0.0, interval * random.uniform(0.9, 1.1) - (time.monotonic() - started)))
 
 def main():
     import argparse
@@ -333,45 +1110,283 @@ def main():
     parser.add_argument('--username', type=str, help='LeetCode username')
     parser.add_argument('--password', type=str, help='LeetCode password')
     parser.add_argument('--session', type=str, help='LeetCode session ID (alternative to username/password)')
+    parser.add_argument('--session-file', type=str, default='.leetcode_session.json',
+                        help='Where to store the authenticated session between runs (owner-only permissions)')
+    parser.add_argument('--no-session-store', action='store_true',
+                        help='Always log in and check premium status instead of reusing a stored session')
     parser.add_argument('--start-id', type=int, default=2200, help='Start of problem ID range')
     parser.add_argument('--end-id', type=int, default=2210, help='End of problem ID range')
     parser.add_argument('--latest', type=int, help='Number of latest problems to fetch (alternative to ID range)')
+    parser.add_argument('--difficulty', type=str, nargs='+', choices=['Easy', 'Medium', 'Hard'],
+                        help='Only fetch problems of these difficulties')
+    paid_group = parser.add_mutually_exclusive_group()
+    paid_group.add_argument('--free-only', action='store_const', const=False, dest='paid_only',
+                            help='Only fetch problems that do not require a premium account')
+    paid_group.add_argument('--paid-only', action='store_const', const=True, dest='paid_only',
+                            help='Only fetch premium problems')
+    parser.add_argument('--base-url', type=str, default='https://leetcode.com',
+                        help='LeetCode base URL (e.g. a local mock server for benchmarks)')
+    parser.add_argument('--concurrency', type=int, default=1, help='Maximum number of detail requests in flight')
+    parser.add_argument('--rps', type=float, default=1.0, help='Global request rate limit in requests per second (0 disables)')
+    parser.add_argument('--batch-size', type=int, default=1, help='Number of problems fetched per batched GraphQL query')
+    parser.add_argument('--cache-dir', type=str, default='.leetcode_cache', help='Directory of the persistent response cache')
+    parser.add_argument('--cache-ttl', type=str, action='append',
+                        help='Cache TTL in seconds for all queries, or QUERY_NAME=SECONDS (repeatable)')
+    parser.add_argument('--cache-max-mb', type=int, default=512, help='Maximum size of the response cache in MB')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the persistent response cache')
+    parser.add_argument('--max-retries', type=int, default=4,
+                        help='Retries per request for throttled (429) or failing (5xx) responses')
+    parser.add_argument('--retry-rounds', type=int, default=2,
+                        help='Extra passes over problems that still failed, at the end of the run')
+    parser.add_argument('--retry-delay', type=float, default=30.0,
+                        help='Seconds to wait before each end-of-run retry pass')
+    parser.add_argument('--profile', type=str, default='full',
+                        help='Detail query profile: meta, stats, full, snippets or snippets:LANG1,LANG2')
+    parser.add_argument('--quiet', action='store_true',
+                        help='Replace per-problem output with a single progress line')
+    parser.add_argument('--metrics-json', type=str,
+                        help='Write the JSON run summary to this file instead of <output>.metrics.json '
+                             '(last_scrape.metrics.json without output; empty string disables)')
+    parser.add_argument('--prometheus-file', type=str,
+                        help='Also write run metrics in Prometheus textfile collector format')
+    role_group = parser.add_mutually_exclusive_group()
+    role_group.add_argument('--coordinator', action='store_true',
+                            help='Add the selected problems to the shared work queue instead of fetching them')
+    role_group.add_argument('--worker', action='store_true',
+                            help='Fetch problems leased from the work queue (run several, each with its own session)')
+    role_group.add_argument('--merge', action='store_true',
+                            help='Write the details collected in the work queue to the usual output files')
+    parser.add_argument('--queue', type=str, default='leetcode_queue.sqlite3', help='Shared work queue file')
+    parser.add_argument('--worker-id', type=str, help='Name of this worker in the queue (defaults to host-pid)')
+    parser.add_argument('--lease-size', type=int, help='Problems leased per round by a worker')
+    parser.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS,
+                        help='Seconds before problems leased by an unresponsive worker are handed out again')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running, poll the problem list and fetch only newly published problems')
+    parser.add_argument('--poll-interval', type=float, default=300.0, help='Seconds between polls in --watch mode')
+    parser.add_argument('--watch-file', type=str, default='leetcode_watch.jsonl',
+                        help='JSON Lines dataset that --watch appends new problems to')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fetch new, changed or stale problems since the last scrape')
+    parser.add_argument('--max-age-days', type=float, default=DEFAULT_MAX_AGE / 86400,
+                        help='Re-fetch problems whose details are older than this in incremental mode')
+    parser.add_argument('--jsonl', type=str,
+                        help='Partial JSON Lines file that details are appended to as they arrive')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted scrape, skipping problems already in the partial file')
+    parser.add_argument('--fsync-every', type=int, default=50,
+                        help='fsync the partial file after this many problems (0 only syncs at the end)')
+    parser.add_argument('--no-json', action='store_true',
+                        help='Keep the JSON Lines output instead of compacting it into an indented JSON array')
+    parser.add_argument('--snapshot-store', type=str, metavar='DIR',
+                        help='Save the raw output into a deduplicating, compressed snapshot store instead of a JSON file')
+    parser.add_argument('--transform', action='store_true',
+                        help='Also write transformed JSON and CSV files while scraping (or watching)')
+    parser.add_argument('--no-raw', action='store_true',
+                        help='Skip the raw output (only useful with --transform; disables --resume)')
     
     args = parser.parse_args()
     
+    if args.no_raw and not args.transform:
+        parser.error("--no-raw requires --transform")
+    if args.snapshot_store and (args.no_json or args.no_raw):
+        parser.error("--snapshot-store cannot be combined with --no-json or --no-raw")
+    if args.merge and args.resume:
+        parser.error("--resume cannot be used with --merge; merging again rewrites the output from the queue")
+    if args.incremental and (args.coordinator or args.worker or args.merge):
+        parser.error("--incremental is not supported with the work queue")
+    if args.watch and (args.coordinator or args.worker or args.merge or args.incremental):
+        parser.error("--watch cannot be combined with --coordinator, --worker, --merge or --incremental")
+    
+    try:
+        build_detail_fields(args.profile)
+        default_ttl, ttls = parse_ttl_args(args.cache_ttl)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    cache = None
+    catalog_options = {}
+    if not args.no_cache:
+        cache = ResponseCache(
+            cache_dir=args.cache_dir,
+            ttls=ttls,
+            default_ttl=default_ttl if default_ttl is not None else 24 * 3600,
+            max_bytes=args.cache_max_mb * 1024 * 1024
+        )
+        # The catalog is derived from the problem list, so it expires with it
+        catalog_options = {
+            "catalog_file": os.path.join(args.cache_dir, "problem_catalog.json"),
+            "catalog_ttl": cache.ttls["allQuestions"]
+        }
+    
+    metrics = ScrapeMetrics()
+    
     # Initialize scraper with authentication if provided
     scraper = LeetcodeScraper(
         username=args.username,
         password=args.password,
-        session_id=args.session
+        session_id=args.session,
+        concurrency=args.concurrency,
+        rps=args.rps,
+        batch_size=args.batch_size,
+        cache=cache,
+        max_retries=args.max_retries,
+        profile=args.profile,
+        base_url=args.base_url,
+        metrics=metrics,
+        quiet=args.quiet,
+        session_store=None if args.no_session_store else SessionStore(args.session_file),
+        **catalog_options
     )
     
     print("Starting LeetCode Problem Scraper...")
     
+    queue = WorkQueue(args.queue) if args.coordinator or args.worker or args.merge else None
+    # The run summary goes next to the output once its name is known
+    metrics_file = args.metrics_json if args.metrics_json is not None else "last_scrape.metrics.json"
+    if args.worker:
+        # Workers run side by side, so each writes its own metrics file
+        worker_id = args.worker_id or default_worker_id()
+        safe_id = re.sub(r"[^\w.-]", "_", worker_id)
+        if args.metrics_json is None:
+            metrics_file = f"{os.path.splitext(args.queue)[0]}.{safe_id}.metrics.json"
+        elif metrics_file:
+            root, extension = os.path.splitext(metrics_file)
+            metrics_file = f"{root}.{safe_id}{extension}"
     try:
+        if args.worker:
+            with metrics.phase("details"):
+                scraper.work(queue, worker_id, args.lease_size, args.lease_seconds)
+            return
+        if args.watch:
+            watch(scraper, args.watch_file, args.poll_interval, transform=args.transform,
+                  metrics=metrics, prometheus_file=args.prometheus_file)
+            return
+        
+        update_options = {}
+        if args.incremental:
+            update_options = load_previous_snapshot()
+            if update_options:
+                update_options["max_age"] = args.max_age_days * 86400
+                # Diff against the current problem list, not a cached or saved one that may predate changes
+                scraper.get_catalog(refresh=True)
+        
         # Determine which problems to fetch
-        if args.latest:
-            print(f"Fetching the latest {args.latest} problems...")
-            problems = scraper.get_latest_problems(args.latest)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"leetcode_latest_problems_{args.latest}_{timestamp}.json"
-        else:
-            # Default to ID range
-            start_id = args.start_id
-            end_id = args.end_id
-            print(f"Fetching problems with IDs between {start_id} and {end_id}...")
-            problems = scraper.get_problems_by_id_range(start_id, end_id)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"leetcode_problems_{start_id}_to_{end_id}_{timestamp}.json"
-        
-        # Save to JSON file
-        scraper.save_to_json(problems, filename)
-        
-        print(f"Scraping completed, results saved to {filename}")
-        
-        # Create a marker file to indicate this is the latest scrape
-        with open("latest_scrape_file.txt", "w") as f:
-            f.write(filename)
+        with metrics.phase("list"):
+            if args.merge:
+                # The coordinator recorded the output name; the details are already in the queue
+                name = queue.meta("name", "leetcode_problems_merged")
+                counts = queue.counts()
+                selected = []
+                print(f"Merging {counts['done']} fetched problems from {args.queue}")
+                if counts["pending"] or counts["leased"]:
+                    print(f"Warning: {counts['pending'] + counts['leased']} problems have not been fetched yet")
+                if counts["failed"]:
+                    print(f"Could not fetch {counts['failed']} problems: "
+                          f"{', '.join(problem['titleSlug'] for problem in queue.failed())}")
+            elif args.latest:
+                print(f"Fetching the latest {args.latest} problems...")
+                selected = scraper.select_latest_problems(args.latest, args.difficulty, args.paid_only)
+                name = f"leetcode_latest_problems_{args.latest}"
+            else:
+                # Default to ID range
+                start_id = args.start_id
+                end_id = args.end_id
+                print(f"Fetching problems with IDs between {start_id} and {end_id}...")
+                selected = scraper.select_problems_by_id_range(start_id, end_id, args.difficulty, args.paid_only)
+                name = f"leetcode_problems_{start_id}_to_{end_id}"
+        if args.coordinator:
+            try:
+                added = queue.add(selected, name)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return
+            print(f"Added {added} problems to {args.queue} ({len(selected) - added} already queued); "
+                  f"start workers with --worker and collect the results with --merge")
+            return
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{name}_{timestamp}.json"
+        if args.metrics_json is None:
+            metrics_file = f"{name}_{timestamp}.metrics.json"
+        
+        # Stream details into a partial JSON Lines file so an interrupted scrape can be resumed
+        partial_file = args.jsonl or f"{name}.partial.jsonl"
+        resumed = args.resume and not args.no_raw and os.path.exists(partial_file)
+        if resumed:
+            done = {record.get("titleSlug") for record in iter_jsonl(partial_file)}
+            selected = [problem for problem in selected if problem.get("titleSlug") not in done]
+            print(f"Resuming from {partial_file}: {len(done)} problems already fetched, {len(selected)} remaining")
+        total = counts["done"] if args.merge else len(selected)
+        
+        # Optionally transform each problem as it arrives instead of re-reading the saved file later
+        pipeline = None
+        if args.transform:
+            # Problems arrive one at a time, so conversions are cached but never farmed out to a process pool
+            converter = ContentConverter(os.path.join(args.cache_dir, "content.sqlite3") if cache else None, workers=1)
+            pipeline = TransformPipeline(f"{name}_{timestamp}_transformed.json", f"{name}_{timestamp}_transformed.csv",
+                                         converter=converter)
+            if resumed:
+                for record in iter_jsonl(partial_file):
+                    pipeline.write(record)
+        
+        writer = None
+        if not args.no_raw:
+            writer = JsonlWriter(partial_file, append=args.resume, fsync_every=args.fsync_every)
+        
+        # Time spent writing and transforming is tracked separately from the detail fetch phase
+        loop_started = time.perf_counter()
+        save_seconds = transform_seconds = 0.0
+        try:
+            if args.merge:
+                details = queue.iter_results()
+            else:
+                details = itertools.chain(
+                    scraper.iter_selection(selected, **update_options),
+                    scraper.iter_retry_queue(rounds=args.retry_rounds, delay=args.retry_delay)
+                )
+            for count, detail in enumerate(details, 1):
+                started = time.perf_counter()
+                if writer:
+                    writer.write(detail)
+                written = time.perf_counter()
+                if pipeline:
+                    pipeline.write(detail)
+                save_seconds += written - started
+                transform_seconds += time.perf_counter() - written
+                if args.quiet:
+                    metrics.progress(count, total)
+        finally:
+            if writer:
+                writer.close()
+            if pipeline:
+                pipeline.close()
+                pipeline.converter.close()
+            metrics.add_phase_time("details", time.perf_counter() - loop_started - save_seconds - transform_seconds)
+            metrics.add_phase_time("save", save_seconds)
+            if pipeline:
+                metrics.add_phase_time("transform", transform_seconds)
+        
+        if writer:
+            print(f"Wrote {writer.count} problems to {partial_file}")
+            with metrics.phase("save"):
+                if args.snapshot_store:
+                    with SnapshotStore(args.snapshot_store) as store:
+                        filename = store.import_file(partial_file, f"{name}_{timestamp}")
+                    os.remove(partial_file)
+                elif args.no_json:
+                    filename = f"{name}_{timestamp}.jsonl"
+                    os.replace(partial_file, filename)
+                else:
+                    compact_jsonl_to_json(partial_file, filename)
+                    os.remove(partial_file)
+            
+            print(f"Scraping completed, results saved to {filename}")
+            
+            # Create a marker file to indicate this is the latest scrape
+            with open("latest_scrape_file.txt", "w") as f:
+                f.write(filename)
+        if pipeline:
+            print(f"Transformed {pipeline.count} problems into {pipeline.json_file} and {pipeline.csv_file}")
             
         # Log premium status for reference
         premium_status = "premium account" if scraper.is_premium else "free account"
@@ -379,10 +1394,28 @@ def main():
         if not scraper.is_premium:
             print("Note: Company tags data requires a premium account.")
             
+    except KeyboardInterrupt:
+        if args.watch:
+            print("Watch mode stopped")
+        else:
+            print("Scraping interrupted, run again with --resume to continue from the partial file")
     except Exception as e:
         print(f"Error during scraping process: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if queue:
+            queue.close()
+        if cache:
+            metrics.info.update(cache_hits=cache.hits, cache_misses=cache.misses)
+            cache.close()
+        metrics.info.update(premium=scraper.is_premium, profile=args.profile)
+        metrics.print_summary()
+        metrics.finish_progress()
+        if metrics_file:
+            metrics.write_json(metrics_file)
+        if args.prometheus_file:
+            metrics.write_prometheus(args.prometheus_file)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,159 @@
+import bisect
+import json
+import os
+import time
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+
+# Bump when the persisted layout changes, so old catalog files are rebuilt instead of misread
+CATALOG_VERSION = 1
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _iter_bits(mask, offset=0):
+    """Yield the positions of the set bits of an integer bitmap, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield offset + low.bit_length() - 1
+        mask ^= low
+
+class ProblemCatalog:
+    """Indexed view of the allQuestions problem list for fast selections
+
+    Problems are kept sorted by numeric frontend ID, so ID ranges are found by bisecting a sorted
+    array. Difficulty and isPaidOnly are stored as integer bitmaps over those positions, so filtered
+    selections are a shift and a few ANDs before any problem is touched. Problems with non-numeric
+    frontend IDs are kept (for slug lookups) after the numbered ones but never match a range.
+    """
+    def __init__(self, problems, built_at=None):
+        numbered = []
+        unnumbered = []
+        for problem in problems:
+            frontend_id = _int_or_none(problem.get("questionFrontendId"))
+            if frontend_id is None:
+                unnumbered.append(problem)
+            else:
+                numbered.append((frontend_id, problem))
+        # Stable sort keeps the list order for duplicate IDs, like the linear scan did
+        numbered.sort(key=lambda item: item[0])
+
+        self.frontend_ids = [frontend_id for frontend_id, _ in numbered]
+        self.problems = [problem for _, problem in numbered] + unnumbered
+        self.built_at = built_at if built_at is not None else time.time()
+        self._build_indexes()
+
+    def _build_indexes(self):
+        self.slug_index = {problem.get("titleSlug"): position for position, problem in enumerate(self.problems)}
+        self.difficulty_masks = dict.fromkeys(DIFFICULTIES, 0)
+        self.paid_mask = 0
+        for position, problem in enumerate(self.problems):
+            bit = 1 << position
+            difficulty = problem.get("difficulty")
+            self.difficulty_masks[difficulty] = self.difficulty_masks.get(difficulty, 0) | bit
+            if problem.get("isPaidOnly"):
+                self.paid_mask |= bit
+        self.all_mask = (1 << len(self.problems)) - 1
+
+        # Latest problems are ordered by questionId, newest first
+        self.latest_order = sorted(range(len(self.problems)),
+                                   key=lambda position: _int_or_none(self.problems[position].get("questionId")) or 0,
+                                   reverse=True)
+
+    def __len__(self):
+        return len(self.problems)
+
+    def age(self):
+        return time.time() - self.built_at
+
+    def filter_mask(self, difficulty=None, paid_only=None):
+        """Return the bitmap of problems matching a difficulty (or list of them) and paid status
+
+        paid_only=True selects premium problems, False selects free ones and None selects both.
+        """
+        mask = self.all_mask
+        if difficulty:
+            difficulties = [difficulty] if isinstance(difficulty, str) else difficulty
+            wanted = 0
+            for name in difficulties:
+                wanted |= self.difficulty_masks.get(name.capitalize(), 0)
+            mask &= wanted
+        if paid_only is True:
+            mask &= self.paid_mask
+        elif paid_only is False:
+            mask &= ~self.paid_mask
+        return mask
+
+    def get(self, title_slug):
+        """Return the problem list entry for a slug, or None"""
+        position = self.slug_index.get(title_slug)
+        return self.problems[position] if position is not None else None
+
+    def id_range(self, start_id, end_id, difficulty=None, paid_only=None):
+        """Return problems with frontend IDs in [start_id, end_id], in ID order"""
+        low = bisect.bisect_left(self.frontend_ids, start_id)
+        high = bisect.bisect_right(self.frontend_ids, end_id)
+        if low >= high:
+            return []
+        mask = (self.filter_mask(difficulty, paid_only) >> low) & ((1 << (high - low)) - 1)
+        return [self.problems[position] for position in _iter_bits(mask, low)]
+
+    def latest(self, count, difficulty=None, paid_only=None):
+        """Return the `count` problems with the highest questionId, newest first"""
+        if difficulty is None and paid_only is None:
+            positions = self.latest_order[:count]
+        else:
+            mask = self.filter_mask(difficulty, paid_only)
+            positions = []
+            for position in self.latest_order:
+                if len(positions) >= count:
+                    break
+                if mask >> position & 1:
+                    positions.append(position)
+        return [self.problems[position] for position in positions]
+
+    def save(self, path, source=None):
+        """Persist the catalog with its sort order, so loading it needs no re-sorting"""
+        data = {
+            "version": CATALOG_VERSION,
+            "source": source,
+            "built_at": self.built_at,
+            "frontend_ids": self.frontend_ids,
+            "problems": self.problems,
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, max_age=None, source=None):
+        """Load a persisted catalog, or return None if it is missing, expired, unreadable or from another source"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        if data.get("version") != CATALOG_VERSION or data.get("source") != source:
+            return None
+
+        # A hand-edited or partially written file is treated like a missing one, so callers rebuild it
+        catalog = cls.__new__(cls)
+        try:
+            catalog.frontend_ids = data["frontend_ids"]
+            catalog.problems = data["problems"]
+            catalog.built_at = float(data["built_at"])
+            if max_age is not None and catalog.age() > max_age:
+                return None
+            catalog._build_indexes()
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+        return catalog
@@ -0,0 +1,240 @@
+import glob
+import json
+import mmap
+import os
+import struct
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# Index layout: header, then one (offset, length) entry per record in file order, then the ID and
+# slug key tables, each sorted by key bytes, then the pool of key bytes the tables point into
+INDEX_MAGIC = b"LCRIDX01"
+INDEX_HEADER = struct.Struct("<8sIQQQ")  # magic, record count, data file size, key table offsets (ID, slug)
+RECORD_ENTRY = struct.Struct("<QI")  # offset and length of the record's line in the data file
+KEY_ENTRY = struct.Struct("<IHI")  # key offset in the pool, key length, record number
+
+def index_path(data_file):
+    """The index that belongs to a record data file: <name>.jsonl -> <name>.idx"""
+    return (data_file[:-len(".jsonl")] if data_file.endswith(".jsonl") else data_file) + ".idx"
+
+def record_keys(record):
+    """(ID, slug) of a transformed or raw problem"""
+    problem_id = record.get("Id", record.get("questionFrontendId"))
+    slug = record.get("titleSlug")
+    if slug is None and record.get("url"):
+        slug = record["url"].rstrip("/").rsplit("/", 1)[-1]
+    return str(problem_id or ""), slug or ""
+
+class RecordFileWriter:
+    """Write problems to a JSON Lines data file plus a sorted offset index for random access
+
+    The data file is ordinary JSON Lines, one compact record per line. The index maps each problem's
+    `Id` and slug to the byte range of its line, so RecordFile can look a problem up without reading
+    the rest. Both files are written under temporary names and moved into place on close.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.index_file = index_path(path)
+        self.temp_path = f"{path}.{os.getpid()}.tmp"
+        self.file = open(self.temp_path, 'wb')
+        self.entries = []
+        self.ids = []
+        self.slugs = []
+        self.offset = 0
+        self.count = 0
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.file.write(line)
+        problem_id, slug = record_keys(record)
+        self.entries.append((self.offset, len(line) - 1))
+        self.ids.append((problem_id.encode("utf-8"), self.count))
+        self.slugs.append((slug.encode("utf-8"), self.count))
+        self.offset += len(line)
+        self.count += 1
+
+    def _write_index(self, path):
+        pool = bytearray()
+        tables = []
+        for keys in (self.ids, self.slugs):
+            table = bytearray()
+            for key, number in sorted(keys):
+                table += KEY_ENTRY.pack(len(pool), len(key), number)
+                pool += key
+            tables.append(table)
+        id_table_offset = INDEX_HEADER.size + RECORD_ENTRY.size * self.count
+        slug_table_offset = id_table_offset + len(tables[0])
+        with open(path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, self.count, self.offset, id_table_offset, slug_table_offset))
+            f.write(b"".join(RECORD_ENTRY.pack(offset, length) for offset, length in self.entries))
+            f.write(tables[0])
+            f.write(tables[1])
+            f.write(pool)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.close()
+        temp_index = f"{self.index_file}.{os.getpid()}.tmp"
+        self._write_index(temp_index)
+        # The index records the data file size, so a reader never pairs it with a different data file
+        os.replace(self.temp_path, self.path)
+        os.replace(temp_index, self.index_file)
+        print(f"Record file of {self.count} problems saved to {self.path} (index {self.index_file})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        elif not self.file.closed:
+            self.file.close()
+            os.remove(self.temp_path)
+
+class RecordFile:
+    """Look up single problems in a record file by ID or slug, decoding only the requested record
+
+    Both the data file and its index are memory-mapped, and a lookup is a binary search over the
+    index's sorted key table, so opening the file reads nothing up front and resident memory only
+    grows with the pages actually touched.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b""
+        with open(index_path(path), 'rb') as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, data_size, id_table, slug_table = INDEX_HEADER.unpack_from(self.index)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{index_path(path)} is not a record file index")
+        if data_size != len(self.data):
+            raise ValueError(f"{index_path(path)} does not match {path}; rebuild the record file")
+        self.tables = {"id": id_table, "slug": slug_table}
+        self.pool = slug_table + KEY_ENTRY.size * self.count
+
+    def __len__(self):
+        return self.count
+
+    def _key(self, table, position):
+        key_offset, key_length, number = KEY_ENTRY.unpack_from(self.index, table + position * KEY_ENTRY.size)
+        start = self.pool + key_offset
+        return self.index[start:start + key_length], number
+
+    def _find(self, kind, key):
+        """Record number for a key, by binary search over the sorted key table"""
+        table = self.tables[kind]
+        key = key.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(table, middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            found, number = self._key(table, low)
+            if found == key:
+                return number
+        return None
+
+    def raw(self, number):
+        """The undecoded JSON bytes of the record at a position in file order"""
+        if not 0 <= number < self.count:
+            raise IndexError(number)
+        offset, length = RECORD_ENTRY.unpack_from(self.index, INDEX_HEADER.size + number * RECORD_ENTRY.size)
+        return self.data[offset:offset + length]
+
+    def __getitem__(self, number):
+        return json_loads(self.raw(number))
+
+    def get(self, problem_id, default=None):
+        """The problem with this frontend ID (e.g. "1" or 1), or default"""
+        number = self._find("id", str(problem_id))
+        return default if number is None else self[number]
+
+    def by_slug(self, slug, default=None):
+        number = self._find("slug", slug)
+        return default if number is None else self[number]
+
+    def __contains__(self, problem_id):
+        return self._find("id", str(problem_id)) is not None
+
+    def __iter__(self):
+        for number in range(self.count):
+            yield self[number]
+
+    def ids(self):
+        """All problem IDs in key order"""
+        return [self._key(self.tables["id"], position)[0].decode("utf-8") for position in range(self.count)]
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def build_record_file(records, path):
+    """Write an iterable of problems to a record file and its index"""
+    with RecordFileWriter(path) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Look up problems in a record file by ID or slug')
+    parser.add_argument('keys', nargs='*', help='Problem IDs or title slugs')
+    parser.add_argument('--file', type=str, help='Record file (defaults to the newest *_records.jsonl)')
+    parser.add_argument('--build', type=str, metavar='INPUT',
+                        help='Build the record file from a transformed or raw JSON or JSON Lines file')
+    parser.add_argument('--fields', type=str, nargs='+', help='Only print these fields')
+    args = parser.parse_args()
+
+    record_file = args.file
+    if args.build:
+        from jsonl_io import iter_records
+        if not record_file:
+            stem = args.build
+            for extension in (".jsonl", ".json"):
+                if stem.endswith(extension):
+                    stem = stem[:-len(extension)]
+                    break
+            record_file = f"{stem}_records.jsonl"
+        build_record_file(iter_records(args.build), record_file)
+    if not record_file:
+        candidates = glob.glob("*_records.jsonl")
+        if not candidates:
+            print("No record file found; build one with: python transform_data.py --records")
+            return
+        record_file = max(candidates, key=os.path.getmtime)
+
+    with RecordFile(record_file) as records:
+        for key in args.keys:
+            started = time.perf_counter()
+            record = records.get(key) or records.by_slug(key)
+            elapsed = time.perf_counter() - started
+            if record is None:
+                print(f"{key}: not found")
+                continue
+            if args.fields:
+                record = {field: record.get(field) for field in args.fields}
+            print(json.dumps(record, ensure_ascii=False, indent=2))
+            print(f"({elapsed * 1e6:.0f} µs)")
+        if not args.keys:
+            print(f"{len(records)} problems in {record_file}")
+
+if __name__ == "__main__":
+    main()
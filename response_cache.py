@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Default time-to-live in seconds for each GraphQL query name
+DEFAULT_TTLS = {
+    "allQuestions": 6 * 3600,
+    "questionData": 7 * 24 * 3600,
+}
+
+class ResponseCache:
+    """Persistent SQLite cache of GraphQL response data with per-query TTLs and LRU eviction"""
+    def __init__(self, cache_dir=".leetcode_cache", ttls=None, default_ttl=24 * 3600, max_bytes=512 * 1024 * 1024):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite3")
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        # The scraper fetches from several threads, so share one connection behind a lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                query_name TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.conn.commit()
+
+    @staticmethod
+    def query_name(query):
+        """Return the operation name of a query, or its first field for anonymous queries"""
+        match = re.search(r"query\s+(\w+)", query) or re.search(r"\{\s*(\w+)", query)
+        return match.group(1) if match else "unknown"
+
+    @staticmethod
+    def make_key(query, variables=None):
+        """Hash a query (ignoring whitespace differences) together with its variables"""
+        normalized = " ".join(query.split())
+        raw = normalized + "\n" + json.dumps(variables or {}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, query):
+        return self.ttls.get(self.query_name(query), self.default_ttl)
+
+    def get(self, query, variables=None):
+        """Return cached data for a query, or None if missing or expired"""
+        key = self.make_key(query, variables)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT created_at, data FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[0] > self.ttl_for(query):
+                if row is not None:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.conn.commit()
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+        return json.loads(row[1])
+
+    def set(self, query, variables, data):
+        """Store response data for a query and evict least recently used entries if over budget"""
+        key = self.make_key(query, variables)
+        text = json.dumps(data, ensure_ascii=False)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self.query_name(query), now, now, len(text), text)
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        freed = 0
+        stale_keys = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            stale_keys.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+        print(f"Evicted {len(stale_keys)} cached responses ({freed} bytes)")
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def close(self):
+        print(f"Response cache: {self.hits} hits, {self.misses} misses")
+        with self.lock:
+            self.conn.close()
+
+def parse_ttl_args(values):
+    """Parse --cache-ttl values of the form SECONDS (all queries) or QUERY_NAME=SECONDS"""
+    default_ttl = None
+    named_ttls = {}
+    for value in values or []:
+        name, separator, seconds = value.rpartition("=")
+        try:
+            ttl = float(seconds)
+        except ValueError:
+            raise ValueError(f"invalid --cache-ttl {value!r}: expected SECONDS or QUERY_NAME=SECONDS") from None
+        if separator:
+            named_ttls[name.strip()] = ttl
+        else:
+            default_ttl = ttl
+
+    ttls = dict.fromkeys(DEFAULT_TTLS, default_ttl) if default_ttl is not None else {}
+    ttls.update(named_ttls)
+    return default_ttl, ttls
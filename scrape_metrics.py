@@ -0,0 +1,173 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+class ScrapeMetrics:
+    """Thread-safe counters and timings for a scrape run
+
+    Collects per-request latency, status codes, bytes received and retries per GraphQL query, plus
+    durations of run phases (list fetch, detail fetch, save, transform). The run summary can be
+    written as JSON or in the Prometheus textfile collector format.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.latencies = defaultdict(list)
+        self.status_counts = defaultdict(int)
+        self.bytes_received = defaultdict(int)
+        self.request_errors = defaultdict(int)
+        self.retries = 0
+        self.phases = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.info = {}
+        self.last_progress = 0.0
+        self.progress_open = False
+
+    def record_request(self, query_name, status_code, seconds, size=0):
+        """Record one HTTP attempt; status_code is None when the request raised"""
+        with self.lock:
+            self.latencies[query_name].append(seconds)
+            if status_code is None:
+                self.request_errors[query_name] += 1
+            else:
+                self.status_counts[(query_name, status_code)] += 1
+            self.bytes_received[query_name] += size
+
+    def record_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def add_phase_time(self, name, seconds):
+        with self.lock:
+            self.phases[name] += seconds
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of the run as a named phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase_time(name, time.perf_counter() - started)
+
+    def progress(self, done, total, min_interval=0.5):
+        """Overwrite a single progress line on stderr, at most every min_interval seconds"""
+        now = time.time()
+        if done < total and now - self.last_progress < min_interval:
+            return
+        self.last_progress = now
+        elapsed = now - self.started
+        rate = done / elapsed if elapsed else 0.0
+        failed = self.counters.get("fetch_failures", 0)
+        sys.stderr.write(f"\rFetched {done}/{total} problems ({failed} failed, {rate:.1f}/s)")
+        self.progress_open = True
+        if done >= total:
+            self.finish_progress()
+        sys.stderr.flush()
+
+    def finish_progress(self):
+        """End the progress line, e.g. when problems that failed for good keep it short of the total"""
+        if self.progress_open:
+            sys.stderr.write("\n")
+            sys.stderr.flush()
+            self.progress_open = False
+
+    @staticmethod
+    def _percentile(values, fraction):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else None
+
+    def summary(self):
+        """Return the run summary as a JSON-serializable dict"""
+        with self.lock:
+            queries = {}
+            for name in sorted(set(self.latencies) | set(self.bytes_received)):
+                latencies = self.latencies[name]
+                queries[name] = {
+                    "requests": len(latencies),
+                    "errors": self.request_errors[name],
+                    "status_codes": {str(code): count for (query, code), count in sorted(self.status_counts.items())
+                                     if query == name},
+                    "bytes_received": self.bytes_received[name],
+                    "latency_seconds": {
+                        "total": sum(latencies),
+                        "p50": self._percentile(latencies, 0.5),
+                        "p90": self._percentile(latencies, 0.9),
+                        "p99": self._percentile(latencies, 0.99),
+                        "max": max(latencies) if latencies else None,
+                    },
+                }
+            return {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "duration_seconds": time.time() - self.started,
+                "requests": sum(len(latencies) for latencies in self.latencies.values()),
+                "bytes_received": sum(self.bytes_received.values()),
+                "retries": self.retries,
+                "queries": queries,
+                "phases_seconds": dict(self.phases),
+                "counters": dict(self.counters),
+                "info": dict(self.info),
+            }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"Run metrics saved to {path}")
+
+    def write_prometheus(self, path, prefix="leetcode_scraper"):
+        """Write metrics in the Prometheus textfile collector format (atomically, as node_exporter expects)"""
+        summary = self.summary()
+        lines = [
+            f"# TYPE {prefix}_requests_total counter",
+            *(f'{prefix}_requests_total{{query="{name}",status="{code}"}} {count}'
+              for name, query in summary["queries"].items() for code, count in query["status_codes"].items()),
+            *(f'{prefix}_requests_total{{query="{name}",status="error"}} {query["errors"]}'
+              for name, query in summary["queries"].items() if query["errors"]),
+            f"# TYPE {prefix}_response_bytes_total counter",
+            *(f'{prefix}_response_bytes_total{{query="{name}"}} {query["bytes_received"]}'
+              for name, query in summary["queries"].items()),
+            f"# TYPE {prefix}_request_seconds summary",
+        ]
+        for name, query in summary["queries"].items():
+            latency = query["latency_seconds"]
+            for quantile, key in (("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99")):
+                value = latency[key]
+                if value is not None:
+                    lines.append(f'{prefix}_request_seconds{{query="{name}",quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'{prefix}_request_seconds_sum{{query="{name}"}} {latency["total"]:.6f}')
+            lines.append(f'{prefix}_request_seconds_count{{query="{name}"}} {query["requests"]}')
+        lines.append(f"# TYPE {prefix}_retries_total counter")
+        lines.append(f"{prefix}_retries_total {summary['retries']}")
+        lines.append(f"# TYPE {prefix}_phase_seconds gauge")
+        lines.extend(f'{prefix}_phase_seconds{{phase="{name}"}} {seconds:.6f}'
+                     for name, seconds in summary["phases_seconds"].items())
+        lines.append(f"# TYPE {prefix}_problems gauge")
+        lines.extend(f'{prefix}_problems{{result="{name}"}} {value}' for name, value in summary["counters"].items())
+        lines.append(f"# TYPE {prefix}_last_run_timestamp_seconds gauge")
+        lines.append(f"{prefix}_last_run_timestamp_seconds {time.time():.0f}")
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, path)
+        print(f"Prometheus metrics saved to {path}")
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"Run summary: {summary['requests']} requests, {summary['bytes_received'] / 1024:.0f} KB received, "
+              f"{summary['retries']} retries in {summary['duration_seconds']:.1f}s")
+        for name, query in summary["queries"].items():
+            latency = query["latency_seconds"]
+            codes = ", ".join(f"{code}: {count}" for code, count in query["status_codes"].items())
+            print(f"  {name}: {query['requests']} requests ({codes or 'no responses'}; {query['errors']} errors), "
+                  f"p50 {latency['p50'] * 1000:.0f} ms, p99 {latency['p99'] * 1000:.0f} ms")
+        if summary["phases_seconds"]:
+            print("  Phases: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in summary["phases_seconds"].items()))
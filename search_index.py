@@ -0,0 +1,269 @@
+import glob
+import html
+import os
+import re
+import sqlite3
+import time
+
+# Facets with a postings table entry per (value, problem); difficulty is a single-valued facet
+FACET_FIELDS = {"tag": "tags", "company": "companies", "difficulty": "difficulty"}
+
+# Transformed problem fields the index reads
+SEARCH_INDEX_FIELDS = ["Id", "name", "difficulty", "acceptance_rate", "likes", "url", "content_text", "tags", "companies"]
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def strip_html(content):
+    """Reduce problem HTML to plain searchable text"""
+    if not content:
+        return ""
+    text = TAG_PATTERN.sub(" ", content)
+    return WHITESPACE_PATTERN.sub(" ", html.unescape(text)).strip()
+
+def fts5_available(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def fts_query(text):
+    """Turn free text into an FTS5 query that ANDs its words, keeping a trailing * as a prefix match"""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+class SearchIndexWriter:
+    """Build a SQLite search index from transformed problems, one record at a time
+
+    Problem text (name and stripped content) goes into an FTS5 table ranked with BM25, and tags,
+    companies and difficulty into a postings table indexed by (facet, value). Without FTS5 the text
+    is stored in a plain table and matched with LIKE. The index is written to a temporary file and
+    moved into place on close, so readers never see a half-built index.
+    """
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.temp_path = f"{path}.{os.getpid()}.tmp"
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+        self.conn = sqlite3.connect(self.temp_path)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.fts5 = fts5_available(self.conn)
+        self.conn.executescript("""
+            CREATE TABLE problems (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT,
+                name TEXT,
+                difficulty TEXT,
+                acceptance_rate REAL,
+                likes INTEGER,
+                url TEXT
+            );
+            CREATE TABLE facets (
+                facet TEXT NOT NULL,
+                value TEXT NOT NULL COLLATE NOCASE,
+                problem INTEGER NOT NULL
+            );
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        if self.fts5:
+            self.conn.execute("CREATE VIRTUAL TABLE problem_text USING fts5(name, content, tokenize='porter unicode61')")
+        else:
+            self.conn.execute("CREATE TABLE problem_text (rowid INTEGER PRIMARY KEY, name TEXT, content TEXT)")
+        self.batch_size = batch_size
+        self.pending = []
+        self.count = 0
+
+    def write(self, problem):
+        self.count += 1
+        self.pending.append((self.count, problem))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        problems = []
+        texts = []
+        facets = []
+        for rowid, problem in self.pending:
+            problems.append((rowid, problem.get("Id"), problem.get("name"), problem.get("difficulty"),
+                             problem.get("acceptance_rate"), problem.get("likes"), problem.get("url")))
+            # Transformed problems carry a converted content_text; older files only have the HTML
+            text = problem.get("content_text")
+            if text is None:
+                text = strip_html(problem.get("content"))
+            texts.append((rowid, problem.get("name") or "", text))
+            for facet, field in FACET_FIELDS.items():
+                values = problem.get(field)
+                if isinstance(values, str):
+                    values = [values]
+                facets.extend((facet, value, rowid) for value in values or [] if value)
+        self.conn.executemany("INSERT INTO problems VALUES (?, ?, ?, ?, ?, ?, ?)", problems)
+        self.conn.executemany("INSERT INTO problem_text (rowid, name, content) VALUES (?, ?, ?)", texts)
+        self.conn.executemany("INSERT INTO facets VALUES (?, ?, ?)", facets)
+        self.conn.commit()
+        self.pending = []
+
+    def close(self):
+        if self.conn is None:
+            return
+        self.flush()
+        # Build the postings index after loading, which is much faster than maintaining it per insert
+        self.conn.execute("CREATE INDEX facets_value ON facets (facet, value, problem)")
+        self.conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                              [("built_at", str(time.time())), ("count", str(self.count)),
+                               ("fts5", "1" if self.fts5 else "0")])
+        if self.fts5:
+            self.conn.execute("INSERT INTO problem_text (problem_text) VALUES ('optimize')")
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
+        os.replace(self.temp_path, self.path)
+        print(f"Search index of {self.count} problems saved to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        elif self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            os.remove(self.temp_path)
+
+class SearchIndex:
+    """Query a search index built by SearchIndexWriter without loading the dataset"""
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Search index not found: {path}")
+        self.path = path
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+        self.fts5 = dict(self.conn.execute("SELECT key, value FROM meta").fetchall()).get("fts5") == "1"
+
+    def _where(self, text=None, difficulty=None, tags=None, companies=None):
+        """Build the WHERE clause shared by search and facet_counts"""
+        clauses = []
+        params = []
+        if text:
+            if self.fts5:
+                clauses.append("p.rowid IN (SELECT rowid FROM problem_text WHERE problem_text MATCH ?)")
+                params.append(fts_query(text))
+            else:
+                for word in text.split():
+                    clauses.append("p.rowid IN (SELECT rowid FROM problem_text WHERE name LIKE ? OR content LIKE ?)")
+                    params.extend([f"%{word.rstrip('*')}%"] * 2)
+        # Values within a facet are ORed (any of the difficulties), facets are ANDed (all tags, all companies)
+        if difficulty:
+            difficulties = [difficulty] if isinstance(difficulty, str) else list(difficulty)
+            clauses.append("p.rowid IN (SELECT problem FROM facets WHERE facet = 'difficulty' AND value IN (%s))"
+                           % ", ".join("?" * len(difficulties)))
+            params.extend(difficulties)
+        for facet, values in (("tag", tags), ("company", companies)):
+            for value in [values] if isinstance(values, str) else values or []:
+                clauses.append("p.rowid IN (SELECT problem FROM facets WHERE facet = ? AND value = ?)")
+                params.extend([facet, value])
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def search(self, text=None, difficulty=None, tags=None, companies=None, limit=20):
+        """Return matching problems, best text matches first (or in ID order without text)"""
+        if text and self.fts5:
+            # Match in the join itself, so results can be ranked by BM25 (title hits weigh more)
+            where, params = self._where(None, difficulty, tags, companies)
+            sql = ("SELECT p.*, bm25(problem_text, 10.0, 1.0) AS score, "
+                   "snippet(problem_text, 1, '[', ']', '...', 12) AS snippet "
+                   "FROM problems p JOIN problem_text ON problem_text.rowid = p.rowid"
+                   + (where + " AND" if where else " WHERE") + " problem_text MATCH ? ORDER BY score LIMIT ?")
+            params += [fts_query(text), limit]
+        else:
+            where, params = self._where(text, difficulty, tags, companies)
+            sql = "SELECT p.* FROM problems p" + where + " ORDER BY p.rowid LIMIT ?"
+            params.append(limit)
+        results = []
+        for row in self.conn.execute(sql, params):
+            result = dict(row)
+            result["tags"] = self._facet_values("tag", row["rowid"])
+            result["companies"] = self._facet_values("company", row["rowid"])
+            results.append(result)
+        return results
+
+    def _facet_values(self, facet, rowid):
+        return [value for (value,) in self.conn.execute(
+            "SELECT value FROM facets WHERE problem = ? AND facet = ? ORDER BY rowid", (rowid, facet))]
+
+    def count(self, text=None, difficulty=None, tags=None, companies=None):
+        where, params = self._where(text, difficulty, tags, companies)
+        return self.conn.execute("SELECT COUNT(*) FROM problems p" + where, params).fetchone()[0]
+
+    def facet_counts(self, facet, text=None, difficulty=None, tags=None, companies=None, limit=20):
+        """Count matching problems per value of a facet, most common first"""
+        where, params = self._where(text, difficulty, tags, companies)
+        sql = ("SELECT f.value, COUNT(*) AS problems FROM facets f JOIN problems p ON p.rowid = f.problem"
+               + (where + " AND" if where else " WHERE") + " f.facet = ? GROUP BY f.value ORDER BY problems DESC, f.value LIMIT ?")
+        return self.conn.execute(sql, params + [facet, limit]).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def build_search_index(records, index_file):
+    """Build a search index from an iterable of transformed problems"""
+    with SearchIndexWriter(index_file) as writer:
+        for problem in records:
+            writer.write(problem)
+    return writer.count
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Search transformed LeetCode problems by text, tag, company and difficulty')
+    parser.add_argument('text', nargs='*', help='Words that must appear in the title or statement (word* for prefixes)')
+    parser.add_argument('--index', type=str, help='Search index file (defaults to the newest *_search.sqlite3)')
+    parser.add_argument('--difficulty', type=str, nargs='+', help='Easy, Medium and/or Hard')
+    parser.add_argument('--tag', type=str, action='append', help='Topic tag the problem must have (repeatable)')
+    parser.add_argument('--company', type=str, action='append', help='Company the problem must be tagged with (repeatable)')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum number of results')
+    parser.add_argument('--facets', action='store_true', help='Also show tag, company and difficulty counts for the matches')
+    args = parser.parse_args()
+
+    index_file = args.index
+    if not index_file:
+        candidates = glob.glob("*_search.sqlite3")
+        if not candidates:
+            print("No search index found; build one with: python transform_data.py --search-index")
+            return
+        index_file = max(candidates, key=os.path.getmtime)
+
+    text = " ".join(args.text)
+    with SearchIndex(index_file) as index:
+        started = time.perf_counter()
+        results = index.search(text, args.difficulty, args.tag, args.company, args.limit)
+        total = index.count(text, args.difficulty, args.tag, args.company)
+        elapsed = time.perf_counter() - started
+        print(f"{total} matching problems in {index_file} ({elapsed * 1000:.1f} ms)")
+        for result in results:
+            print(f"{result['id']:>6}  {result['name']} [{result['difficulty']}]  {result['url']}")
+            if result.get("snippet"):
+                print(f"        {result['snippet']}")
+        if args.facets:
+            for facet in ("difficulty", "tag", "company"):
+                counts = index.facet_counts(facet, text, args.difficulty, args.tag, args.company, limit=10)
+                if counts:
+                    print(f"{facet}: " + ", ".join(f"{value} ({count})" for value, count in counts))
+
+if __name__ == "__main__":
+    main()
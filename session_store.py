@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import stat
+import time
+
+# Stored sessions are re-validated at least this often even if the cookie claims to live longer
+DEFAULT_SESSION_MAX_AGE = 7 * 24 * 3600
+
+class SessionStore:
+    """Local store of an authenticated LeetCode session, readable only by the current user
+
+    Keeps the cookie jar, CSRF token, username and premium status so a later run can skip the
+    login flow and the premium check. A stored session expires when its LEETCODE_SESSION cookie
+    does, or `max_age` seconds after it was saved, whichever comes first. It is tied to an identity
+    (the username, or a hash of the session ID) and a base URL, so other credentials never reuse it.
+    """
+    def __init__(self, path=".leetcode_session.json", max_age=DEFAULT_SESSION_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+
+    @staticmethod
+    def identity(username=None, session_id=None):
+        """Key a stored session by the credentials it was created from"""
+        if username:
+            return f"user:{username}"
+        if session_id:
+            return "session:" + hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:16]
+        return None
+
+    def load(self, identity, base_url):
+        """Return the stored session for an identity, or None if missing, expired or unsafe to use"""
+        try:
+            mode = os.stat(self.path).st_mode
+            if mode & (stat.S_IRWXG | stat.S_IRWXO):
+                print(f"Ignoring session store {self.path}: it is readable by other users (chmod 600 to fix)")
+                return None
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("identity") != identity or data.get("base_url") != base_url:
+            return None
+        if time.time() >= data.get("expires_at", 0):
+            print("Stored session has expired, authenticating again")
+            self.invalidate()
+            return None
+        return data
+
+    def save(self, identity, base_url, cookies, headers_cookie=None, csrf_token=None, username=None,
+             is_premium=False):
+        """Store a session, expiring with its LEETCODE_SESSION cookie or after max_age seconds"""
+        saved_at = time.time()
+        expires_at = saved_at + self.max_age
+        cookie_list = []
+        for cookie in cookies:
+            cookie_list.append({
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "expires": cookie.expires,
+                "secure": cookie.secure,
+            })
+            if cookie.name == "LEETCODE_SESSION" and cookie.expires:
+                expires_at = min(expires_at, cookie.expires)
+
+        data = {
+            "identity": identity,
+            "base_url": base_url,
+            "saved_at": saved_at,
+            "expires_at": expires_at,
+            "username": username,
+            "is_premium": is_premium,
+            "csrf_token": csrf_token,
+            "headers_cookie": headers_cookie,
+            "cookies": cookie_list,
+        }
+        # Create the file with owner-only permissions before any secret is written to it
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, self.path)
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def restore_cookies(data, jar):
+        """Put the stored cookies back into a requests cookie jar"""
+        for cookie in data.get("cookies", []):
+            jar.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"],
+                    expires=cookie["expires"], secure=cookie["secure"])
@@ -0,0 +1,258 @@
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from jsonl_io import iter_records
+
+# Bump when the saved array layout changes
+GRAPH_VERSION = 1
+
+def similar_slugs(problem):
+    """Return the title slugs listed in a raw problem's similarQuestions JSON string"""
+    similar_questions_str = problem.get("similarQuestions")
+    if not similar_questions_str:
+        return []
+    try:
+        similar_questions = json.loads(similar_questions_str)
+    except ValueError:
+        return []
+    return [question["titleSlug"] for question in similar_questions if question.get("titleSlug")]
+
+def _csr_from_lists(lists, dtype=np.int32):
+    """Pack a list of integer lists into (indptr, indices) arrays"""
+    indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(items) for items in lists])
+    indices = np.fromiter((item for items in lists for item in items), dtype=dtype, count=int(indptr[-1]))
+    return indptr, indices
+
+class SimilarGraph:
+    """Similar-questions graph over a snapshot, stored as CSR arrays with precomputed analytics
+
+    Problems are nodes 0..n-1; similar questions are undirected edges between them (LeetCode lists
+    most pairs in both directions, and treating them as undirected fills in the ones it doesn't).
+    Neighbors of node i are indices[indptr[i]:indptr[i + 1]]. Connected components, degree,
+    PageRank and k-hop neighborhoods are computed at build time, so every query is an array slice.
+    """
+    ARRAYS = ("slugs", "titles", "difficulties", "indptr", "indices", "degree", "component", "component_sizes",
+              "pagerank", "khop_indptr", "khop_indices", "khop_distance")
+
+    def __init__(self, **arrays):
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.hops = int(arrays.get("hops", 2))
+        self.slug_index = {slug: index for index, slug in enumerate(self.slugs.tolist())}
+
+    @classmethod
+    def from_problems(cls, problems, hops=2, damping=0.85):
+        """Build the graph from raw problems (anything with titleSlug and similarQuestions)"""
+        slugs = []
+        titles = []
+        difficulties = []
+        similar = []
+        for problem in problems:
+            slugs.append(problem.get("titleSlug") or "")
+            titles.append(problem.get("title") or "")
+            difficulties.append(problem.get("difficulty") or "")
+            similar.append(similar_slugs(problem))
+        slug_index = {slug: index for index, slug in enumerate(slugs)}
+
+        # Resolve slugs to node indices and symmetrize; questions outside the snapshot are dropped
+        adjacency = [set() for _ in slugs]
+        unresolved = 0
+        for source, targets in enumerate(similar):
+            for slug in targets:
+                target = slug_index.get(slug)
+                if target is None:
+                    unresolved += 1
+                elif target != source:
+                    adjacency[source].add(target)
+                    adjacency[target].add(source)
+        if unresolved:
+            print(f"Skipped {unresolved} similar questions that are not in the snapshot")
+        indptr, indices = _csr_from_lists([sorted(neighbors) for neighbors in adjacency])
+
+        degree = np.diff(indptr).astype(np.int32)
+        component, component_sizes = cls._components(indptr, indices)
+        pagerank = cls._pagerank(indptr, indices, degree, damping)
+        khop_indptr, khop_indices, khop_distance = cls._k_hop(indptr, indices, pagerank, hops)
+
+        return cls(slugs=np.array(slugs), titles=np.array(titles), difficulties=np.array(difficulties),
+                   indptr=indptr, indices=indices, degree=degree, component=component,
+                   component_sizes=component_sizes, pagerank=pagerank, khop_indptr=khop_indptr,
+                   khop_indices=khop_indices, khop_distance=khop_distance, hops=hops)
+
+    @staticmethod
+    def _components(indptr, indices):
+        """Label connected components by repeatedly taking the minimum label across every edge"""
+        n = len(indptr) - 1
+        labels = np.arange(n, dtype=np.int32)
+        rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+        while True:
+            updated = labels.copy()
+            np.minimum.at(updated, rows, labels[indices])
+            # Pointer jumping: follow labels to their own labels, which halves the remaining iterations
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+        # Renumber components 0..c-1, largest first
+        roots, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+        order = np.argsort(-sizes, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        return rank[inverse].astype(np.int32), sizes[order].astype(np.int32)
+
+    @staticmethod
+    def _pagerank(indptr, indices, degree, damping=0.85, tolerance=1e-10, max_iterations=100):
+        n = len(degree)
+        if n == 0:
+            return np.zeros(0)
+        rows = np.repeat(np.arange(n), degree)
+        rank = np.full(n, 1.0 / n)
+        dangling = degree == 0
+        for _ in range(max_iterations):
+            contributions = rank[rows] / degree[rows]
+            updated = np.bincount(indices, weights=contributions, minlength=n)
+            # Problems without similar questions spread their rank evenly
+            updated = (1 - damping) / n + damping * (updated + rank[dangling].sum() / n)
+            if np.abs(updated - rank).sum() < tolerance:
+                return updated
+            rank = updated
+        return rank
+
+    @staticmethod
+    def _k_hop(indptr, indices, pagerank, hops):
+        """Neighborhoods up to `hops` edges away, nearest first and by PageRank within a distance"""
+        neighborhoods = []
+        distances = []
+        for node in range(len(indptr) - 1):
+            seen = {node}
+            frontier = [node]
+            members = []
+            member_distances = []
+            for distance in range(1, hops + 1):
+                next_frontier = set()
+                for current in frontier:
+                    next_frontier.update(indices[indptr[current]:indptr[current + 1]].tolist())
+                next_frontier -= seen
+                if not next_frontier:
+                    break
+                seen |= next_frontier
+                frontier = sorted(next_frontier, key=lambda other: -pagerank[other])
+                members.extend(frontier)
+                member_distances.extend([distance] * len(frontier))
+            neighborhoods.append(members)
+            distances.append(member_distances)
+        khop_indptr, khop_indices = _csr_from_lists(neighborhoods)
+        khop_distance = np.fromiter((d for items in distances for d in items), dtype=np.uint8,
+                                    count=len(khop_indices))
+        return khop_indptr, khop_indices, khop_distance
+
+    def __len__(self):
+        return len(self.slugs)
+
+    @property
+    def edge_count(self):
+        return len(self.indices) // 2
+
+    def node(self, slug):
+        index = self.slug_index.get(slug)
+        if index is None:
+            raise KeyError(f"Unknown problem: {slug}")
+        return index
+
+    def neighbors(self, slug):
+        """Slugs of the directly similar problems"""
+        index = self.node(slug)
+        return self.slugs[self.indices[self.indptr[index]:self.indptr[index + 1]]].tolist()
+
+    def k_hop(self, slug, hops=None):
+        """(slug, distance) pairs for problems up to `hops` edges away (at most the precomputed hops)"""
+        index = self.node(slug)
+        start, end = self.khop_indptr[index], self.khop_indptr[index + 1]
+        distances = self.khop_distance[start:end]
+        if hops is not None:
+            end = start + int(np.searchsorted(distances, hops, side="right"))
+            distances = distances[:end - start]
+        return list(zip(self.slugs[self.khop_indices[start:end]].tolist(), distances.tolist()))
+
+    def recommend(self, slug, limit=10):
+        """Problems to practice after `slug`: the closest ones first, most central first within a distance"""
+        index = self.node(slug)
+        start = self.khop_indptr[index]
+        end = min(self.khop_indptr[index + 1], start + limit)
+        return self.slugs[self.khop_indices[start:end]].tolist()
+
+    def component_of(self, slug):
+        """(component number, component size); component 0 is the largest"""
+        component = int(self.component[self.node(slug)])
+        return component, int(self.component_sizes[component])
+
+    def most_central(self, limit=10):
+        order = np.argsort(-self.pagerank, kind="stable")[:limit]
+        return [(self.slugs[i], float(self.pagerank[i])) for i in order]
+
+    def save(self, path):
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        temp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(temp_path, version=GRAPH_VERSION, hops=self.hops, **arrays)
+        os.replace(temp_path, path)
+        print(f"Similar-questions graph of {len(self)} problems and {self.edge_count} edges saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data["version"]) != GRAPH_VERSION:
+                raise ValueError(f"{path} was built by an incompatible version; rebuild it")
+            return cls(hops=int(data["hops"]), **{name: data[name] for name in cls.ARRAYS})
+
+def build_similar_graph(input_file, graph_file, hops=2):
+    """Build and save the similar-questions graph of a raw JSON or JSON Lines snapshot"""
+    graph = SimilarGraph.from_problems(iter_records(input_file), hops=hops)
+    graph.save(graph_file)
+    return graph
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Query the similar-questions graph of a scraped snapshot')
+    parser.add_argument('slug', nargs='?', help='Problem title slug to recommend from (omit for graph statistics)')
+    parser.add_argument('--graph', type=str, help='Graph file (defaults to the newest *_similar.npz)')
+    parser.add_argument('--limit', type=int, default=10, help='Number of recommendations')
+    args = parser.parse_args()
+
+    graph_file = args.graph
+    if not graph_file:
+        candidates = glob.glob("*_similar.npz")
+        if not candidates:
+            print("No similar-questions graph found; build one with: python transform_data.py --similar-graph")
+            return
+        graph_file = max(candidates, key=os.path.getmtime)
+    graph = SimilarGraph.load(graph_file)
+
+    if not args.slug:
+        isolated = int((graph.degree == 0).sum())
+        print(f"{len(graph)} problems, {graph.edge_count} edges, {len(graph.component_sizes)} components "
+              f"(largest {graph.component_sizes[0] if len(graph) else 0}), {isolated} without similar questions")
+        print("Most central problems:")
+        for slug, score in graph.most_central(args.limit):
+            print(f"  {slug} ({score:.5f})")
+        return
+
+    started = time.perf_counter()
+    recommendations = graph.recommend(args.slug, args.limit)
+    elapsed = time.perf_counter() - started
+    component, size = graph.component_of(args.slug)
+    index = graph.node(args.slug)
+    print(f"{args.slug}: {graph.degree[index]} similar questions, component {component} of {size} problems, "
+          f"PageRank {graph.pagerank[index]:.5f}")
+    print(f"Recommendations ({elapsed * 1e6:.0f} µs):")
+    for slug in recommendations:
+        other = graph.node(slug)
+        print(f"  {graph.titles[other]} [{graph.difficulties[other]}]: https://leetcode.com/problems/{slug}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from jsonl_io import iter_records
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Key under which a blob reference replaces a large string in a manifest
+BLOB_REF = "$blob"
+
+# Strings shorter than this stay inline; a reference would take about as much space
+MIN_BLOB_SIZE = 64
+
+MANIFEST_EXTENSIONS = (".jsonl.zst", ".jsonl.gz")
+
+def blob_key(data):
+    """Content address of a blob: the first 128 bits of its SHA-256, which keeps manifests small"""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+def _compress(data, codec):
+    """Return (codec, compressed data), keeping blobs that do not shrink uncompressed"""
+    if codec == "zstd":
+        compressed = zstandard.ZstdCompressor(level=10).compress(data)
+    else:
+        compressed = gzip.compress(data, compresslevel=6, mtime=0)
+    return (codec, compressed) if len(compressed) < len(data) else ("raw", data)
+
+def _decompress(data, codec):
+    if codec == "raw":
+        return data
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This snapshot store uses zstd; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+class SnapshotStore:
+    """Content-addressed store of raw snapshots that keeps each problem statement and snippet once
+
+    Large strings (problem `content` and every code snippet's `code`) are stored compressed in a
+    SQLite blob table keyed by a hash of their contents, so the bulk of a daily snapshot that did not
+    change takes no extra space. Each snapshot is a compressed JSON Lines manifest of its problems,
+    with those strings replaced by {"$blob": hash}. Uses zstd when the zstandard package is installed
+    and gzip otherwise; stores written with either codec can be read as long as it is available.
+    put() holds a shared lock on the store's lock file and gc() an exclusive one, so gc never
+    deletes a blob that a snapshot still being written refers to (not available on Windows).
+    """
+    def __init__(self, root="snapshots", codec=None):
+        self.root = root
+        self.manifest_dir = os.path.join(root, "manifests")
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        self.codec = codec or ("zstd" if zstandard is not None else "gzip")
+        if self.codec == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression requires the zstandard package")
+        self.conn = sqlite3.connect(os.path.join(root, "blobs.sqlite3"), timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.blob_cache = {}
+
+    @staticmethod
+    def is_manifest(path):
+        return path.endswith(MANIFEST_EXTENSIONS) and os.path.basename(os.path.dirname(path)) == "manifests"
+
+    @classmethod
+    def from_manifest(cls, path):
+        """Open the store a manifest path belongs to; returns (store, snapshot name)"""
+        root = os.path.dirname(os.path.dirname(path))
+        name = os.path.basename(path)
+        for extension in MANIFEST_EXTENSIONS:
+            if name.endswith(extension):
+                name = name[:-len(extension)]
+        return cls(root or "."), name
+
+    @contextmanager
+    def _lock(self, exclusive=False):
+        """Hold the store's lock file: shared while writing snapshots, exclusive while collecting garbage"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, ".lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def manifest_path(self, name):
+        for extension in MANIFEST_EXTENSIONS:
+            path = os.path.join(self.manifest_dir, name + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _open_manifest(self, path, mode, codec):
+        """Open a manifest as text for reading ("r") or writing ("w")"""
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError(f"{path} is zstd-compressed; install zstandard to read it")
+            raw = open(path, mode + "b")
+            if mode == "w":
+                stream = zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+            else:
+                stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+            return io.TextIOWrapper(stream, encoding="utf-8")
+        return gzip.open(path, mode + "t", encoding="utf-8")
+
+    def _put_blob(self, text, known, new_blobs):
+        data = text.encode("utf-8")
+        if len(data) < MIN_BLOB_SIZE:
+            return text
+        key = blob_key(data)
+        if key not in known:
+            known.add(key)
+            new_blobs.append((key, len(data), *_compress(data, self.codec)))
+        return {BLOB_REF: key}
+
+    def _split(self, problem, known, new_blobs):
+        """Replace a problem's large strings with blob references"""
+        record = dict(problem)
+        if isinstance(record.get("content"), str):
+            record["content"] = self._put_blob(record["content"], known, new_blobs)
+        if isinstance(record.get("codeSnippets"), list):
+            record["codeSnippets"] = [
+                dict(snippet, code=self._put_blob(snippet["code"], known, new_blobs))
+                if isinstance(snippet.get("code"), str) else snippet
+                for snippet in record["codeSnippets"]
+            ]
+        return record
+
+    def put(self, name, problems):
+        """Store a snapshot from an iterable of raw problems, streaming; returns the manifest path"""
+        with self._lock():
+            return self._put(name, problems)
+
+    def _put(self, name, problems):
+        started = time.perf_counter()
+        known = {key for (key,) in self.conn.execute("SELECT hash FROM blobs")}
+        extension = ".jsonl.zst" if self.codec == "zstd" else ".jsonl.gz"
+        path = os.path.join(self.manifest_dir, name + extension)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        count = 0
+        stored = 0
+        new_blobs = []
+        with self._open_manifest(temp_path, "w", self.codec) as f:
+            for problem in problems:
+                f.write(json.dumps(self._split(problem, known, new_blobs), ensure_ascii=False))
+                f.write("\n")
+                count += 1
+                if len(new_blobs) >= 500:
+                    stored += self._write_blobs(new_blobs)
+            stored += self._write_blobs(new_blobs)
+        # Blobs are committed before the manifest that references them appears
+        os.replace(temp_path, path)
+        print(f"Stored snapshot {name}: {count} problems, {stored} new blobs "
+              f"({os.path.getsize(path) / 1024:.0f} KB manifest) in {time.perf_counter() - started:.1f}s")
+        return path
+
+    def _write_blobs(self, new_blobs):
+        count = len(new_blobs)
+        if new_blobs:
+            self.conn.executemany("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)", new_blobs)
+            self.conn.commit()
+            new_blobs.clear()
+        return count
+
+    def import_file(self, path, name=None):
+        """Store an existing raw JSON or JSON Lines snapshot under its file name"""
+        if name is None:
+            name = os.path.basename(path)
+            for extension in (".jsonl", ".json"):
+                if name.endswith(extension):
+                    name = name[:-len(extension)]
+                    break
+        return self.put(name, iter_records(path))
+
+    def get_blob(self, key):
+        text = self.blob_cache.get(key)
+        if text is None:
+            row = self.conn.execute("SELECT codec, data FROM blobs WHERE hash = ?", (key,)).fetchone()
+            if row is None:
+                raise KeyError(f"Missing blob {key}")
+            text = _decompress(row[1], row[0]).decode("utf-8")
+            # Snippets repeat across problems (and content across snapshots), so keep recent blobs around
+            if len(self.blob_cache) >= 4096:
+                self.blob_cache.clear()
+            self.blob_cache[key] = text
+        return text
+
+    def _join(self, record):
+        """Put blob contents back in place of their references"""
+        content = record.get("content")
+        if isinstance(content, dict) and BLOB_REF in content:
+            record["content"] = self.get_blob(content[BLOB_REF])
+        if isinstance(record.get("codeSnippets"), list):
+            for snippet in record["codeSnippets"]:
+                code = snippet.get("code")
+                if isinstance(code, dict) and BLOB_REF in code:
+                    snippet["code"] = self.get_blob(code[BLOB_REF])
+        return record
+
+    def iter_manifest(self, name):
+        """Yield the raw manifest records of a snapshot, with blob references"""
+        path = self.manifest_path(name)
+        if path is None:
+            raise KeyError(f"No snapshot named {name} in {self.root}")
+        with self._open_manifest(path, "r", "zstd" if path.endswith(".zst") else "gzip") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def get(self, name):
+        """Yield the fully reconstructed problems of a snapshot, in their original order"""
+        for record in self.iter_manifest(name):
+            yield self._join(record)
+
+    def export(self, name, path):
+        """Write a snapshot back out as a JSON Lines file or an indented JSON array"""
+        from jsonl_io import JsonArrayWriter, JsonlWriter
+
+        writer = JsonlWriter(path, fsync_every=0) if path.endswith(".jsonl") else JsonArrayWriter(path)
+        try:
+            for problem in self.get(name):
+                writer.write(problem)
+        finally:
+            writer.close()
+        print(f"Exported snapshot {name} ({writer.count} problems) to {path}")
+        return writer.count
+
+    def snapshots(self):
+        """Names of stored snapshots, oldest first"""
+        names = []
+        for filename in os.listdir(self.manifest_dir):
+            for extension in MANIFEST_EXTENSIONS:
+                if filename.endswith(extension):
+                    names.append((os.path.getmtime(os.path.join(self.manifest_dir, filename)), filename[:-len(extension)]))
+        return [name for _, name in sorted(names)]
+
+    def delete(self, name):
+        path = self.manifest_path(name)
+        if path:
+            os.remove(path)
+
+    def gc(self):
+        """Delete blobs no snapshot refers to any more; returns the number removed
+        
+        Waits for snapshots being stored to finish, and blocks new ones until it is done.
+        """
+        with self._lock(exclusive=True):
+            return self._gc()
+
+    def _gc(self):
+        referenced = set()
+        for name in self.snapshots():
+            for record in self.iter_manifest(name):
+                content = record.get("content")
+                if isinstance(content, dict):
+                    referenced.add(content.get(BLOB_REF))
+                for snippet in record.get("codeSnippets") or []:
+                    if isinstance(snippet.get("code"), dict):
+                        referenced.add(snippet["code"].get(BLOB_REF))
+        unreferenced = [(key,) for (key,) in self.conn.execute("SELECT hash FROM blobs") if key not in referenced]
+        self.conn.executemany("DELETE FROM blobs WHERE hash = ?", unreferenced)
+        self.conn.commit()
+        if unreferenced:
+            self.conn.execute("VACUUM")
+        return len(unreferenced)
+
+    def stats(self):
+        blobs, raw_size, stored_size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+        manifest_size = sum(os.path.getsize(os.path.join(self.manifest_dir, f)) for f in os.listdir(self.manifest_dir))
+        return {"snapshots": len(self.snapshots()), "blobs": blobs, "blob_bytes": raw_size,
+                "blob_stored_bytes": stored_size, "manifest_bytes": manifest_size}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def iter_snapshot(manifest_file):
+    """Yield the reconstructed problems of the snapshot a manifest path refers to"""
+    store, name = SnapshotStore.from_manifest(manifest_file)
+    with store:
+        yield from store.get(name)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Content-addressed, compressed store of raw LeetCode snapshots')
+    parser.add_argument('--store', type=str, default='snapshots', help='Snapshot store directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help='Add existing raw snapshot files to the store')
+    import_parser.add_argument('files', nargs='+')
+    export_parser = subparsers.add_parser('export', help='Reconstruct a snapshot as .json or .jsonl')
+    export_parser.add_argument('name')
+    export_parser.add_argument('output')
+    subparsers.add_parser('list', help='List stored snapshots and disk usage')
+    delete_parser = subparsers.add_parser('delete', help='Delete snapshots and the blobs only they used')
+    delete_parser.add_argument('names', nargs='+')
+    args = parser.parse_args()
+
+    with SnapshotStore(args.store) as store:
+        if args.command == 'import':
+            for path in args.files:
+                store.import_file(path)
+        elif args.command == 'export':
+            store.export(args.name, args.output)
+        elif args.command == 'delete':
+            for name in args.names:
+                store.delete(name)
+            print(f"Removed {store.gc()} unreferenced blobs")
+        else:
+            for name in store.snapshots():
+                print(name)
+            stats = store.stats()
+            total = stats["blob_stored_bytes"] + stats["manifest_bytes"]
+            print(f"{stats['snapshots']} snapshots, {stats['blobs']} blobs ({stats['blob_bytes'] / 1e6:.1f} MB raw, "
+                  f"{stats['blob_stored_bytes'] / 1e6:.1f} MB compressed), manifests {stats['manifest_bytes'] / 1e6:.1f} MB, "
+                  f"{total / 1e6:.1f} MB in total ({store.codec})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from jsonl_io import iter_jsonl, iter_records
+
+MANIFEST_FILE = "manifest.json"
+INDEX_FILE = "index.jsonl"
+
+def snippet_hash(code):
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()[:32]
+
+def problem_snippets(problem):
+    """(Id, slug, snippets) of a raw problem (codeSnippets) or a transformed one (code_snippets)"""
+    problem_id = problem.get("Id", problem.get("questionFrontendId"))
+    slug = problem.get("titleSlug")
+    if slug is None and problem.get("url"):
+        slug = problem["url"].rstrip("/").rsplit("/", 1)[-1]
+    snippets = problem.get("codeSnippets", problem.get("code_snippets")) or []
+    return problem_id, slug, snippets
+
+def _write_shard(path, entries):
+    """Write one language's unique snippets to a JSON Lines shard"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False))
+            f.write("\n")
+    os.replace(temp_path, path)
+    return len(entries)
+
+def export_snippets(problems, output_dir="snippets", workers=None, source=None):
+    """Write code snippets as one deduplicated JSON Lines shard per language, plus an index and manifest
+
+    Each `<langSlug>.jsonl` shard lists every distinct starter code of that language once, with
+    the IDs of the problems that use it, so extracting a language is one sequential read.
+    `index.jsonl` maps each (problem, language) pair to its snippet hash, and `manifest.json`
+    describes the shards. Shards are written concurrently, each to a temporary file first.
+    """
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    shards = {}
+    languages = {}
+    index = []
+    problem_count = 0
+    for problem in problems:
+        problem_id, slug, snippets = problem_snippets(problem)
+        problem_count += 1
+        for snippet in snippets:
+            lang_slug = snippet.get("langSlug")
+            code = snippet.get("code")
+            if not lang_slug or code is None:
+                continue
+            key = snippet_hash(code)
+            entries = shards.setdefault(lang_slug, {})
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = {"hash": key, "code": code, "problems": []}
+                languages.setdefault(lang_slug, {"lang": snippet.get("lang"), "file": f"{lang_slug}.jsonl",
+                                                 "snippets": 0, "unique": 0})
+                languages[lang_slug]["unique"] += 1
+            entry["problems"].append(problem_id)
+            languages[lang_slug]["snippets"] += 1
+            index.append({"Id": problem_id, "slug": slug, "langSlug": lang_slug, "hash": key})
+
+    # Shards are independent files, so they are written in parallel
+    with ThreadPoolExecutor(max_workers=workers or min(8, len(shards) or 1)) as executor:
+        list(executor.map(lambda lang_slug: _write_shard(os.path.join(output_dir, f"{lang_slug}.jsonl"),
+                                                         list(shards[lang_slug].values())), shards))
+    _write_shard(os.path.join(output_dir, INDEX_FILE), index)
+
+    # Remove shards of languages that were in the previous export but are gone now
+    manifest_file = os.path.join(output_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_file):
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get("languages", {})
+        for lang_slug, info in previous.items():
+            if lang_slug not in languages and os.path.exists(os.path.join(output_dir, info["file"])):
+                os.remove(os.path.join(output_dir, info["file"]))
+
+    manifest = {
+        "source": source,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "problems": problem_count,
+        "languages": dict(sorted(languages.items()))
+    }
+    temp_path = f"{manifest_file}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, manifest_file)
+
+    total = sum(info["snippets"] for info in languages.values())
+    unique = sum(info["unique"] for info in languages.values())
+    print(f"Exported {total} snippets of {problem_count} problems in {len(languages)} languages to {output_dir} "
+          f"({unique} unique) in {time.perf_counter() - started:.1f}s")
+    return manifest
+
+class SnippetCorpus:
+    """Read a snippet export written by export_snippets"""
+    def __init__(self, directory="snippets"):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.shards = {}
+        self.index = None
+
+    def languages(self):
+        return list(self.manifest["languages"])
+
+    def iter_unique(self, lang_slug):
+        """Yield the distinct snippets of a language: {"hash", "code", "problems"}"""
+        info = self.manifest["languages"].get(lang_slug)
+        if info is None:
+            raise KeyError(f"No {lang_slug} snippets in {self.directory}")
+        return iter_jsonl(os.path.join(self.directory, info["file"]))
+
+    def iter_language(self, lang_slug):
+        """Yield (problem ID, code) for every problem with a snippet in this language"""
+        for entry in self.iter_unique(lang_slug):
+            for problem_id in entry["problems"]:
+                yield problem_id, entry["code"]
+
+    def get(self, problem_id, lang_slug):
+        """The starter code of one problem in one language, or None"""
+        if self.index is None:
+            self.index = {(entry["Id"], entry["langSlug"]): entry["hash"]
+                          for entry in iter_jsonl(os.path.join(self.directory, INDEX_FILE))}
+        key = self.index.get((str(problem_id), lang_slug))
+        if key is None:
+            return None
+        if lang_slug not in self.shards:
+            self.shards[lang_slug] = {entry["hash"]: entry["code"] for entry in self.iter_unique(lang_slug)}
+        return self.shards[lang_slug][key]
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export code snippets into deduplicated per-language shards')
+    parser.add_argument('--input', type=str,
+                        help='Raw or transformed JSON or JSON Lines file (defaults to the newest raw snapshot)')
+    parser.add_argument('--output-dir', type=str, default='snippets', help='Directory for the shards and manifest')
+    parser.add_argument('--workers', type=int, help='Shards written at once (defaults to up to 8)')
+    parser.add_argument('--lang', type=str, help='Print the snippets of one language from an existing export instead')
+    args = parser.parse_args()
+
+    if args.lang:
+        corpus = SnippetCorpus(args.output_dir)
+        for problem_id, code in corpus.iter_language(args.lang):
+            print(f"# {problem_id}\n{code}")
+        return
+
+    input_file = args.input
+    if not input_file:
+        from transform_data import find_snapshot_files
+        candidates = find_snapshot_files("leetcode_*.json*")
+        if not candidates:
+            print("No LeetCode problem files found in the current directory")
+            return
+        input_file = max(candidates, key=os.path.getmtime)
+    export_snippets(iter_records(input_file), args.output_dir, args.workers, source=input_file)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+
+from jsonl_io import iter_records
+
+# One fixed-width row per problem per snapshot; missing integers are stored as -1 and missing rates as NaN
+HISTORY_DTYPE = np.dtype([
+    ("scraped_at", "<f8"),
+    ("problem_id", "<i4"),
+    ("acceptance_rate", "<f4"),
+    ("total_submissions", "<i8"),
+    ("total_accepted", "<i8"),
+    ("likes", "<i4"),
+    ("dislikes", "<i4"),
+    ("discussion_count", "<i4"),
+])
+
+HISTORY_FIELDS = HISTORY_DTYPE.names[2:]
+
+GROWTH_DTYPE = np.dtype([("problem_id", "<i4"), ("start", "<f8"), ("end", "<f8"), ("change", "<f8"),
+                         ("change_per_day", "<f8")])
+
+SNAPSHOT_TIMESTAMP = re.compile(r"(\d{8}_\d{6})")
+
+def _int_or_missing(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+def snapshot_time(path):
+    """When a snapshot was scraped: the timestamp in its file name, or its modification time"""
+    match = SNAPSHOT_TIMESTAMP.search(os.path.basename(path))
+    if match:
+        return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()
+    return os.path.getmtime(path)
+
+class StatsHistory:
+    """Append-only history of per-problem stats, one row per problem per scrape
+
+    Rows are fixed-width records (HISTORY_DTYPE) appended to `stats.bin`, so the whole history can
+    be memory-mapped as a NumPy structured array and queried with vectorized operations. Ingested
+    snapshots are listed in `snapshots.jsonl` so the same snapshot is never appended twice.
+    Accepts transformed problems (acceptance_rate, total_submissions, ...) or raw ones (stats JSON).
+    """
+    def __init__(self, directory="stats_history"):
+        self.directory = directory
+        self.data_path = os.path.join(directory, "stats.bin")
+        self.snapshots_path = os.path.join(directory, "snapshots.jsonl")
+        os.makedirs(directory, exist_ok=True)
+
+    def snapshots(self):
+        if not os.path.exists(self.snapshots_path):
+            return []
+        with open(self.snapshots_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    @staticmethod
+    def _row(problem, scraped_at):
+        problem_id = _int_or_missing(problem.get("Id", problem.get("questionFrontendId")))
+        if problem_id < 0:
+            return None
+        if "acceptance_rate" in problem:
+            stats = problem
+        else:
+            # Raw problems keep their stats in a JSON string
+            from transform_data import extract_stats
+            stats = extract_stats(problem.get("stats"))
+        rate = stats.get("acceptance_rate")
+        return (scraped_at, problem_id, np.nan if rate is None else rate,
+                _int_or_missing(stats.get("total_submissions")), _int_or_missing(stats.get("total_accepted")),
+                _int_or_missing(problem.get("likes")), _int_or_missing(problem.get("dislikes")),
+                _int_or_missing(problem.get("discussion_count", problem.get("discussionCount"))))
+
+    def append(self, problems, scraped_at=None, source=None):
+        """Append one row per problem for a snapshot taken at `scraped_at` (a Unix timestamp)
+
+        Returns the number of rows appended, or 0 if `source` was already ingested.
+        """
+        if source and any(snapshot.get("source") == source for snapshot in self.snapshots()):
+            return 0
+        scraped_at = time.time() if scraped_at is None else scraped_at
+        rows = [row for row in (self._row(problem, scraped_at) for problem in problems) if row is not None]
+        array = np.array(rows, dtype=HISTORY_DTYPE)
+        with open(self.data_path, "ab") as f:
+            # Drop a partial trailing row left by a crash, or every row appended after it is misaligned
+            size = f.seek(0, os.SEEK_END)
+            if size % HISTORY_DTYPE.itemsize:
+                print(f"Discarding {size % HISTORY_DTYPE.itemsize} bytes of incomplete data at the end of "
+                      f"{self.data_path}")
+                f.truncate(size - size % HISTORY_DTYPE.itemsize)
+            array.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # The snapshot is only recorded once its rows are on disk
+        with open(self.snapshots_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"source": source, "scraped_at": scraped_at, "rows": len(array)}) + "\n")
+        return len(array)
+
+    def ingest_file(self, path):
+        """Append a raw or transformed snapshot file, keyed by its content hash"""
+        from transform_data import file_sha256
+        return self.append(iter_records(path), snapshot_time(path), source=file_sha256(path))
+
+    def load(self):
+        """Return all rows as a read-only memory-mapped structured array"""
+        if not os.path.exists(self.data_path) or os.path.getsize(self.data_path) == 0:
+            return np.zeros(0, dtype=HISTORY_DTYPE)
+        # Ignore a partial trailing row left by a crash during append
+        count = os.path.getsize(self.data_path) // HISTORY_DTYPE.itemsize
+        return np.memmap(self.data_path, dtype=HISTORY_DTYPE, mode="r", shape=(count,))
+
+    def series(self, problem_id):
+        """All rows for one problem, oldest first"""
+        rows = self.load()
+        rows = rows[rows["problem_id"] == problem_id]
+        return np.array(rows[np.argsort(rows["scraped_at"], kind="stable")])
+
+    @staticmethod
+    def _last_per_problem(rows):
+        """The most recent row of each problem in `rows`"""
+        order = np.lexsort((rows["scraped_at"], rows["problem_id"]))
+        rows = rows[order]
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = rows["problem_id"][1:] != rows["problem_id"][:-1]
+        return rows[last]
+
+    def latest(self, at=None):
+        """The most recent row of every problem, as of `at` (default: now)"""
+        rows = self.load()
+        if at is not None:
+            rows = rows[rows["scraped_at"] <= at]
+        return self._last_per_problem(rows)
+
+    def growth(self, field="total_submissions", days=30, top=50, at=None):
+        """Problems with the largest increase in `field` over the last `days`, largest first
+
+        Compares each problem's latest value with its value at the start of the window (the last row
+        before it, or the first row inside it for problems first seen during the window). The window
+        ends at `at`, by default the most recent snapshot. Returns a structured array of problem_id,
+        start, end, change and change_per_day.
+        """
+        if field not in HISTORY_FIELDS:
+            raise ValueError(f"Unknown field {field!r}; expected one of {', '.join(HISTORY_FIELDS)}")
+        rows = self.load()
+        if at is not None:
+            rows = rows[rows["scraped_at"] <= at]
+        if len(rows) == 0:
+            return np.zeros(0, dtype=GROWTH_DTYPE)
+        at = rows["scraped_at"].max() if at is None else at
+        cutoff = at - days * 86400
+        rows = rows[np.lexsort((rows["scraped_at"], rows["problem_id"]))]
+
+        # Rows are grouped by problem and oldest first, so rows up to the cutoff are a prefix of each group
+        starts = np.flatnonzero(np.r_[True, rows["problem_id"][1:] != rows["problem_id"][:-1]])
+        ends = np.r_[starts[1:], len(rows)] - 1
+        before_cutoff = np.add.reduceat((rows["scraped_at"] <= cutoff).astype(np.int64), starts)
+        first = rows[starts + np.maximum(before_cutoff - 1, 0)]
+        last = rows[ends]
+
+        start_values = first[field].astype(np.float64)
+        end_values = last[field].astype(np.float64)
+        if field != "acceptance_rate":
+            missing = (first[field] < 0) | (last[field] < 0)
+            start_values[missing] = np.nan
+            end_values[missing] = np.nan
+        elapsed_days = (last["scraped_at"] - first["scraped_at"]) / 86400
+
+        result = np.zeros(len(last), dtype=GROWTH_DTYPE)
+        result["problem_id"] = last["problem_id"]
+        result["start"] = start_values
+        result["end"] = end_values
+        result["change"] = end_values - start_values
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["change_per_day"] = result["change"] / elapsed_days
+        # Problems seen only once in the window have no change to rank
+        result = result[(elapsed_days > 0) & ~np.isnan(result["change"])]
+        return result[np.argsort(-result["change"], kind="stable")][:top]
+
+def main():
+    import argparse
+    from transform_data import find_snapshot_files
+
+    parser = argparse.ArgumentParser(description='Per-problem stats history across scrapes')
+    parser.add_argument('--history-dir', type=str, default='stats_history', help='History store directory')
+    parser.add_argument('--ingest', type=str, nargs='+', metavar='FILE_OR_GLOB',
+                        help='Append raw or transformed snapshots (already ingested files are skipped)')
+    parser.add_argument('--growth', type=str, choices=HISTORY_FIELDS,
+                        help='Show the problems whose FIELD grew the most')
+    parser.add_argument('--days', type=float, default=30, help='Window for --growth in days')
+    parser.add_argument('--top', type=int, default=50, help='Number of problems for --growth')
+    parser.add_argument('--problem', type=int, help='Show the history of one problem ID')
+    args = parser.parse_args()
+
+    history = StatsHistory(args.history_dir)
+    for pattern in args.ingest or []:
+        # Files named explicitly are ingested as given; globs and directories only match raw snapshots,
+        # so metrics files and transformed copies of the same snapshots are skipped
+        paths = [pattern] if os.path.isfile(pattern) else find_snapshot_files(pattern)
+        for path in sorted(paths, key=snapshot_time):
+            try:
+                rows = history.ingest_file(path)
+            except ValueError as e:
+                print(f"Skipping {path}: {e}")
+                continue
+            print(f"Appended {rows} rows from {path}" if rows else f"Skipping {path} (already ingested)")
+
+    if args.problem is not None:
+        for row in history.series(args.problem):
+            when = datetime.fromtimestamp(row["scraped_at"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{when}  " + "  ".join(f"{field}={row[field]}" for field in HISTORY_FIELDS))
+
+    if args.growth:
+        started = time.perf_counter()
+        result = history.growth(args.growth, args.days, args.top)
+        elapsed = time.perf_counter() - started
+        print(f"Top {len(result)} problems by {args.growth} growth over {args.days:g} days "
+              f"({len(history.load())} rows, {elapsed * 1000:.1f} ms)")
+        for row in result:
+            print(f"{row['problem_id']:>6}  {row['start']:>14,.1f} -> {row['end']:>14,.1f}  "
+                  f"{row['change']:+,.1f} ({row['change_per_day']:+,.1f}/day)")
+
+    if not (args.ingest or args.growth or args.problem is not None):
+        snapshots = history.snapshots()
+        print(f"{len(snapshots)} snapshots, {len(history.load())} rows in {args.history_dir}")
+
+if __name__ == "__main__":
+    main()
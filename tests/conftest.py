@@ -0,0 +1,21 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pytest
+
+@pytest.fixture
+def run_scraper(tmp_path, monkeypatch):
+    """Run leetcode_scraper.main() in tmp_path with the given command line arguments"""
+    import leetcode_scraper
+
+    monkeypatch.chdir(tmp_path)
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["leetcode_scraper.py", "--no-session-store", "--rps", "0", *args])
+        leetcode_scraper.main()
+
+    return run
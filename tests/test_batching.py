@@ -0,0 +1,23 @@
+from mock_server import MockLeetcodeServer
+
+import leetcode_scraper
+from leetcode_scraper import LeetcodeScraper
+
+def test_oversized_batch_response_shrinks_following_batches(monkeypatch):
+    # Every batch response of more than one problem exceeds the cap
+    monkeypatch.setattr(leetcode_scraper, "MAX_BATCH_RESPONSE_BYTES", 1000)
+    with MockLeetcodeServer(count=40, latency=0) as server:
+        scraper = LeetcodeScraper(rps=0, batch_size=16, base_url=server.base_url)
+        sizes = []
+        fetch_batch = scraper._fetch_detail_batch
+        def recording_fetch(title_slugs):
+            sizes.append(len(title_slugs))
+            return fetch_batch(title_slugs)
+        scraper._fetch_detail_batch = recording_fetch
+
+        problems = scraper.get_all_problems()
+        details = list(scraper.iter_problem_details(problems))
+
+    assert len(details) == 40
+    assert sizes[:3] == [16, 8, 4]
+    assert scraper.batch_size < 16
@@ -0,0 +1,60 @@
+import json
+
+from mock_server import MockLeetcodeServer
+from synthetic_corpus import generate_corpus
+
+from leetcode_scraper import LeetcodeScraper
+from problem_catalog import ProblemCatalog
+from response_cache import ResponseCache
+
+def test_refreshed_catalog_bypasses_cached_problem_list(tmp_path):
+    problems = generate_corpus(6)
+    with MockLeetcodeServer(problems=problems[:5], latency=0) as server:
+        cache = ResponseCache(str(tmp_path / "cache"))
+        scraper = LeetcodeScraper(rps=0, cache=cache, base_url=server.base_url,
+                                  catalog_file=str(tmp_path / "catalog.json"))
+        assert len(scraper.get_catalog()) == 5
+
+        # A problem is published after the list was cached
+        server.problems.append(problems[5])
+        server.by_slug[problems[5]["titleSlug"]] = problems[5]
+        assert len(scraper.get_catalog()) == 5
+        assert len(scraper.get_catalog(refresh=True)) == 6
+        assert problems[5]["titleSlug"] in {p["titleSlug"] for p in scraper.select_latest_problems(1)}
+
+        # Later runs that reuse the cache see the new list too
+        fresh = LeetcodeScraper(rps=0, cache=cache, base_url=server.base_url)
+        assert len(fresh.get_all_problems()) == 6
+        cache.close()
+
+def test_catalog_file_is_reused_within_its_ttl(tmp_path):
+    catalog_file = str(tmp_path / "catalog.json")
+    with MockLeetcodeServer(count=5, latency=0) as server:
+        LeetcodeScraper(rps=0, base_url=server.base_url, catalog_file=catalog_file).get_catalog()
+        assert server.request_count == 1
+
+        reloaded = LeetcodeScraper(rps=0, base_url=server.base_url, catalog_file=catalog_file).get_catalog()
+        assert server.request_count == 1
+        assert [p["titleSlug"] for p in reloaded.id_range(2, 3)] == [p["titleSlug"] for p in server.problems[1:3]]
+
+        LeetcodeScraper(rps=0, base_url=server.base_url, catalog_file=catalog_file, catalog_ttl=0).get_catalog()
+        assert server.request_count == 2
+
+def test_malformed_catalog_file_is_rebuilt(tmp_path):
+    catalog_file = tmp_path / "catalog.json"
+    with MockLeetcodeServer(count=5, latency=0) as server:
+        ProblemCatalog(server.problems).save(str(catalog_file), source=server.base_url)
+        saved = json.loads(catalog_file.read_text())
+        broken = [
+            dict(saved, problems=None),
+            {key: value for key, value in saved.items() if key != "built_at"},
+            dict(saved, built_at="yesterday"),
+            dict(saved, problems=["not a problem"]),
+            [saved],
+        ]
+        for requests_made, data in enumerate(broken, 1):
+            catalog_file.write_text(json.dumps(data))
+            scraper = LeetcodeScraper(rps=0, base_url=server.base_url, catalog_file=str(catalog_file))
+            assert len(scraper.get_catalog()) == 5
+            assert server.request_count == requests_made
+            assert ProblemCatalog.load(str(catalog_file), source=server.base_url) is not None
@@ -0,0 +1,35 @@
+import pytest
+from synthetic_corpus import generate_corpus
+
+from transform_data import CSV_FIELDNAMES, ColumnarWriter, transform_problem
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+@pytest.fixture
+def records():
+    records = [transform_problem(problem) for problem in generate_corpus(25)]
+    records[3]["tags"] = None
+    records[5]["difficulty"] = None
+    return records
+
+def expected(records):
+    return [{field: record.get(field) for field in CSV_FIELDNAMES} for record in records]
+
+def test_parquet_is_written_one_row_group_per_chunk(tmp_path, records):
+    path = str(tmp_path / "problems.parquet")
+    with ColumnarWriter(path, row_group_size=10) as writer:
+        for record in records:
+            writer.write(record)
+    assert pq.ParquetFile(path).num_row_groups == 3
+    assert pq.read_table(path).to_pylist() == expected(records)
+
+def test_arrow_batches_share_growing_dictionaries(tmp_path, records):
+    path = str(tmp_path / "problems.arrow")
+    with ColumnarWriter(path, row_group_size=10) as writer:
+        for record in records:
+            writer.write(record)
+            assert len(writer.columns["Id"]) < 10
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    assert reader.num_record_batches == 3
+    assert reader.read_all().to_pylist() == expected(records)
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from mock_server import MockLeetcodeServer
+
+from leetcode_scraper import LeetcodeScraper, TokenBucket
+
+def test_ordered_map_keeps_input_order_with_bounded_concurrency():
+    with MockLeetcodeServer(count=1, latency=0) as server:
+        scraper = LeetcodeScraper(rps=0, concurrency=4, base_url=server.base_url)
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work(item):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        # Later items finish first, so results complete out of order
+        time.sleep(0.002 * (20 - item))
+        with lock:
+            running -= 1
+        return item * item
+
+    assert list(scraper._ordered_map(work, range(20))) == [item * item for item in range(20)]
+    assert peak == 4
+
+def test_concurrent_fetch_returns_details_in_problem_order():
+    with MockLeetcodeServer(count=30, latency=0.01, jitter=0.02) as server:
+        scraper = LeetcodeScraper(rps=0, concurrency=8, base_url=server.base_url, quiet=True)
+        problems = scraper.get_all_problems()
+        details = list(scraper.iter_problem_details(problems))
+        assert [detail["titleSlug"] for detail in details] == [problem["titleSlug"] for problem in problems]
+        assert server.request_count == 1 + 30
+
+def test_token_bucket_limits_the_request_rate_across_threads():
+    bucket = TokenBucket(50.0, capacity=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 20 tokens at 50 per second, the first of them immediately
+    assert time.monotonic() - started >= 19 / 50 * 0.95
+
+def test_zero_rate_disables_limiting():
+    bucket = TokenBucket(0)
+    started = time.monotonic()
+    for _ in range(1000):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.5
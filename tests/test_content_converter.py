@@ -0,0 +1,16 @@
+from transform_data import ContentConverter, convert_content
+
+def test_process_pool_is_reused_across_batches_and_stopped_on_close():
+    converter = ContentConverter(None, workers=2, parallel_threshold=2)
+    first = [f"<p>Problem <b>{i}</b></p>" for i in range(4)]
+    second = [f"<p>Problem <i>{i}</i></p>" for i in range(4)]
+
+    converter.prepare(first)
+    executor = converter.executor
+    assert executor is not None
+    converter.prepare(second)
+    assert converter.executor is executor
+    assert [converter.convert(content) for content in second] == [convert_content(content) for content in second]
+
+    converter.close()
+    assert converter.executor is None
@@ -0,0 +1,36 @@
+from mock_server import MockLeetcodeServer
+
+from leetcode_scraper import LeetcodeScraper
+
+def scrape(server, profile, previous=None):
+    scraper = LeetcodeScraper(rps=0, profile=profile, base_url=server.base_url, quiet=True)
+    problems = scraper.get_all_problems()
+    if previous is None:
+        return list(scraper.iter_problem_details(problems))
+    return list(scraper.iter_updated_problems(previous, problems))
+
+def test_same_profile_carries_records_over():
+    with MockLeetcodeServer(count=5, latency=0) as server:
+        previous = scrape(server, "meta")
+        requests_before = server.request_count
+        assert scrape(server, "meta", previous) == previous
+        # Only the problem list was requested again
+        assert server.request_count == requests_before + 1
+
+def test_other_profile_refetches_instead_of_mixing_field_sets():
+    with MockLeetcodeServer(count=5, latency=0) as server:
+        previous = scrape(server, "meta")
+        assert all(record["queryProfile"] == "meta" and "content" not in record for record in previous)
+
+        merged = scrape(server, "full", previous)
+        assert len(merged) == 5
+        assert all(record["queryProfile"] == "full" and "content" in record for record in merged)
+
+def test_unstamped_records_count_as_full_profile():
+    with MockLeetcodeServer(count=5, latency=0) as server:
+        previous = scrape(server, "full")
+        for record in previous:
+            del record["queryProfile"]
+        requests_before = server.request_count
+        assert len(scrape(server, "full", previous)) == 5
+        assert server.request_count == requests_before + 1
@@ -0,0 +1,21 @@
+import json
+
+from jsonl_io import JsonArrayWriter, compact_jsonl_to_json
+
+RECORDS = [{"Id": "1", "name": "Two Sum", "tags": ["Array", "Hash Table"], "content": "<p>é</p>"},
+           {"Id": "2", "name": "Add Two Numbers", "similar_questions": [], "stats": {}}]
+
+def test_json_array_writer_matches_json_dump_layout(tmp_path):
+    for records in (RECORDS, []):
+        path = tmp_path / "array.json"
+        with JsonArrayWriter(str(path)) as writer:
+            for record in records:
+                writer.write(record)
+        assert path.read_text(encoding="utf-8") == json.dumps(records, ensure_ascii=False, indent=2)
+
+def test_compacted_jsonl_matches_json_dump_layout(tmp_path):
+    jsonl_path = tmp_path / "partial.jsonl"
+    jsonl_path.write_text("".join(json.dumps(record) + "\n" for record in RECORDS), encoding="utf-8")
+    json_path = tmp_path / "snapshot.json"
+    assert compact_jsonl_to_json(str(jsonl_path), str(json_path)) == 2
+    assert json_path.read_text(encoding="utf-8") == json.dumps(RECORDS, ensure_ascii=False, indent=2)
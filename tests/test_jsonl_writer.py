@@ -0,0 +1,62 @@
+import json
+import os
+
+import jsonl_io
+from jsonl_io import JsonlWriter, iter_jsonl, repair_jsonl_tail
+from mock_server import MockLeetcodeServer
+
+def test_fsync_every_n_records_and_on_close(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(jsonl_io.os, "fsync", lambda fd: synced.append(fd))
+    with JsonlWriter(str(tmp_path / "out.jsonl"), fsync_every=3, fsync_interval=3600) as writer:
+        for number in range(7):
+            writer.write({"n": number})
+        assert len(synced) == 2
+    assert len(synced) == 3
+
+    synced.clear()
+    with JsonlWriter(str(tmp_path / "out.jsonl"), fsync_every=0) as writer:
+        for number in range(100):
+            writer.write({"n": number})
+        assert synced == []
+    assert len(synced) == 1
+
+def test_fsync_after_the_interval(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(jsonl_io.os, "fsync", lambda fd: synced.append(fd))
+    with JsonlWriter(str(tmp_path / "out.jsonl"), fsync_every=1000, fsync_interval=0) as writer:
+        writer.write({"n": 1})
+        writer.write({"n": 2})
+        assert len(synced) == 2
+
+def test_append_repairs_a_torn_last_line(tmp_path, capsys):
+    path = tmp_path / "partial.jsonl"
+    path.write_text('{"n": 1}\n{"n": 2}\n{"n": 3, "con', encoding="utf-8")
+    with JsonlWriter(str(path), append=True) as writer:
+        writer.write({"n": 4})
+    assert "Discarding 13 bytes" in capsys.readouterr().out
+    assert [record["n"] for record in iter_jsonl(str(path))] == [1, 2, 4]
+
+    # Files that end on a complete line are left alone
+    size = os.path.getsize(path)
+    repair_jsonl_tail(str(path))
+    assert os.path.getsize(path) == size
+
+def test_resume_fetches_only_the_remaining_problems(tmp_path, run_scraper):
+    with MockLeetcodeServer(count=10, latency=0) as server:
+        details = [server.answer({"query": "question(titleSlug: $titleSlug) { questionId titleSlug }",
+                                  "variables": {"titleSlug": f"synthetic-problem-{number}"}})["data"]["question"]
+                   for number in range(1, 5)]
+        # An interrupted run left four problems and half of a fifth
+        partial = tmp_path / "leetcode_problems_1_to_10.partial.jsonl"
+        partial.write_text("".join(json.dumps(detail) + "\n" for detail in details) + '{"questionId": "5", "ti',
+                           encoding="utf-8")
+
+        run_scraper("--base-url", server.base_url, "--no-cache", "--start-id", "1", "--end-id", "10", "--resume")
+        # The problem list, then one request per remaining problem
+        assert server.request_count == 1 + 6
+
+    (snapshot,) = tmp_path.glob("leetcode_problems_1_to_10_*[0-9].json")
+    slugs = [record["titleSlug"] for record in json.loads(snapshot.read_text(encoding="utf-8"))]
+    assert sorted(slugs) == sorted(f"synthetic-problem-{number}" for number in range(1, 11))
+    assert not partial.exists()
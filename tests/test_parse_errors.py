@@ -0,0 +1,32 @@
+import json
+
+from synthetic_corpus import generate_corpus
+
+from transform_data import EMPTY_STATS, PARSE_ERRORS, transform_leetcode_data_streaming
+
+def test_unparseable_fields_are_counted_and_reported(tmp_path, capsys):
+    problems = generate_corpus(10, content_size=100)
+    problems[2]["stats"] = '{"acRate": "50'
+    problems[4]["stats"] = "not json"
+    problems[4]["companyTagStats"] = "[1, 2]"
+    problems[7]["similarQuestions"] = "{broken"
+    problems[8]["stats"] = None
+    input_file = tmp_path / "leetcode_problems.jsonl"
+    input_file.write_text("".join(json.dumps(problem) + "\n" for problem in problems))
+
+    transform_leetcode_data_streaming(str(input_file), str(tmp_path / "transformed.json"), chunk_size=3)
+    report = capsys.readouterr().out
+    assert ("Unparseable fields left empty: companyTagStats 1, similarQuestions 1, stats 2 "
+            "(first bad stats: '{\"acRate\": \"50')") in report
+
+    # Bad fields are left empty and do not affect the rest of the record
+    transformed = {record["Id"]: record for record in json.loads((tmp_path / "transformed.json").read_text())}
+    assert {key: transformed["3"][key] for key in EMPTY_STATS} == EMPTY_STATS
+    assert transformed["5"]["companies"] == [] and transformed["5"]["tags"]
+    assert transformed["8"]["similar_questions"] == []
+    assert transformed["9"]["acceptance_rate"] is None
+
+    # The report resets the counters, so the next file starts clean
+    assert PARSE_ERRORS.counts == {}
+    transform_leetcode_data_streaming(str(input_file), str(tmp_path / "again.json"))
+    assert "companyTagStats 1, similarQuestions 1, stats 2 " in capsys.readouterr().out
@@ -0,0 +1,33 @@
+import threading
+import time
+
+from leetcode_scraper import AimdController, TokenBucket
+
+def test_failures_of_requests_in_flight_count_as_one_decrease():
+    bucket = TokenBucket(5.0)
+    controller = AimdController(bucket, log=lambda message: None)
+    sent_at = time.perf_counter()
+    for _ in range(6):
+        controller.on_failure(sent_at)
+    assert bucket.rate == 2.5
+
+    # A request sent after the decrease that is throttled again halves the rate once more
+    controller.on_failure(time.perf_counter())
+    assert bucket.rate == 1.25
+
+def test_concurrent_updates_are_not_lost():
+    bucket = TokenBucket(100.0)
+    controller = AimdController(bucket, min_rate=0.001, increase_steps=100_000, log=lambda message: None)
+    controller.on_failure()
+    assert bucket.rate == 50.0
+
+    def succeed():
+        for _ in range(1000):
+            controller.on_success()
+
+    threads = [threading.Thread(target=succeed) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert abs(bucket.rate - (50.0 + 8000 * 100.0 / 100_000)) < 1e-9
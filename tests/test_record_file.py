@@ -0,0 +1,45 @@
+import pytest
+from synthetic_corpus import generate_corpus
+
+from record_file import RecordFile, build_record_file, index_path
+from transform_data import transform_problem
+
+@pytest.fixture
+def records():
+    return [transform_problem(problem) for problem in generate_corpus(50)]
+
+def test_lookup_by_id_and_slug_after_reopen(tmp_path, records):
+    path = str(tmp_path / "problems_records.jsonl")
+    assert build_record_file(records, path) == 50
+
+    with RecordFile(path) as reopened:
+        assert len(reopened) == 50
+        assert reopened.get("17") == records[16]
+        assert reopened.get(17) == records[16]
+        slug = records[41]["url"].rstrip("/").rsplit("/", 1)[-1]
+        assert reopened.by_slug(slug) == records[41]
+        assert reopened.get("9999") is None and reopened.by_slug("no-such-problem") is None
+        assert "50" in reopened and "51" not in reopened
+        assert reopened[0] == records[0]
+        assert list(reopened) == records
+        assert reopened.ids() == sorted(record["Id"] for record in records)
+
+def test_index_of_another_data_file_is_rejected(tmp_path, records):
+    path = str(tmp_path / "problems_records.jsonl")
+    build_record_file(records, path)
+    with open(path, "ab") as f:
+        f.write(b'{"Id": "51"}\n')
+    with pytest.raises(ValueError, match="does not match"):
+        RecordFile(path)
+
+def test_failed_build_leaves_no_files(tmp_path, records):
+    path = str(tmp_path / "problems_records.jsonl")
+
+    def failing():
+        yield from records[:5]
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        build_record_file(failing(), path)
+    assert list(tmp_path.iterdir()) == []
+    assert index_path(path).endswith("problems_records.idx")
@@ -0,0 +1,36 @@
+import pytest
+from mock_server import MockLeetcodeServer
+
+from leetcode_scraper import LeetcodeScraper
+from response_cache import DEFAULT_TTLS, ResponseCache, parse_ttl_args
+
+def snippet_languages(details):
+    return {snippet["langSlug"] for detail in details.values() for snippet in detail["codeSnippets"]}
+
+def test_snippet_profiles_share_cache_entries_without_leaking_languages(tmp_path):
+    with MockLeetcodeServer(count=5, latency=0) as server:
+        slugs = [f"synthetic-problem-{i}" for i in range(1, 6)]
+        cache = ResponseCache(str(tmp_path / "cache"))
+
+        python = LeetcodeScraper(rps=0, cache=cache, profile="snippets:python3", base_url=server.base_url)
+        assert snippet_languages(python.get_problem_details(slugs)) == {"python3"}
+        requests_after_first_run = server.request_count
+
+        # Served from the cache entries of the first run, filtered for this profile
+        cpp = LeetcodeScraper(rps=0, cache=cache, profile="snippets:cpp", base_url=server.base_url)
+        assert snippet_languages(cpp.get_problem_details(slugs)) == {"cpp"}
+
+        everything = LeetcodeScraper(rps=0, cache=cache, profile="snippets", base_url=server.base_url)
+        assert {"python3", "cpp", "java"} <= snippet_languages(everything.get_problem_details(slugs))
+        assert server.request_count == requests_after_first_run
+        cache.close()
+
+def test_cache_ttl_arguments(run_scraper, capsys):
+    assert parse_ttl_args(["60", "questionData=0"]) == (60.0, dict.fromkeys(DEFAULT_TTLS, 60.0) | {"questionData": 0.0})
+    for value in ["bogus", "questionData=", "questionData=soon"]:
+        with pytest.raises(ValueError, match="--cache-ttl"):
+            parse_ttl_args([value])
+        with pytest.raises(SystemExit) as exit_info:
+            run_scraper("--cache-ttl", value, "--latest", "1")
+        assert exit_info.value.code == 2
+        assert f"invalid --cache-ttl {value!r}" in capsys.readouterr().err
@@ -0,0 +1,60 @@
+import email.utils
+import time
+
+from mock_server import MockLeetcodeServer
+
+import leetcode_scraper
+from leetcode_scraper import LeetcodeScraper, retry_after_seconds
+
+class FakeResponse:
+    def __init__(self, retry_after=None):
+        self.headers = {} if retry_after is None else {"Retry-After": retry_after}
+
+def test_retry_after_in_seconds_or_as_http_date():
+    assert retry_after_seconds(FakeResponse("7")) == 7.0
+    assert retry_after_seconds(FakeResponse("-3")) == 0.0
+    in_a_minute = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 <= retry_after_seconds(FakeResponse(in_a_minute)) <= 60
+    assert retry_after_seconds(FakeResponse("soon")) is None
+    assert retry_after_seconds(FakeResponse()) is None
+
+def test_throttled_requests_wait_as_long_as_retry_after_says(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(leetcode_scraper.time, "sleep", sleeps.append)
+    with MockLeetcodeServer(count=20, latency=0, error_rate=0.3, seed=3) as server:
+        # Without Retry-After, a backoff base this large would mean sleeping for up to minutes
+        scraper = LeetcodeScraper(rps=0, base_url=server.base_url, backoff_base=100, max_retries=10, quiet=True)
+        details = list(scraper.iter_problem_details(scraper.get_all_problems()))
+        assert len(details) == 20
+        assert server.error_count > 0
+    # The mock answers 429 with Retry-After: 0
+    assert len(sleeps) == server.error_count and set(sleeps) == {0.0}
+    assert scraper.metrics.retries == server.error_count
+
+def test_failed_problems_are_retried_at_the_end_of_the_run(monkeypatch):
+    monkeypatch.setattr(leetcode_scraper.time, "sleep", lambda seconds: None)
+    with MockLeetcodeServer(count=20, latency=0) as server:
+        scraper = LeetcodeScraper(rps=0, base_url=server.base_url, max_retries=0, quiet=True)
+        problems = scraper.get_all_problems()
+        server.error_rate = 0.5
+        details = list(scraper.iter_problem_details(problems))
+        failed = len(scraper.retry_queue)
+        assert 0 < failed < 20 and len(details) == 20 - failed
+
+        server.error_rate = 0.0
+        recovered = list(scraper.iter_retry_queue(rounds=2, delay=0))
+        assert len(recovered) == failed and scraper.failed_problems == []
+        assert sorted(detail["titleSlug"] for detail in details + recovered) == \
+            sorted(problem["titleSlug"] for problem in problems)
+
+def test_problems_that_never_succeed_are_reported(monkeypatch):
+    monkeypatch.setattr(leetcode_scraper.time, "sleep", lambda seconds: None)
+    with MockLeetcodeServer(count=3, latency=0) as server:
+        scraper = LeetcodeScraper(rps=0, base_url=server.base_url, max_retries=1, quiet=True)
+        problems = scraper.get_all_problems()
+        server.error_rate = 1.0
+        assert list(scraper.iter_problem_details(problems)) == []
+        assert list(scraper.iter_retry_queue(rounds=2, delay=0)) == []
+        assert [problem["titleSlug"] for problem in scraper.failed_problems] == \
+            [problem["titleSlug"] for problem in problems]
+        assert scraper.metrics.counters["problems_failed"] == 3
@@ -0,0 +1,58 @@
+import json
+import re
+
+from mock_server import MockLeetcodeServer
+
+from leetcode_scraper import LeetcodeScraper
+from scrape_metrics import ScrapeMetrics
+
+PROMETHEUS_LINE = re.compile(r'^[a-z_]+(\{[a-z]+="[^"]*"(,[a-z]+="[^"]*")*\})? -?[0-9.e+-]+$')
+
+def test_prometheus_textfile_output(tmp_path):
+    metrics = ScrapeMetrics()
+    with MockLeetcodeServer(count=5, latency=0, error_rate=0.4, seed=1) as server:
+        scraper = LeetcodeScraper(rps=0, base_url=server.base_url, metrics=metrics, backoff_base=0, quiet=True)
+        with metrics.phase("details"):
+            details = list(scraper.iter_problem_details(scraper.get_all_problems()))
+    path = tmp_path / "scraper.prom"
+    metrics.write_prometheus(str(path))
+    lines = path.read_text().splitlines()
+
+    for line in lines:
+        assert line.startswith("# TYPE ") or PROMETHEUS_LINE.match(line), line
+    samples = dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+    assert samples['leetcode_scraper_requests_total{query="questionData",status="200"}'] == "5"
+    assert samples['leetcode_scraper_requests_total{query="questionData",status="429"}'] == str(server.error_count)
+    assert samples['leetcode_scraper_retries_total'] == str(server.error_count)
+    assert samples['leetcode_scraper_problems{result="problems_fetched"}'] == str(len(details))
+    assert samples['leetcode_scraper_request_seconds_count{query="allQuestions"}'] == "1"
+    assert 'leetcode_scraper_phase_seconds{phase="details"}' in samples
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_json_summary_per_query(tmp_path):
+    metrics = ScrapeMetrics()
+    metrics.record_request("questionData", 200, 0.1, 100)
+    metrics.record_request("questionData", 200, 0.3, 300)
+    metrics.record_request("questionData", None, 1.0)
+    metrics.increment("problems_fetched", 2)
+    metrics.write_json(str(tmp_path / "run.metrics.json"))
+    summary = json.loads((tmp_path / "run.metrics.json").read_text())
+    query = summary["queries"]["questionData"]
+    assert (query["requests"], query["errors"], query["status_codes"]) == (3, 1, {"200": 2})
+    assert query["bytes_received"] == 400 and query["latency_seconds"]["max"] == 1.0
+    assert summary["counters"] == {"problems_fetched": 2}
+
+def test_workers_write_separate_metrics_files(tmp_path, run_scraper):
+    with MockLeetcodeServer(count=6, latency=0) as server:
+        common = ["--base-url", server.base_url, "--no-cache", "--queue", "queue.sqlite3"]
+        run_scraper(*common, "--coordinator", "--start-id", "1", "--end-id", "6")
+        run_scraper(*common, "--worker", "--worker-id", "host/a", "--lease-size", "3")
+        run_scraper(*common, "--worker", "--worker-id", "b")
+        run_scraper(*common, "--worker", "--worker-id", "c", "--metrics-json", "workers.json")
+
+    first = json.loads((tmp_path / "queue.host_a.metrics.json").read_text())
+    assert first["counters"]["problems_fetched"] == 6
+    assert (tmp_path / "queue.b.metrics.json").exists()
+    assert (tmp_path / "workers.c.json").exists()
+    assert sorted(path.name for path in tmp_path.glob("*.json") if "metrics" in path.name or "workers" in path.name) == [
+        "last_scrape.metrics.json", "queue.b.metrics.json", "queue.host_a.metrics.json", "workers.c.json"]
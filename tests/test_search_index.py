@@ -0,0 +1,51 @@
+import pytest
+
+import search_index
+from search_index import SearchIndex, build_search_index
+
+PROBLEMS = [
+    {"Id": "1", "name": "Two Sum", "difficulty": "Easy", "tags": ["Array", "Hash Table"],
+     "companies": ["Google", "Amazon"], "content_text": "Find two numbers in an array that add up to a target."},
+    {"Id": "2", "name": "Add Two Numbers", "difficulty": "Medium", "tags": ["Linked List", "Math"],
+     "companies": ["Amazon"], "content_text": "Add two numbers stored as linked lists of digits."},
+    {"Id": "3", "name": "Longest Substring", "difficulty": "Medium", "tags": ["Hash Table", "String"],
+     "companies": ["Google"], "content": "<p>Find the longest substring <b>without</b> repeating characters.</p>"},
+    {"Id": "4", "name": "Median of Arrays", "difficulty": "Hard", "tags": ["Array", "Binary Search"],
+     "companies": [], "content_text": "Find the median of two sorted arrays."},
+]
+
+@pytest.fixture(params=[True, False], ids=["fts5", "like"])
+def index(request, tmp_path, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(search_index, "fts5_available", lambda conn: False)
+    elif not search_index.fts5_available(search_index.sqlite3.connect(":memory:")):
+        pytest.skip("SQLite was built without FTS5")
+    path = str(tmp_path / "search.sqlite3")
+    assert build_search_index(PROBLEMS, path) == 4
+    with SearchIndex(path) as index:
+        yield index
+
+def ids(results):
+    return [result["id"] for result in results]
+
+def test_text_search_ands_words_and_ranks_title_matches_first(index):
+    assert set(ids(index.search("two numbers"))) == {"1", "2"}
+    if index.fts5:
+        assert ids(index.search("numbers"))[0] == "2"
+    # Content is searched too, including HTML content that was stripped when indexing
+    assert ids(index.search("repeating characters")) == ["3"]
+    assert index.search("nothing matches this") == []
+
+def test_facet_filters(index):
+    assert ids(index.search(difficulty="Medium")) == ["2", "3"]
+    assert ids(index.search(difficulty=["Easy", "Hard"])) == ["1", "4"]
+    assert ids(index.search(tags=["Array", "Hash Table"])) == ["1"]
+    assert ids(index.search(companies="amazon")) == ["1", "2"]
+    assert ids(index.search("find", tags="Array")) in (["1", "4"], ["4", "1"])
+    assert index.count(companies="Google", difficulty="Medium") == 1
+
+def test_results_and_facet_counts(index):
+    (result,) = index.search("median")
+    assert result["tags"] == ["Array", "Binary Search"] and result["companies"] == []
+    assert [tuple(row) for row in index.facet_counts("tag", limit=2)] == [("Array", 2), ("Hash Table", 2)]
+    assert [tuple(row) for row in index.facet_counts("company", tags="Hash Table")] == [("Google", 2), ("Amazon", 1)]
@@ -0,0 +1,38 @@
+import threading
+
+import pytest
+
+from leetcode_scraper import LeetcodeScraper
+from session_store import SessionStore
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.content = b""
+
+    def json(self):
+        return {}
+
+def test_rejected_reauthentication_raises_instead_of_hanging(tmp_path):
+    scraper = LeetcodeScraper(rps=0, backoff_base=0)
+    scraper.session_store = SessionStore(str(tmp_path / "session.json"))
+    scraper.session_identity = SessionStore.identity(None, "expired")
+    scraper.credentials = (None, None, "expired")
+    scraper.session_restored = True
+    # Both the original request and the premium check of the re-authentication are rejected
+    scraper.session.post = lambda *args, **kwargs: FakeResponse(401)
+
+    outcome = {}
+    def request():
+        try:
+            scraper._post_graphql({"query": "query { allQuestions { titleSlug } }"})
+        except Exception as e:
+            outcome["error"] = e
+    thread = threading.Thread(target=request, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive(), "re-authentication deadlocked on the auth lock"
+    assert isinstance(outcome.get("error"), RuntimeError)
+    assert not scraper.session_restored
@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pytest
+
+from similar_graph import SimilarGraph
+
+def problem(slug, *similar):
+    return {"titleSlug": slug, "title": slug.upper(), "difficulty": "Easy",
+            "similarQuestions": json.dumps([{"titleSlug": other} for other in similar])}
+
+@pytest.fixture
+def graph():
+    # A path a-b-c-d (listed in one direction only), a pair f-g, an isolated e and a slug outside the snapshot
+    return SimilarGraph.from_problems([
+        problem("a", "b"), problem("b", "c"), problem("c", "d", "missing"), problem("d"),
+        problem("e"), problem("f", "g"), problem("g", "f"),
+    ])
+
+def dense_pagerank(adjacency, damping=0.85, iterations=200):
+    n = len(adjacency)
+    degree = adjacency.sum(axis=1)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        spread = np.divide(rank, degree, out=np.zeros(n), where=degree > 0) @ adjacency
+        rank = (1 - damping) / n + damping * (spread + rank[degree == 0].sum() / n)
+    return rank
+
+def test_edges_are_symmetric_csr(graph):
+    assert len(graph) == 7 and graph.edge_count == 4
+    assert graph.neighbors("a") == ["b"]
+    assert graph.neighbors("c") == ["b", "d"]
+    assert graph.neighbors("e") == []
+    assert graph.degree.tolist() == [1, 2, 2, 1, 0, 1, 1]
+
+def test_components_largest_first(graph):
+    assert graph.component_of("d") == (0, 4)
+    assert graph.component_of("g") == (1, 2)
+    assert graph.component_of("e") == (2, 1)
+
+def test_k_hop_nearest_first_then_by_pagerank(graph):
+    assert graph.k_hop("a") == [("b", 1), ("c", 2)]
+    assert graph.k_hop("a", hops=1) == [("b", 1)]
+    # c is more central than a, so it comes first among b's direct neighbors
+    assert graph.k_hop("b") == [("c", 1), ("a", 1), ("d", 2)]
+    assert graph.k_hop("e") == []
+    assert graph.recommend("b", limit=2) == ["c", "a"]
+
+def test_pagerank_matches_dense_power_iteration(graph):
+    n = len(graph)
+    adjacency = np.zeros((n, n))
+    for node in range(n):
+        adjacency[node, graph.indices[graph.indptr[node]:graph.indptr[node + 1]]] = 1
+    assert np.allclose(graph.pagerank, dense_pagerank(adjacency), atol=1e-8)
+    assert graph.pagerank.sum() == pytest.approx(1.0)
+    assert [slug for slug, _ in graph.most_central(2)] in (["b", "c"], ["c", "b"])
+
+def test_save_and_load_round_trip(graph, tmp_path):
+    path = str(tmp_path / "similar.npz")
+    graph.save(path)
+    loaded = SimilarGraph.load(path)
+    assert loaded.k_hop("b") == graph.k_hop("b")
+    assert np.array_equal(loaded.pagerank, graph.pagerank)
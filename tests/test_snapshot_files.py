@@ -0,0 +1,19 @@
+from transform_data import find_snapshot_files
+
+def test_only_scraper_snapshots_are_found(tmp_path):
+    snapshots = ["leetcode_problems_1_to_100_20260101_120000.json",
+                 "leetcode_latest_problems_50_20260102_120000.jsonl",
+                 "leetcode_problems_merged_20260103_120000.json"]
+    others = ["leetcode_problems_1_to_100_20260101_120000_transformed.json",
+              "leetcode_problems_1_to_100_20260101_120000_transformed.meta.json",
+              "leetcode_problems_1_to_100_20260101_120000.metrics.json",
+              "leetcode_problems_1_to_100_20260101_120000_records.jsonl",
+              "leetcode_problems_1_to_100.partial.jsonl",
+              "last_scrape.metrics.json",
+              "catalog.json",
+              "notes.json"]
+    for name in snapshots + others:
+        (tmp_path / name).write_text("[]")
+    expected = sorted(str(tmp_path / name) for name in snapshots)
+    assert find_snapshot_files(str(tmp_path)) == expected
+    assert find_snapshot_files(str(tmp_path / "*.json*")) == expected
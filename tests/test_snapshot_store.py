@@ -0,0 +1,68 @@
+import copy
+import threading
+
+import pytest
+from synthetic_corpus import generate_corpus
+
+import snapshot_store
+from snapshot_store import SnapshotStore
+
+CODECS = ["gzip", pytest.param("zstd", marks=pytest.mark.skipif(snapshot_store.zstandard is None,
+                                                                 reason="zstandard is not installed"))]
+
+@pytest.fixture(scope="module")
+def corpus():
+    return generate_corpus(30)
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_put_get_round_trip(tmp_path, corpus, codec):
+    with SnapshotStore(str(tmp_path / "store"), codec=codec) as store:
+        path = store.put("day1", copy.deepcopy(corpus))
+        assert path.endswith(".jsonl.zst" if codec == "zstd" else ".jsonl.gz")
+        assert list(store.get("day1")) == corpus
+        # Manifests refer to blobs instead of carrying the statements
+        assert all(isinstance(record["content"], dict) for record in store.iter_manifest("day1"))
+
+    # A store reopened from the manifest path reads the same problems
+    assert list(snapshot_store.iter_snapshot(path)) == corpus
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_unchanged_content_is_stored_once_and_gc_keeps_referenced_blobs(tmp_path, corpus, codec):
+    with SnapshotStore(str(tmp_path / "store"), codec=codec) as store:
+        store.put("day1", copy.deepcopy(corpus))
+        blobs = store.stats()["blobs"]
+        changed = copy.deepcopy(corpus)
+        changed[0]["content"] = "<p>" + "A rewritten statement. " * 10 + "</p>"
+        store.put("day2", changed)
+        assert store.stats()["blobs"] == blobs + 1
+
+        assert store.gc() == 0
+        store.delete("day1")
+        assert store.gc() == 1
+        assert store.snapshots() == ["day2"]
+        assert list(store.get("day2")) == changed
+
+def test_gc_waits_for_a_snapshot_being_stored(tmp_path):
+    root = str(tmp_path / "store")
+    # Enough blobs that put() commits some of them before its manifest exists
+    corpus = generate_corpus(200)
+    gc_thread = None
+
+    def problems():
+        nonlocal gc_thread
+        for number, problem in enumerate(copy.deepcopy(corpus)):
+            if number == 150:
+                def collect():
+                    with SnapshotStore(root) as other:
+                        other.gc()
+                gc_thread = threading.Thread(target=collect)
+                gc_thread.start()
+                gc_thread.join(timeout=0.5)
+                assert gc_thread.is_alive()
+            yield problem
+
+    with SnapshotStore(root) as store:
+        store.put("day1", problems())
+        gc_thread.join(timeout=10)
+        assert not gc_thread.is_alive()
+        assert list(store.get("day1")) == corpus
@@ -0,0 +1,42 @@
+import json
+
+from snippet_corpus import SnippetCorpus, export_snippets, snippet_hash
+
+def problem(problem_id, **snippets):
+    return {"questionFrontendId": problem_id, "titleSlug": f"problem-{problem_id}",
+            "codeSnippets": [{"lang": lang.title(), "langSlug": lang, "code": code} for lang, code in snippets.items()]}
+
+PROBLEMS = [
+    problem("1", python3="class Solution:\n    def twoSum(self): pass", cpp="class Solution {};"),
+    problem("2", python3="class Solution:\n    def addTwo(self): pass", cpp="class Solution {};"),
+    problem("3", cpp="class Solution {};"),
+]
+
+def read_shard(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_one_deduplicated_shard_per_language(tmp_path):
+    manifest = export_snippets(PROBLEMS, str(tmp_path))
+    assert manifest["problems"] == 3
+    assert manifest["languages"]["cpp"] == {"lang": "Cpp", "file": "cpp.jsonl", "snippets": 3, "unique": 1}
+    assert manifest["languages"]["python3"]["snippets"] == 2
+
+    (cpp,) = read_shard(tmp_path / "cpp.jsonl")
+    assert cpp == {"hash": snippet_hash("class Solution {};"), "code": "class Solution {};", "problems": ["1", "2", "3"]}
+    python = read_shard(tmp_path / "python3.jsonl")
+    assert [entry["problems"] for entry in python] == [["1"], ["2"]]
+
+def test_corpus_reads_languages_and_single_snippets(tmp_path):
+    export_snippets(PROBLEMS, str(tmp_path))
+    corpus = SnippetCorpus(str(tmp_path))
+    assert corpus.languages() == ["cpp", "python3"]
+    assert sorted(corpus.iter_language("cpp")) == [(id_, "class Solution {};") for id_ in ("1", "2", "3")]
+    assert corpus.get(2, "python3") == "class Solution:\n    def addTwo(self): pass"
+    assert corpus.get("3", "python3") is None
+
+def test_shards_of_languages_that_disappeared_are_removed(tmp_path):
+    export_snippets(PROBLEMS, str(tmp_path))
+    export_snippets([problem("4", cpp="int main() {}")], str(tmp_path))
+    assert not (tmp_path / "python3.jsonl").exists()
+    assert SnippetCorpus(str(tmp_path)).languages() == ["cpp"]
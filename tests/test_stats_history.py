@@ -0,0 +1,39 @@
+import json
+import sys
+
+import stats_history
+from stats_history import HISTORY_DTYPE, StatsHistory
+
+DAY = 86400
+
+def problems(submissions):
+    return [{"Id": str(problem_id), "acceptance_rate": 50.0, "total_submissions": count, "total_accepted": count // 2}
+            for problem_id, count in submissions.items()]
+
+def test_append_after_a_partial_row_keeps_rows_aligned(tmp_path):
+    history = StatsHistory(str(tmp_path / "history"))
+    history.append(problems({1: 100, 2: 200}), scraped_at=0.0)
+    # A crash during the next append left half a row behind
+    with open(history.data_path, "ab") as f:
+        f.write(b"\x01" * (HISTORY_DTYPE.itemsize // 2))
+
+    assert history.append(problems({1: 150, 2: 260}), scraped_at=10 * DAY) == 2
+    rows = history.load()
+    assert list(rows["problem_id"]) == [1, 2, 1, 2]
+    assert list(rows["scraped_at"]) == [0.0, 0.0, 10 * DAY, 10 * DAY]
+    growth = history.growth("total_submissions", days=30)
+    assert list(growth["problem_id"]) == [2, 1]
+    assert list(growth["change"]) == [60, 50]
+
+def test_ingest_glob_skips_metrics_and_transformed_files(tmp_path, monkeypatch, capsys):
+    snapshot = tmp_path / "leetcode_problems_1_to_2_20260101_120000.json"
+    snapshot.write_text(json.dumps(problems({1: 100, 2: 200})))
+    (tmp_path / "leetcode_problems_1_to_2_20260101_120000_transformed.json").write_text(
+        json.dumps(problems({1: 100, 2: 200})))
+    (tmp_path / "leetcode_problems_1_to_2_20260101_120000.metrics.json").write_text(json.dumps({"counters": {}}))
+
+    monkeypatch.setattr(sys, "argv", ["stats_history.py", "--history-dir", str(tmp_path / "history"),
+                                      "--ingest", str(tmp_path / "leetcode_problems_*.json")])
+    stats_history.main()
+    assert f"Appended 2 rows from {snapshot}" in capsys.readouterr().out
+    assert len(StatsHistory(str(tmp_path / "history")).load()) == 2
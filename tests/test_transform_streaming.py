@@ -0,0 +1,43 @@
+import json
+import random
+
+import pytest
+from synthetic_corpus import generate_corpus
+
+from transform_data import (create_csv_from_json, external_sort, problem_sort_key, transform_leetcode_data,
+                            transform_leetcode_data_streaming)
+
+@pytest.fixture
+def raw_problems():
+    problems = generate_corpus(60, content_size=200)
+    # Alphanumeric, duplicate and missing IDs exercise the sort key and its stability across runs
+    for problem, frontend_id in zip(problems, ["LCP 7", "Offer 12", "7", "7", "", "12"]):
+        problem["questionFrontendId"] = frontend_id
+    random.Random(1).shuffle(problems)
+    return problems
+
+@pytest.mark.parametrize("extension", [".json", ".jsonl"])
+def test_streaming_transform_matches_in_memory(tmp_path, raw_problems, extension):
+    json_input = tmp_path / "leetcode_problems.json"
+    json_input.write_text(json.dumps(raw_problems))
+    streaming_input = tmp_path / f"leetcode_problems_streaming{extension}"
+    if extension == ".jsonl":
+        streaming_input.write_text("".join(json.dumps(problem) + "\n" for problem in raw_problems))
+    else:
+        streaming_input.write_text(json.dumps(raw_problems))
+
+    expected = transform_leetcode_data(str(json_input), str(tmp_path / "expected.json"))
+    create_csv_from_json(str(tmp_path / "expected.json"), str(tmp_path / "expected.csv"))
+    # A chunk size far below the record count forces several sorted runs on disk
+    count = transform_leetcode_data_streaming(str(streaming_input), str(tmp_path / "streamed.json"),
+                                              str(tmp_path / "streamed.csv"), chunk_size=7)
+
+    assert count == len(raw_problems)
+    assert json.loads((tmp_path / "streamed.json").read_text()) == expected
+    assert (tmp_path / "streamed.csv").read_text() == (tmp_path / "expected.csv").read_text()
+
+def test_external_sort_multi_pass_merge_is_stable():
+    records = [{"Id": str(key), "position": position}
+               for position, key in enumerate(random.Random(2).choices(range(20), k=500))]
+    result = list(external_sort(records, problem_sort_key, chunk_size=9, max_merge_width=3))
+    assert result == sorted(records, key=problem_sort_key)
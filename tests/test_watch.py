@@ -0,0 +1,54 @@
+import pytest
+from mock_server import MockLeetcodeServer
+
+import leetcode_scraper
+from leetcode_scraper import LeetcodeScraper, watch
+
+class StopWatching(Exception):
+    pass
+
+def test_watch_does_not_start_polling_without_a_problem_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(leetcode_scraper.time, "sleep", lambda seconds: None)
+    with MockLeetcodeServer(count=10, latency=0) as server:
+        scraper = LeetcodeScraper(rps=0, base_url=server.base_url)
+        get_all_problems = scraper.get_all_problems
+        failures = [[], None]
+
+        def flaky_get_all_problems(refresh=False):
+            # The first two list fetches fail, then the server answers
+            return failures.pop(0) if failures else get_all_problems(refresh=refresh)
+
+        monkeypatch.setattr(scraper, "get_all_problems", flaky_get_all_problems)
+        polled = []
+
+        def poll_new_problems(known_ids):
+            polled.append(set(known_ids))
+            raise StopWatching
+
+        monkeypatch.setattr(scraper, "poll_new_problems", poll_new_problems)
+        with pytest.raises(StopWatching):
+            watch(scraper, str(tmp_path / "dataset.jsonl"), interval=0, transform=False)
+        assert len(polled[0]) == 10
+
+def test_watch_fetches_only_problems_published_after_startup(tmp_path, monkeypatch):
+    with MockLeetcodeServer(count=6, latency=0) as server:
+        new_problem = server.problems.pop()
+        del server.by_slug[new_problem["titleSlug"]]
+        scraper = LeetcodeScraper(rps=0, base_url=server.base_url)
+        polls = []
+
+        def sleep(seconds):
+            # Publish a problem after the first poll, stop after the second
+            polls.append(seconds)
+            if len(polls) == 1:
+                server.problems.append(new_problem)
+                server.by_slug[new_problem["titleSlug"]] = new_problem
+            else:
+                raise StopWatching
+
+        monkeypatch.setattr(leetcode_scraper.time, "sleep", sleep)
+        dataset = tmp_path / "dataset.jsonl"
+        with pytest.raises(StopWatching):
+            watch(scraper, str(dataset), interval=0, transform=False)
+        lines = dataset.read_text().splitlines()
+        assert len(lines) == 1 and new_problem["titleSlug"] in lines[0]
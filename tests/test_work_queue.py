@@ -0,0 +1,24 @@
+import pytest
+
+from work_queue import WorkQueue
+
+def problems(*slugs):
+    return [{"titleSlug": slug, "questionFrontendId": str(i)} for i, slug in enumerate(slugs, 1)]
+
+def test_adding_the_same_selection_again_keeps_queued_problems(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite3"))
+    assert queue.add(problems("a", "b"), "leetcode_problems_1_to_2") == 2
+    assert queue.add(problems("a", "b", "c"), "leetcode_problems_1_to_2") == 1
+    assert queue.meta("name") == "leetcode_problems_1_to_2"
+    assert queue.counts()["pending"] == 3
+    queue.close()
+
+def test_adding_a_different_selection_is_refused(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite3"))
+    queue.add(problems("a", "b"), "leetcode_problems_1_to_2")
+    with pytest.raises(ValueError, match="leetcode_problems_1_to_2"):
+        queue.add(problems("c", "d"), "leetcode_latest_problems_2")
+    # Nothing of the refused selection was queued, and merge still uses the first name
+    assert queue.meta("name") == "leetcode_problems_1_to_2"
+    assert queue.counts()["pending"] == 2
+    queue.close()
@@ -1,45 +1,73 @@
+import functools
 import json
 import os
 import re
 import glob
+import hashlib
+import heapq
+import time
+import tempfile
 from datetime import datetime
+from html.parser import HTMLParser
+from jsonl_io import JsonArrayWriter, JsonlWriter, iter_jsonl, iter_records
+from record_file import RecordFileWriter, build_record_file, index_path
+from search_index import SEARCH_INDEX_FIELDS, SearchIndexWriter, build_search_index
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The embedded JSON strings (stats, companyTagStats, similarQuestions) are parsed with orjson when available
+json_loads = orjson.loads if orjson is not None else json.loads
+
+class ParseErrors:
+    """Count embedded JSON fields that could not be parsed, keeping the first bad value of each field"""
+    def __init__(self):
+        self.counts = {}
+        self.examples = {}
+    
+    def add(self, field, value):
+        self.counts[field] = self.counts.get(field, 0) + 1
+        self.examples.setdefault(field, value)
+    
+    def report(self):
+        """Print a one-line summary and reset the counts"""
+        if self.counts:
+            summary = ", ".join(f"{field} {count}" for field, count in sorted(self.counts.items()))
+            field, example = next(iter(self.examples.items()))
+            print(f"Unparseable fields left empty: {summary} (first bad {field}: {str(example)[:80]!r})")
+        self.counts = {}
+        self.examples = {}
+
+PARSE_ERRORS = ParseErrors()
+
+EMPTY_STATS = {"acceptance_rate": None, "total_submissions": None, "total_accepted": None}
 
 def extract_stats(stats_str):
     """Extract acceptance rate and submission counts from stats string"""
     if not stats_str:
-        return {
-            "acceptance_rate": None,
-            "total_submissions": None,
-            "total_accepted": None
-        }
+        return dict(EMPTY_STATS)
     
     try:
         # The stats string format is typically something like:
         # {"totalAcceptedRaw": 1234, "totalSubmissionRaw": 5678, "totalAccepted": "1.2K", "totalSubmission": "5.6K", "acRate": "21.7%"}
-        stats_dict = json.loads(stats_str)
+        stats_dict = json_loads(stats_str)
         
         acceptance_rate = stats_dict.get("acRate", "0%").strip("%")
         try:
             acceptance_rate = float(acceptance_rate)
-        except:
+        except ValueError:
             acceptance_rate = 0.0
-            
-        total_submissions = stats_dict.get("totalSubmissionRaw", 0)
-        total_accepted = stats_dict.get("totalAcceptedRaw", 0)
         
         return {
             "acceptance_rate": acceptance_rate,
-            "total_submissions": total_submissions,
-            "total_accepted": total_accepted
-        }
-    except Exception as e:
-        print(f"Error extracting stats: {e}")
-        print(f"Stats string: {stats_str}")
-        return {
-            "acceptance_rate": None,
-            "total_submissions": None,
-            "total_accepted": None
+            "total_submissions": stats_dict.get("totalSubmissionRaw", 0),
+            "total_accepted": stats_dict.get("totalAcceptedRaw", 0)
         }
+    except Exception:
+        PARSE_ERRORS.add("stats", stats_str)
+        return dict(EMPTY_STATS)
 
 def extract_company_tags(company_tags_str):
     """Extract company tags from company tag stats string"""
@@ -47,109 +75,383 @@ def extract_company_tags(company_tags_str):
         return []
     
     try:
-        companies = json.loads(company_tags_str)
+        companies = json_loads(company_tags_str)
         # Companies are usually in a format like: [{"slug": "company-name", "name": "Company Name", "frequency": 42}]
         return [company.get("name") for company in companies if "name" in company]
-    except Exception as e:
-        print(f"Error extracting company tags: {e}")
-        print(f"Company tags string: {company_tags_str}")
+    except Exception:
+        PARSE_ERRORS.add("companyTagStats", company_tags_str)
         return []
 
 def extract_similar_questions(similar_questions_str):
-    """Extract similar questions into a readable format"""
+    """Extract similar questions into a readable format: "Title [Difficulty]: URL" """
     if not similar_questions_str:
         return []
     
     try:
         # Similar questions are usually stored as a JSON string
-        similar_questions = json.loads(similar_questions_str)
-        
-        # Format each similar question for readability
-        formatted_questions = []
-        for question in similar_questions:
-            title = question.get("title", "")
-            difficulty = question.get("difficulty", "")
-            title_slug = question.get("titleSlug", "")
-            
-            # Format as "Title [Difficulty]"
-            formatted_question = f"{title} [{difficulty}]"
-            
-            # Add URL if title_slug is available
-            if title_slug:
-                formatted_question += f": https://leetcode.com/problems/{title_slug}/"
-                
-            formatted_questions.append(formatted_question)
-            
-        return formatted_questions
-    except Exception as e:
-        print(f"Error extracting similar questions: {e}")
-        print(f"Similar questions string: {similar_questions_str}")
+        similar_questions = json_loads(similar_questions_str)
+        return [
+            f"{question.get('title', '')} [{question.get('difficulty', '')}]"
+            + (f": https://leetcode.com/problems/{question['titleSlug']}/" if question.get("titleSlug") else "")
+            for question in similar_questions
+        ]
+    except Exception:
+        PARSE_ERRORS.add("similarQuestions", similar_questions_str)
         return []
 
-def transform_leetcode_data(input_file, output_file):
-    """Transform LeetCode JSON data into a more structured format"""
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+# Bump when html_to_text or html_to_markdown change, so cached conversions are redone
+CONTENT_CONVERTER_VERSION = 1
+
+class _ContentConverter(HTMLParser):
+    """Convert LeetCode problem HTML to Markdown, or to plain text when markdown=False
     
-    transformed_data = []
+    Handles the tags problem statements use: paragraphs, emphasis, inline code, <pre> example
+    blocks, nested lists (constraints), <sup>/<sub> exponents and indices, links and images.
+    """
+    HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
     
-    for problem in data:
-        # Extract base fields
-        problem_id = problem.get("questionFrontendId")
-        name = problem.get("title")
-        difficulty = problem.get("difficulty")
-        
-        # Extract tags
-        tags = []
-        if "topicTags" in problem and problem["topicTags"]:
-            tags = [tag.get("name") for tag in problem["topicTags"] if "name" in tag]
-        
-        # Extract stats
-        stats_str = problem.get("stats")
-        stats = extract_stats(stats_str)
-        
-        # Extract company tags
-        company_tags_str = problem.get("companyTagStats")
-        companies = extract_company_tags(company_tags_str)
-        
-        # Get discussion count
-        discussion_count = problem.get("discussionCount", 0)
-        
-        # Get likes and dislikes
-        likes = problem.get("likes", 0)
-        dislikes = problem.get("dislikes", 0)
-        
-        # Extract similar questions
-        similar_questions_str = problem.get("similarQuestions")
-        similar_questions = extract_similar_questions(similar_questions_str)
+    def __init__(self, markdown=True):
+        super().__init__(convert_charrefs=True)
+        self.markdown = markdown
+        self.parts = []
+        self.pre_depth = 0
+        self.code_depth = 0
+        self.lists = []
+        self.links = []
+    
+    def _newline(self, count=1):
+        """End the current line, making sure the output ends with `count` newlines"""
+        while self.parts and self.parts[-1].endswith(" "):
+            self.parts[-1] = self.parts[-1].rstrip(" ")
+        text = "".join(self.parts)
+        if text and not text.endswith("\n" * count):
+            missing = count - (len(text) - len(text.rstrip("\n")))
+            self.parts.append("\n" * missing)
+    
+    def _mark(self, marker):
+        if self.markdown and not self.pre_depth and not (marker == "`" and self.code_depth > 1):
+            self.parts.append(marker)
+    
+    def _close_mark(self, marker):
+        # Keep trailing spaces outside of emphasis, "**Example 1: **" is not valid Markdown
+        if self.markdown and not self.pre_depth and self.parts and self.parts[-1].endswith(" "):
+            self.parts[-1] = self.parts[-1].rstrip(" ")
+            self.parts.append(marker + " ")
+        else:
+            self._mark(marker)
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("p", "div", "blockquote", "table"):
+            self._newline(2)
+        elif tag in ("br", "tr"):
+            self.parts.append("\n")
+        elif tag == "pre":
+            self._newline(2)
+            self.pre_depth += 1
+            if self.markdown:
+                self.parts.append("```\n")
+        elif tag in ("strong", "b"):
+            self._mark("**")
+        elif tag in ("em", "i"):
+            self._mark("*")
+        elif tag == "code":
+            self.code_depth += 1
+            self._mark("`")
+        elif tag in ("ul", "ol"):
+            self._newline(1 if self.lists else 2)
+            self.lists.append([tag, 0])
+        elif tag == "li":
+            self._newline()
+            indent = "  " * max(0, len(self.lists) - 1)
+            if self.lists and self.lists[-1][0] == "ol":
+                self.lists[-1][1] += 1
+                self.parts.append(f"{indent}{self.lists[-1][1]}. ")
+            else:
+                self.parts.append(f"{indent}- ")
+        elif tag == "sup":
+            self.parts.append("^")
+        elif tag == "sub":
+            self.parts.append("_")
+        elif tag == "a":
+            self.links.append(attrs.get("href"))
+            if self.markdown and attrs.get("href"):
+                self.parts.append("[")
+        elif tag == "img":
+            if self.markdown and attrs.get("src"):
+                self.parts.append(f"![{attrs.get('alt') or ''}]({attrs['src']})")
+        elif tag in self.HEADINGS:
+            self._newline(2)
+            if self.markdown:
+                self.parts.append("#" * self.HEADINGS[tag] + " ")
+        elif tag in ("td", "th"):
+            self.parts.append(" | " if self.markdown else "\t")
+    
+    def handle_endtag(self, tag):
+        if tag in ("p", "div", "blockquote", "table") or tag in self.HEADINGS:
+            self._newline(2)
+        elif tag == "pre":
+            self.pre_depth = max(0, self.pre_depth - 1)
+            self._newline()
+            if self.markdown:
+                self.parts.append("```")
+            self._newline(2)
+        elif tag in ("strong", "b"):
+            self._close_mark("**")
+        elif tag in ("em", "i"):
+            self._close_mark("*")
+        elif tag == "code":
+            self._close_mark("`")
+            self.code_depth = max(0, self.code_depth - 1)
+        elif tag in ("ul", "ol"):
+            if self.lists:
+                self.lists.pop()
+            self._newline(1 if self.lists else 2)
+        elif tag == "a":
+            href = self.links.pop() if self.links else None
+            if self.markdown and href:
+                self.parts.append(f"]({href})")
+    
+    def handle_data(self, data):
+        if self.pre_depth:
+            # The first line break after <pre> is not part of the content
+            if self.parts and self.parts[-1].endswith("```\n") and data.startswith("\n"):
+                data = data[1:]
+            self.parts.append(data)
+            return
+        text = re.sub(r"\s+", " ", data)
+        if not self.parts or self.parts[-1].endswith(("\n", " ")):
+            text = text.lstrip(" ")
+        if text:
+            self.parts.append(text)
+    
+    def result(self):
+        self.close()
+        text = "".join(self.parts)
+        text = "\n".join(line.rstrip() for line in text.split("\n"))
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+def html_to_markdown(content):
+    """Convert problem HTML to Markdown, keeping examples as fenced blocks and constraints as lists"""
+    if not content:
+        return ""
+    converter = _ContentConverter(markdown=True)
+    converter.feed(content)
+    return converter.result()
+
+def html_to_text(content):
+    """Convert problem HTML to plain text with the same line structure as html_to_markdown"""
+    if not content:
+        return ""
+    converter = _ContentConverter(markdown=False)
+    converter.feed(content)
+    return converter.result()
+
+def convert_content(content):
+    """Return (text, markdown) for a problem's HTML content"""
+    return html_to_text(content), html_to_markdown(content)
+
+def content_hash(content):
+    return hashlib.sha256(f"{CONTENT_CONVERTER_VERSION}\n{content}".encode("utf-8")).hexdigest()
+
+class ContentConverter:
+    """Memoized HTML to text/Markdown conversion backed by a persistent SQLite cache
+    
+    Conversions are keyed by a hash of the content (and CONTENT_CONVERTER_VERSION), so problems
+    whose statement did not change are never converted again, across runs and snapshots. prepare()
+    converts a batch of contents up front, in a process pool when many of them are not cached yet.
+    The pool is started on first use and kept for later batches until close().
+    """
+    def __init__(self, cache_file=".leetcode_cache/content.sqlite3", workers=None, parallel_threshold=200):
+        import sqlite3
         
-        # Create the transformed problem entry
-        transformed_problem = {
-            "Id": problem_id,
-            "name": name,
-            "tags": tags,
-            "difficulty": difficulty,
-            "acceptance_rate": stats["acceptance_rate"],
-            "total_submissions": stats["total_submissions"],
-            "total_accepted": stats["total_accepted"],
-            "companies": companies,
-            "discussion_count": discussion_count,
-            "likes": likes,
-            "dislikes": dislikes,
-            "similar_questions": similar_questions,
-            "url": f"https://leetcode.com/problems/{problem.get('titleSlug', '')}/",
-            # Keep these useful fields but they won't be included in CSV
-            "content": problem.get("content"),
-            "code_snippets": problem.get("codeSnippets")
-        }
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.memo = {}
+        self.hits = 0
+        self.misses = 0
+        self.executor = None
+        self.conn = None
+        if cache_file:
+            directory = os.path.dirname(cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(cache_file, timeout=60)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS conversions (hash TEXT PRIMARY KEY, text TEXT, markdown TEXT)")
+            self.conn.commit()
+    
+    def _lookup(self, hashes):
+        if not self.conn or not hashes:
+            return {}
+        found = {}
+        hashes = list(hashes)
+        # Stay well below SQLite's limit on query parameters
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT hash, text, markdown FROM conversions WHERE hash IN ({', '.join('?' * len(chunk))})", chunk)
+            found.update((row[0], (row[1], row[2])) for row in rows)
+        return found
+    
+    def _store(self, conversions):
+        if self.conn and conversions:
+            self.conn.executemany("INSERT OR REPLACE INTO conversions VALUES (?, ?, ?)",
+                                  [(key, text, markdown) for key, (text, markdown) in conversions.items()])
+            self.conn.commit()
+    
+    def prepare(self, contents):
+        """Convert a batch of contents ahead of convert(), replacing the previous batch's memo"""
+        pending = {content_hash(content): content for content in contents if content}
+        memo = self._lookup(pending)
+        self.hits += len(memo)
+        missing = {key: content for key, content in pending.items() if key not in memo}
+        self.misses += len(missing)
         
-        transformed_data.append(transformed_problem)
+        if len(missing) >= self.parallel_threshold and self.workers != 1:
+            if self.executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            converted = dict(zip(missing, self.executor.map(convert_content, missing.values(), chunksize=32)))
+        else:
+            converted = {key: convert_content(content) for key, content in missing.items()}
+        self._store(converted)
+        memo.update(converted)
+        self.memo = memo
+    
+    def convert(self, content):
+        """Return (text, markdown) for content, from the memo, the cache, or by converting it"""
+        if not content:
+            return "", ""
+        key = content_hash(content)
+        if key in self.memo:
+            return self.memo[key]
+        cached = self._lookup([key]).get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        converted = convert_content(content)
+        self._store({key: converted})
+        return converted
+    
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+        if self.hits or self.misses:
+            print(f"Content conversions: {self.hits} cached, {self.misses} converted")
+
+# Every field of a transformed problem, in output order
+TRANSFORMED_FIELDS = (
+    "Id", "name", "tags", "difficulty", "acceptance_rate", "total_submissions", "total_accepted",
+    "companies", "discussion_count", "likes", "dislikes", "similar_questions", "url",
+    "content", "content_text", "content_markdown", "code_snippets"
+)
+STATS_FIELDS = frozenset(["acceptance_rate", "total_submissions", "total_accepted"])
+
+def transform_problem(problem, converter=None, fields=None):
+    """Transform a single raw LeetCode problem into the structured format
+    
+    The HTML content is also converted to plain text and Markdown, through converter (a
+    ContentConverter) when given so conversions are cached. With a set of `fields`, only those
+    output fields are returned, and embedded JSON and content are only parsed when needed.
+    """
+    if fields is None:
+        wants_stats = wants_content = True
+    else:
+        wants_stats = not STATS_FIELDS.isdisjoint(fields)
+        wants_content = "content_text" in fields or "content_markdown" in fields
+    
+    # Extract tags
+    tags = []
+    if (fields is None or "tags" in fields) and problem.get("topicTags"):
+        tags = [tag.get("name") for tag in problem["topicTags"] if "name" in tag]
+    
+    # Extract stats, company tags and similar questions from their embedded JSON strings
+    stats = extract_stats(problem.get("stats")) if wants_stats else EMPTY_STATS
+    companies = extract_company_tags(problem.get("companyTagStats")) if fields is None or "companies" in fields else []
+    similar_questions = (extract_similar_questions(problem.get("similarQuestions"))
+                         if fields is None or "similar_questions" in fields else [])
+    
+    # Convert the statement once here so consumers don't each strip the HTML again
+    content = problem.get("content")
+    content_text = content_markdown = None
+    if wants_content:
+        content_text, content_markdown = converter.convert(content) if converter else convert_content(content)
+    
+    # Create the transformed problem entry
+    transformed = {
+        "Id": problem.get("questionFrontendId"),
+        "name": problem.get("title"),
+        "tags": tags,
+        "difficulty": problem.get("difficulty"),
+        "acceptance_rate": stats["acceptance_rate"],
+        "total_submissions": stats["total_submissions"],
+        "total_accepted": stats["total_accepted"],
+        "companies": companies,
+        "discussion_count": problem.get("discussionCount", 0),
+        "likes": problem.get("likes", 0),
+        "dislikes": problem.get("dislikes", 0),
+        "similar_questions": similar_questions,
+        "url": f"https://leetcode.com/problems/{problem.get('titleSlug', '')}/",
+        # Keep these useful fields but they won't be included in CSV
+        "content": content,
+        "content_text": content_text,
+        "content_markdown": content_markdown,
+        "code_snippets": problem.get("codeSnippets")
+    }
+    if fields is not None:
+        transformed = {field: transformed[field] for field in TRANSFORMED_FIELDS if field in fields}
+    return transformed
+
+ID_DIGITS = re.compile(r'\d+')
+
+@functools.lru_cache(maxsize=1 << 16)
+def id_sort_key(problem_id):
+    """Numeric part of a problem ID; cached, since every snapshot repeats the same IDs"""
+    if not problem_id:
+        return float('inf')
+    if problem_id.isdecimal():
+        return int(problem_id)
+    match = ID_DIGITS.search(problem_id)
+    return int(match.group()) if match else float('inf')
+
+def problem_sort_key(problem):
+    """Sort key for transformed problems by ID (typically numeric, but could be alphanumeric)"""
+    return id_sort_key(problem["Id"])
+
+def transform_records(problems, converter=None, chunk_size=1000, fields=None):
+    """Transform raw problems lazily, converting each chunk's content in one batch (in parallel if cold)"""
+    chunk = []
+    for problem in problems:
+        chunk.append(problem)
+        if len(chunk) >= chunk_size:
+            yield from _transform_chunk(chunk, converter, fields)
+            chunk = []
+    yield from _transform_chunk(chunk, converter, fields)
+
+def _transform_chunk(problems, converter, fields=None):
+    if converter and (fields is None or "content_text" in fields or "content_markdown" in fields):
+        converter.prepare(problem.get("content") for problem in problems)
+    for problem in problems:
+        yield transform_problem(problem, converter, fields)
+
+def transform_leetcode_data(input_file, output_file, converter=None):
+    """Transform LeetCode JSON data into a more structured format"""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    if converter:
+        converter.prepare(problem.get("content") for problem in data)
+    transformed_data = [transform_problem(problem, converter) for problem in data]
     
     # Sort by ID (typically numeric, but could be alphanumeric)
     try:
-        transformed_data.sort(key=lambda x: (
-            int(re.search(r'\d+', x["Id"]).group()) if x["Id"] and re.search(r'\d+', x["Id"]) else float('inf')
-        ))
+        transformed_data.sort(key=problem_sort_key)
     except Exception as e:
         print(f"Error sorting data: {e}")
     
@@ -158,8 +460,28 @@ def transform_leetcode_data(input_file, output_file):
         json.dump(transformed_data, f, ensure_ascii=False, indent=2)
     
     print(f"Transformed data saved to {output_file}")
+    PARSE_ERRORS.report()
     return transformed_data
 
+# Columns written to CSV files; content and code snippets are left out
+CSV_FIELDNAMES = [
+    "Id", "name", "difficulty", "acceptance_rate", 
+    "total_submissions", "total_accepted", "tags",
+    "companies", "discussion_count", "likes", "dislikes", 
+    "similar_questions", "url"
+]
+
+def flatten_for_csv(problem):
+    """Convert list fields of a transformed problem to joined strings for CSV"""
+    problem_copy = problem.copy()
+    if "tags" in problem_copy and isinstance(problem_copy["tags"], list):
+        problem_copy["tags"] = ", ".join(problem_copy["tags"])
+    if "companies" in problem_copy and isinstance(problem_copy["companies"], list):
+        problem_copy["companies"] = ", ".join(problem_copy["companies"])
+    if "similar_questions" in problem_copy and isinstance(problem_copy["similar_questions"], list):
+        problem_copy["similar_questions"] = " | ".join(problem_copy["similar_questions"])
+    return problem_copy
+
 def create_csv_from_json(json_file, csv_file):
     """Create a CSV file from the transformed JSON data"""
     import csv
@@ -172,35 +494,494 @@ def create_csv_from_json(json_file, csv_file):
         print("No data to export to CSV")
         return
     
-    fieldnames = [
-        "Id", "name", "difficulty", "acceptance_rate", 
-        "total_submissions", "total_accepted", "tags",
-        "companies", "discussion_count", "likes", "dislikes", 
-        "similar_questions", "url"
-    ]
-    
     with open(csv_file, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
         writer.writeheader()
         
         for problem in data:
             # Convert lists to comma-separated strings for CSV
-            problem_copy = problem.copy()
-            if "tags" in problem_copy and isinstance(problem_copy["tags"], list):
-                problem_copy["tags"] = ", ".join(problem_copy["tags"])
-            if "companies" in problem_copy and isinstance(problem_copy["companies"], list):
-                problem_copy["companies"] = ", ".join(problem_copy["companies"])
-            if "similar_questions" in problem_copy and isinstance(problem_copy["similar_questions"], list):
-                problem_copy["similar_questions"] = " | ".join(problem_copy["similar_questions"])
-                
-            writer.writerow(problem_copy)
+            writer.writerow(flatten_for_csv(problem))
     
     print(f"CSV data saved to {csv_file}")
 
+# Columns written to columnar files, grouped by how they are stored
+COLUMNAR_STRING_FIELDS = ["Id", "name", "url"]
+COLUMNAR_DICTIONARY_FIELDS = ["difficulty"]
+COLUMNAR_FLOAT_FIELDS = ["acceptance_rate"]
+COLUMNAR_INT_FIELDS = ["total_submissions", "total_accepted", "discussion_count", "likes", "dislikes"]
+COLUMNAR_DICTIONARY_LIST_FIELDS = ["tags", "companies"]
+COLUMNAR_LIST_FIELDS = ["similar_questions"]
+
+class ColumnarWriter:
+    """Write transformed problems to a Parquet (.parquet) or Arrow IPC (.arrow/.feather) file
+    
+    Tags, companies and difficulty are dictionary encoded, list fields are stored as list columns and
+    numeric fields keep native types. Content and code snippets are left out, as in the CSV. Rows are
+    buffered until row_group_size of them have arrived and then written as one Parquet row group or
+    Arrow record batch, so memory use does not grow with the number of problems. The file is written
+    under a temporary name and moved into place on close.
+    
+    Without pyarrow, an .npz file is written instead: list columns become <field>_offsets/<field>_values
+    arrays (dictionary columns also get <field>_codes), and missing integers are stored as -1. The
+    .npz format cannot be appended to, so that fallback keeps every column in memory until close.
+    """
+    def __init__(self, path, row_group_size=10000):
+        try:
+            import pyarrow
+            self.pa = pyarrow
+        except ImportError:
+            self.pa = None
+            path = os.path.splitext(path)[0] + ".npz"
+            print(f"pyarrow is not installed, writing NumPy arrays to {path} instead")
+        self.path = path
+        self.temp_path = f"{path}.{os.getpid()}.tmp"
+        self.row_group_size = row_group_size
+        self.columns = {field: [] for field in CSV_FIELDNAMES}
+        # Dictionaries only ever grow, so each batch's dictionary extends the previous one; Arrow IPC
+        # files accept that as a delta, while a different dictionary per batch would be rejected
+        self.dictionaries = {field: {} for field in COLUMNAR_DICTIONARY_FIELDS + COLUMNAR_DICTIONARY_LIST_FIELDS}
+        self.schema = self._schema() if self.pa else None
+        self.sink = None
+        self.writer = None
+        self.count = 0
+    
+    def write(self, problem):
+        for field, values in self.columns.items():
+            values.append(problem.get(field))
+        self.count += 1
+        if self.pa and self.count % self.row_group_size == 0:
+            self._flush()
+    
+    def close(self):
+        if self.columns is None:
+            return
+        if self.pa:
+            if self.writer is None or self.count % self.row_group_size:
+                self._flush()
+            self.writer.close()
+            if self.sink is not None:
+                self.sink.close()
+            os.replace(self.temp_path, self.path)
+        else:
+            self._write_npz()
+        self.columns = None
+        print(f"Columnar data saved to {self.path}")
+    
+    def _schema(self):
+        pa = self.pa
+        dictionary_type = pa.dictionary(pa.int32(), pa.string())
+        types = []
+        for field in CSV_FIELDNAMES:
+            if field in COLUMNAR_DICTIONARY_FIELDS:
+                types.append((field, pa.dictionary(pa.int8(), pa.string())))
+            elif field in COLUMNAR_DICTIONARY_LIST_FIELDS:
+                types.append((field, pa.list_(dictionary_type)))
+            elif field in COLUMNAR_LIST_FIELDS:
+                types.append((field, pa.list_(pa.string())))
+            elif field in COLUMNAR_FLOAT_FIELDS:
+                types.append((field, pa.float64()))
+            elif field in COLUMNAR_INT_FIELDS:
+                types.append((field, pa.int64()))
+            else:
+                types.append((field, pa.string()))
+        return pa.schema(types)
+    
+    def _dictionary_array(self, field, values, index_type):
+        """Dictionary encode values against the field's running dictionary"""
+        pa = self.pa
+        index = self.dictionaries[field]
+        codes = [None if value is None else index.setdefault(value, len(index)) for value in values]
+        return pa.DictionaryArray.from_arrays(pa.array(codes, type=index_type), pa.array(list(index), type=pa.string()))
+    
+    def _open(self):
+        pa = self.pa
+        if self.path.endswith((".arrow", ".feather", ".ipc")):
+            # Uncompressed IPC files can be opened with pyarrow.memory_map without copying
+            self.sink = pa.OSFile(self.temp_path, "wb")
+            self.writer = pa.ipc.new_file(self.sink, self.schema,
+                                          options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+        else:
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(self.temp_path, self.schema)
+    
+    def _flush(self):
+        """Write the buffered rows as one row group (Parquet) or record batch (Arrow IPC)"""
+        pa = self.pa
+        arrays = []
+        for field in CSV_FIELDNAMES:
+            values = self.columns[field]
+            if field in COLUMNAR_DICTIONARY_FIELDS:
+                arrays.append(self._dictionary_array(field, values, pa.int8()))
+            elif field in COLUMNAR_DICTIONARY_LIST_FIELDS:
+                offsets = [0]
+                for value in values:
+                    offsets.append(offsets[-1] + len(value or []))
+                flat = self._dictionary_array(field, [item for value in values for item in value or []], pa.int32())
+                mask = pa.array([value is None for value in values], type=pa.bool_())
+                arrays.append(pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), flat, mask=mask))
+            else:
+                arrays.append(pa.array(values, type=self.schema.field(field).type))
+        batch = pa.record_batch(arrays, schema=self.schema)
+        
+        if self.writer is None:
+            self._open()
+        if batch.num_rows:
+            self.writer.write_batch(batch)
+        for values in self.columns.values():
+            values.clear()
+    
+    def _write_npz(self):
+        import numpy as np
+        
+        arrays = {}
+        for field in CSV_FIELDNAMES:
+            values = self.columns[field]
+            if field in COLUMNAR_FLOAT_FIELDS:
+                arrays[field] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            elif field in COLUMNAR_INT_FIELDS:
+                arrays[field] = np.array([-1 if v is None else v for v in values], dtype=np.int64)
+            elif field in COLUMNAR_DICTIONARY_FIELDS:
+                dictionary, codes = self._dictionary_encode(values)
+                arrays[f"{field}_codes"] = np.array(codes, dtype=np.int32)
+                arrays[f"{field}_values"] = np.array(dictionary, dtype=str)
+            elif field in COLUMNAR_DICTIONARY_LIST_FIELDS or field in COLUMNAR_LIST_FIELDS:
+                lists = [v or [] for v in values]
+                arrays[f"{field}_offsets"] = np.cumsum([0] + [len(v) for v in lists], dtype=np.int64)
+                flat = [item for v in lists for item in v]
+                if field in COLUMNAR_DICTIONARY_LIST_FIELDS:
+                    dictionary, codes = self._dictionary_encode(flat)
+                    arrays[f"{field}_codes"] = np.array(codes, dtype=np.int32)
+                    arrays[f"{field}_values"] = np.array(dictionary, dtype=str)
+                else:
+                    arrays[f"{field}_values"] = np.array(flat, dtype=str)
+            else:
+                arrays[field] = np.array(["" if v is None else v for v in values], dtype=str)
+        np.savez(self.path, **arrays)
+    
+    @staticmethod
+    def _dictionary_encode(values):
+        """Return (dictionary, codes) for a list of strings; None is coded as -1"""
+        index = {}
+        codes = []
+        for value in values:
+            if value is None:
+                codes.append(-1)
+            else:
+                codes.append(index.setdefault(value, len(index)))
+        return list(index), codes
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def create_search_index_from_json(json_file, index_file):
+    """Build a full-text and faceted search index (see search_index.py) from the transformed JSON data"""
+    return build_search_index(iter_records(json_file), index_file)
+
+def create_record_file_from_json(json_file, records_file):
+    """Write the transformed JSON data to a record file with an ID and slug index (see record_file.py)"""
+    return build_record_file(iter_records(json_file), records_file)
+
+def create_columnar_from_json(json_file, columnar_file):
+    """Create a Parquet/Arrow (or .npz) file from the transformed JSON data"""
+    with ColumnarWriter(columnar_file) as writer:
+        for problem in iter_records(json_file):
+            writer.write(problem)
+    return writer.path
+
+class TransformPipeline:
+    """Transform raw problems as they arrive and write them straight to the JSON and CSV outputs
+    
+    Records are written in arrival order, so memory use stays flat regardless of the number of
+    problems; callers that need the Id order of transform_leetcode_data sort before writing, as
+    transform_leetcode_data_streaming does. Any output can be skipped by passing None. A json_file ending in .jsonl is written as
+    JSON Lines; with append=True, JSON Lines and CSV outputs are extended instead of replaced.
+    """
+    def __init__(self, json_file=None, csv_file=None, columnar_file=None, search_index_file=None, append=False,
+                 converter=None, records_file=None):
+        import csv
+        
+        self.json_file = json_file
+        self.converter = converter
+        self.csv_file = csv_file
+        self.columnar_writer = ColumnarWriter(columnar_file) if columnar_file else None
+        self.search_index_writer = SearchIndexWriter(search_index_file) if search_index_file else None
+        self.records_writer = RecordFileWriter(records_file) if records_file else None
+        self.json_writer = None
+        if json_file and json_file.endswith('.jsonl'):
+            self.json_writer = JsonlWriter(json_file, append=append)
+        elif json_file:
+            self.json_writer = JsonArrayWriter(json_file)
+        self.csv_handle = None
+        self.csv_writer = None
+        if csv_file:
+            new_file = not append or not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0
+            self.csv_handle = open(csv_file, 'w' if new_file else 'a', encoding='utf-8', newline='')
+            self.csv_writer = csv.DictWriter(self.csv_handle, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
+            if new_file:
+                self.csv_writer.writeheader()
+        # Without JSON or columnar output, skip the fields no output uses (content conversion, for CSV)
+        self.fields = None
+        if not (json_file or columnar_file or records_file):
+            self.fields = set(CSV_FIELDNAMES if csv_file else [])
+            if search_index_file:
+                self.fields.update(SEARCH_INDEX_FIELDS)
+        self.count = 0
+    
+    def write(self, problem):
+        return self.write_transformed(transform_problem(problem, self.converter, self.fields))
+    
+    def write_transformed(self, transformed):
+        if self.json_writer:
+            self.json_writer.write(transformed)
+        if self.csv_writer:
+            self.csv_writer.writerow(flatten_for_csv(transformed))
+        if self.columnar_writer:
+            self.columnar_writer.write(transformed)
+        if self.search_index_writer:
+            self.search_index_writer.write(transformed)
+        if self.records_writer:
+            self.records_writer.write(transformed)
+        self.count += 1
+        return transformed
+    
+    def close(self):
+        if self.json_writer:
+            self.json_writer.close()
+            print(f"Transformed data saved to {self.json_file}")
+        if self.csv_handle and not self.csv_handle.closed:
+            self.csv_handle.close()
+            print(f"CSV data saved to {self.csv_file}")
+        if self.columnar_writer:
+            self.columnar_writer.close()
+        if self.search_index_writer:
+            self.search_index_writer.close()
+        if self.records_writer:
+            self.records_writer.close()
+        PARSE_ERRORS.report()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def external_sort(records, key, chunk_size=5000, max_merge_width=64):
+    """Sort an iterable of records while holding at most chunk_size of them in memory
+    
+    Sorted runs are spilled to temporary JSON Lines files and merged with heapq.merge. The sort is
+    stable, so records with equal keys keep their input order.
+    """
+    with tempfile.TemporaryDirectory(prefix="transform_sort_") as temp_dir:
+        runs = []
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                runs.append(_write_sorted_run(chunk, key, temp_dir, len(runs)))
+                chunk = []
+        
+        # Small inputs never touch the disk
+        if not runs:
+            chunk.sort(key=key)
+            yield from chunk
+            return
+        if chunk:
+            runs.append(_write_sorted_run(chunk, key, temp_dir, len(runs)))
+        chunk = None
+        
+        # Merge in several passes if there are too many runs to keep open at once
+        run_count = len(runs)
+        while len(runs) > max_merge_width:
+            merged_runs = []
+            for i in range(0, len(runs), max_merge_width):
+                group = runs[i:i + max_merge_width]
+                merged = heapq.merge(*(iter_jsonl(path) for path in group), key=key)
+                merged_runs.append(_write_sorted_run(merged, None, temp_dir, run_count))
+                run_count += 1
+                for path in group:
+                    os.remove(path)
+            runs = merged_runs
+        
+        yield from heapq.merge(*(iter_jsonl(path) for path in runs), key=key)
+
+def _write_sorted_run(records, key, temp_dir, index):
+    """Write records (sorted first if key is given) to a temporary JSON Lines file"""
+    path = os.path.join(temp_dir, f"run_{index}.jsonl")
+    if key is not None:
+        records.sort(key=key)
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+    return path
+
+def transform_leetcode_data_streaming(input_file, output_file, csv_file=None, chunk_size=5000, columnar_file=None,
+                                      search_index_file=None, converter=None, records_file=None):
+    """Transform a raw JSON or JSON Lines dump record by record, with memory bounded by chunk_size
+    
+    Produces the same JSON (and optionally CSV) output as transform_leetcode_data followed by
+    create_csv_from_json, using an external merge sort instead of sorting in memory.
+    """
+    with TransformPipeline(output_file, csv_file, columnar_file, search_index_file,
+                           records_file=records_file) as pipeline:
+        transformed = transform_records(iter_records(input_file), converter, min(chunk_size, 1000), pipeline.fields)
+        for record in external_sort(transformed, problem_sort_key, chunk_size):
+            pipeline.write_transformed(record)
+    return pipeline.count
+
+# Bump when the transformed output format changes, so batch mode re-transforms every snapshot
+TRANSFORM_VERSION = 2
+
+def file_sha256(path, block_size=1 << 20):
+    """Hash a file without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def batch_output_paths(input_file, output_dir):
+    """Deterministic output paths for a snapshot: <output_dir>/<input name>_transformed.{json,csv,meta.json}"""
+    stem = os.path.basename(input_file)
+    for extension in (".jsonl", ".json"):
+        if stem.endswith(extension):
+            stem = stem[:-len(extension)]
+            break
+    base = os.path.join(output_dir, f"{stem}_transformed")
+    return f"{base}.json", f"{base}.csv", f"{base}.meta.json"
+
+def transform_file(input_file, output_dir, chunk_size=5000, force=False, content_cache=None):
+    """Transform one snapshot into output_dir unless its outputs are already up to date
+    
+    Outputs are skipped when the metadata file records the same input hash and TRANSFORM_VERSION.
+    Runs in a worker process in batch mode, so it returns a summary dict instead of raising.
+    """
+    started = time.time()
+    output_file, csv_file, meta_file = batch_output_paths(input_file, output_dir)
+    result = {"input": input_file, "output": output_file, "status": "transformed", "count": 0}
+    try:
+        input_hash = file_sha256(input_file)
+        if not force and os.path.exists(output_file) and os.path.exists(csv_file):
+            try:
+                with open(meta_file, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta.get("input_sha256") == input_hash and meta.get("transform_version") == TRANSFORM_VERSION:
+                    result.update(status="skipped", count=meta.get("count", 0))
+                    return result
+            except (OSError, ValueError):
+                pass
+        
+        # Write to temporary names first so an interrupted run never leaves outputs that look complete
+        # Already running in a worker process, so content is converted in-process (workers=1)
+        converter = ContentConverter(content_cache, workers=1)
+        try:
+            count = transform_leetcode_data_streaming(input_file, output_file + ".tmp", csv_file + ".tmp", chunk_size,
+                                                      converter=converter)
+        finally:
+            converter.close()
+        os.replace(output_file + ".tmp", output_file)
+        os.replace(csv_file + ".tmp", csv_file)
+        with open(meta_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "input": os.path.abspath(input_file),
+                "input_sha256": input_hash,
+                "transform_version": TRANSFORM_VERSION,
+                "count": count,
+                "transformed_at": datetime.now().isoformat(timespec="seconds")
+            }, f, indent=2)
+        result["count"] = count
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+        for temp_file in (output_file + ".tmp", csv_file + ".tmp"):
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+    finally:
+        result["seconds"] = time.time() - started
+    return result
+
+# Names of the snapshots the scraper writes: <selection>_<YYYYmmdd>_<HHMMSS>.json or .jsonl
+SNAPSHOT_FILE_NAME = re.compile(r"^leetcode_\w+_\d{8}_\d{6}\.jsonl?$")
+
+def find_snapshot_files(pattern):
+    """Expand a directory or glob pattern into raw snapshot files, oldest name first
+    
+    Only files named like the scraper's snapshots are returned, so transformed outputs, metrics,
+    partial and record files and any other JSON lying next to the snapshots are skipped.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "leetcode_*.json*")
+    return sorted(f for f in glob.glob(pattern) if SNAPSHOT_FILE_NAME.match(os.path.basename(f)))
+
+def transform_batch(pattern, output_dir="transformed", workers=None, chunk_size=5000, force=False, content_cache=None):
+    """Transform every snapshot matching a directory or glob pattern in a process pool"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    input_files = find_snapshot_files(pattern)
+    if not input_files:
+        print(f"No snapshot files found for {pattern}")
+        return []
+    
+    os.makedirs(output_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(input_files))
+    print(f"Transforming {len(input_files)} snapshots into {output_dir} with {workers} workers")
+    
+    started = time.time()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(transform_file, f, output_dir, chunk_size, force, content_cache) for f in input_files]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            detail = result.get("error") or f"{result['count']} problems, {result['seconds']:.1f}s"
+            print(f"[{len(results)}/{len(input_files)}] {result['status']}: {result['input']} ({detail})")
+    
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("transformed", "skipped", "failed")}
+    print(f"Batch completed in {time.time() - started:.1f}s: {counts['transformed']} transformed, "
+          f"{counts['skipped']} up to date, {counts['failed']} failed")
+    results.sort(key=lambda r: r["input"])
+    return results
+
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Transform scraped LeetCode problems into JSON and CSV')
+    parser.add_argument('--input', type=str, help='Raw problem file to transform (defaults to the newest one)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Transform record by record with bounded memory (always used for .jsonl input)')
+    parser.add_argument('--chunk-size', type=int, default=5000,
+                        help='Records held in memory at once when sorting in streaming mode')
+    parser.add_argument('--columnar', choices=['parquet', 'arrow'],
+                        help='Also write a columnar file (falls back to .npz without pyarrow)')
+    parser.add_argument('--search-index', action='store_true',
+                        help='Also build a SQLite full-text and faceted search index (query it with search_index.py)')
+    parser.add_argument('--records', action='store_true',
+                        help='Also write a JSON Lines record file with an ID and slug offset index (read it with record_file.py)')
+    parser.add_argument('--similar-graph', action='store_true',
+                        help='Also build the similar-questions graph with precomputed analytics (requires numpy)')
+    parser.add_argument('--snippets', type=str, nargs='?', const='snippets', metavar='DIR',
+                        help='Also export code snippets into deduplicated per-language shards (default directory: snippets)')
+    parser.add_argument('--history', type=str, nargs='?', const='stats_history', metavar='DIR',
+                        help='Also append per-problem stats to the history store (default directory: stats_history)')
+    parser.add_argument('--batch', type=str, metavar='DIR_OR_GLOB',
+                        help='Transform every snapshot in a directory or matching a glob, in parallel')
+    parser.add_argument('--output-dir', type=str, default='transformed', help='Output directory for batch mode')
+    parser.add_argument('--workers', type=int, help='Worker processes for batch mode and for converting uncached content (defaults to CPU count)')
+    parser.add_argument('--force', action='store_true', help='Re-transform snapshots even if outputs are up to date')
+    parser.add_argument('--content-cache', type=str, default='.leetcode_cache/content.sqlite3',
+                        help='Cache of HTML to text/Markdown conversions, shared across runs and snapshots')
+    parser.add_argument('--no-content-cache', action='store_true', help='Convert every problem statement again')
+    args = parser.parse_args()
+    
+    content_cache = None if args.no_content_cache else args.content_cache
+    if args.batch:
+        transform_batch(args.batch, args.output_dir, args.workers, args.chunk_size, args.force, content_cache)
+        return
+    
     # Find latest JSON file based on modification time
-    json_files = glob.glob("leetcode_problems_*.json")
-    json_files = [f for f in json_files if not f.endswith('_transformed.json')]
+    json_files = [args.input] if args.input else find_snapshot_files("leetcode_*.json*")
     
     if not json_files:
         print("No LeetCode problem JSON files found in the current directory")
@@ -226,8 +1007,46 @@ def main():
     csv_file = f"leetcode_problems_{id_range}_{timestamp}_transformed.csv"
     
     print(f"Processing {latest_file}...")
-    transformed_data = transform_leetcode_data(latest_file, output_file)
-    create_csv_from_json(output_file, csv_file)
+    columnar_file = None
+    if args.columnar:
+        columnar_file = f"leetcode_problems_{id_range}_{timestamp}_transformed.{args.columnar}"
+    search_index_file = None
+    if args.search_index:
+        search_index_file = f"leetcode_problems_{id_range}_{timestamp}_search.sqlite3"
+    records_file = None
+    if args.records:
+        records_file = f"leetcode_problems_{id_range}_{timestamp}_records.jsonl"
+    converter = ContentConverter(content_cache, workers=args.workers)
+    try:
+        if args.stream or latest_file.endswith((".jsonl", ".jsonl.zst", ".jsonl.gz")):
+            transform_leetcode_data_streaming(latest_file, output_file, csv_file, chunk_size=args.chunk_size,
+                                              columnar_file=columnar_file, search_index_file=search_index_file,
+                                              converter=converter, records_file=records_file)
+        else:
+            transformed_data = transform_leetcode_data(latest_file, output_file, converter)
+            create_csv_from_json(output_file, csv_file)
+            if columnar_file:
+                create_columnar_from_json(output_file, columnar_file)
+            if search_index_file:
+                create_search_index_from_json(output_file, search_index_file)
+            if records_file:
+                create_record_file_from_json(output_file, records_file)
+    finally:
+        # Also stops the conversion process pool
+        converter.close()
+    if args.similar_graph:
+        # Built from the raw snapshot, whose similarQuestions still carry title slugs
+        from similar_graph import build_similar_graph
+        build_similar_graph(latest_file, f"leetcode_problems_{id_range}_{timestamp}_similar.npz")
+    if args.snippets:
+        from snippet_corpus import export_snippets
+        export_snippets(iter_records(latest_file), args.snippets, source=latest_file)
+    if args.history:
+        # Keyed by the raw snapshot's hash, so transforming the same snapshot again appends nothing
+        from stats_history import StatsHistory
+        rows = StatsHistory(args.history).ingest_file(latest_file)
+        print(f"Appended {rows} rows to the stats history in {args.history}" if rows
+              else f"{latest_file} is already in the stats history")
     print(f"Completed processing {latest_file}")
     print(f"Generated {output_file} and {csv_file}")
     
@@ -235,6 +1054,8 @@ def main():
     # Delete all but the newest transformed files to avoid clutter
     all_transformed_jsons = glob.glob("*_transformed.json")
     all_transformed_csvs = glob.glob("*_transformed.csv")
+    all_search_indexes = glob.glob("*_search.sqlite3")
+    all_record_files = glob.glob("*_records.jsonl")
     
     if len(all_transformed_jsons) > 3:  # Keep last 3 transformed JSONs
         old_jsons = sorted(all_transformed_jsons, key=os.path.getmtime)[:-3]
@@ -253,6 +1074,25 @@ def main():
                 os.remove(old_file)
             except Exception as e:
                 print(f"Error removing {old_file}: {e}")
+    
+    if len(all_search_indexes) > 3:  # Keep last 3 search indexes
+        old_indexes = sorted(all_search_indexes, key=os.path.getmtime)[:-3]
+        for old_file in old_indexes:
+            print(f"Removing old search index: {old_file}")
+            try:
+                os.remove(old_file)
+            except Exception as e:
+                print(f"Error removing {old_file}: {e}")
+    
+    if len(all_record_files) > 3:  # Keep last 3 record files and their indexes
+        old_record_files = sorted(all_record_files, key=os.path.getmtime)[:-3]
+        for old_file in old_record_files:
+            print(f"Removing old record file: {old_file}")
+            try:
+                os.remove(old_file)
+                os.remove(index_path(old_file))
+            except Exception as e:
+                print(f"Error removing {old_file}: {e}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
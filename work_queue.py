@@ -0,0 +1,138 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+
+DEFAULT_LEASE_SECONDS = 300
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue:
+    """Durable SQLite queue of problems shared by a coordinator and any number of workers
+
+    The coordinator adds the selected problem list entries in order; workers lease small batches,
+    fetch them with their own session and rate limit, and store each detail back in the queue. A
+    lease that is not completed within lease_seconds (a dead or stuck worker) is handed out again.
+    Problems that fail max_attempts times are marked failed. merge then reads the results back in
+    the coordinator's order. Workers on other hosts need the file on a filesystem with working locks.
+    """
+    def __init__(self, path, max_attempts=5):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=60000")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                position INTEGER PRIMARY KEY,
+                slug TEXT UNIQUE NOT NULL,
+                problem TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can never lease the same rows
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def add(self, problems, name=None):
+        """Add problem list entries in order; problems already in the queue are kept as they are
+
+        name identifies the selection and becomes the merged output name. Adding a different
+        selection to a queue that already holds one raises ValueError, since merging would mix both.
+        """
+        self._transaction()
+        try:
+            if name:
+                stored = self.conn.execute("SELECT value FROM meta WHERE key = 'name'").fetchone()
+                if stored and stored[0] != name:
+                    raise ValueError(f"{self.path} already holds the selection {stored[0]!r}; merge it and "
+                                     f"remove the queue file before queueing {name!r}")
+            start = self.conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM tasks").fetchone()[0]
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (position, slug, problem, updated_at) VALUES (?, ?, ?, ?)",
+                [(start + offset, problem["titleSlug"], json.dumps(problem), time.time())
+                 for offset, problem in enumerate(problems)])
+            if name:
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('name', ?)", (name,))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount
+
+    def meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def lease(self, worker, count=10, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Lease up to `count` pending (or expired) problems, returning (position, problem) pairs"""
+        now = time.time()
+        self._transaction()
+        try:
+            rows = self.conn.execute("""
+                SELECT position, problem FROM tasks
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY position LIMIT ?
+            """, (now, count)).fetchall()
+            self.conn.executemany(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, updated_at = ? WHERE position = ?",
+                [(worker, now + lease_seconds, now, position) for position, _ in rows])
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [(position, json.loads(problem)) for position, problem in rows]
+
+    def renew(self, worker, positions, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Extend this worker's leases on still-unfinished problems"""
+        self.conn.executemany(
+            "UPDATE tasks SET lease_expires = ? WHERE position = ? AND worker = ? AND status = 'leased'",
+            [(time.time() + lease_seconds, position, worker) for position in positions])
+
+    def complete(self, worker, position, detail):
+        """Store a fetched detail; a result from a worker whose lease expired is still accepted"""
+        self.conn.execute(
+            "UPDATE tasks SET status = 'done', worker = ?, result = ?, updated_at = ? "
+            "WHERE position = ? AND status != 'done'",
+            (worker, json.dumps(detail, ensure_ascii=False), time.time(), position))
+
+    def fail(self, worker, position):
+        """Return a problem to the queue, or mark it failed after max_attempts"""
+        self.conn.execute("""
+            UPDATE tasks SET attempts = attempts + 1, worker = NULL, lease_expires = NULL, updated_at = ?,
+                status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END
+            WHERE position = ? AND worker = ? AND status = 'leased'
+        """, (time.time(), self.max_attempts, position, worker))
+
+    def counts(self):
+        """Number of problems per status, with expired leases counted as pending"""
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        rows = self.conn.execute("""
+            SELECT CASE WHEN status = 'leased' AND lease_expires < ? THEN 'pending' ELSE status END, COUNT(*)
+            FROM tasks GROUP BY 1
+        """, (time.time(),))
+        counts.update(dict(rows.fetchall()))
+        return counts
+
+    def failed(self):
+        return [json.loads(problem) for (problem,) in
+                self.conn.execute("SELECT problem FROM tasks WHERE status = 'failed' ORDER BY position")]
+
+    def iter_results(self):
+        """Yield fetched details in queue order"""
+        cursor = self.conn.execute("SELECT result FROM tasks WHERE status = 'done' ORDER BY position")
+        for (result,) in cursor:
+            yield json.loads(result)
+
+    def close(self):
+        self.conn.close()